@@ -0,0 +1,136 @@
+"""Import-time profile of a cold dashboard start, per landing page.
+
+Each page is rendered once in a fresh ``python -X importtime`` process, the
+way a new worker serves its first request. The report lists the time to the
+first complete render, the import time spent by the app during that render
+grouped by top-level package, and which heavy optional packages it loaded.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --views " Company Analysis" --top 5
+
+Results are written to ``benchmarks/results/startup-<date>-<commit>.json``.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'fortune500_app.py')
+RESULT_FORMAT = 1
+
+VIEWS = [' Year Analysis', ' Company Analysis', ' Year Comparison', ' Movers & Survival', ' Predictions & Models',
+         ' Data Overview']
+# المكتبات الثقيلة التي يجب ألا تُحمّل إلا في الصفحات التي تحتاجها
+HEAVY_MODULES = ['plotly', 'pyarrow', 'sklearn', 'scipy', 'joblib', 'threadpoolctl']
+APP_MARKER = '--- fortune500 app run ---'
+
+
+# ==================== WORKER ====================
+def worker(view):
+    # لا نستورد شيئاً غير المكتبة القياسية قبل التشغيل حتى تُحسب كل استيرادات التطبيق
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=600)
+    at.session_state['analysis_menu_radio'] = view
+    print(APP_MARKER, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    at.run()
+    first_render_s = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return {'view': view.strip(), 'first_render_s': first_render_s,
+            'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules]}
+
+
+def parse_importtime(stderr):
+    """Cumulative import seconds of the app run, per top-level package."""
+    packages = {}
+    seen_marker = False
+    for line in stderr.splitlines():
+        if line.startswith(APP_MARKER):
+            seen_marker = True
+            continue
+        if not seen_marker or not line.startswith('import time:'):
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|', 2)
+            cumulative = int(cumulative)
+        except ValueError:
+            continue
+        # المستوى الأعلى فقط (بدون مسافة بادئة إضافية)، وإلا تُحسب الوحدات الفرعية مرتين
+        if name[1:2] == ' ':
+            continue
+        root = name.strip().split('.')[0]
+        packages[root] = packages.get(root, 0) + cumulative / 1e6
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile(view, top):
+    proc = subprocess.run([sys.executable, '-X', 'importtime', __file__, '--worker', view],
+                          capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode != 0:
+        print(proc.stderr[-4000:], file=sys.stderr)
+        raise SystemExit(f"{view.strip()} failed")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    packages = parse_importtime(proc.stderr)
+    result['app_imports_s'] = sum(packages.values())
+    result['top_imports_s'] = dict(list(packages.items())[:top])
+    return result
+
+
+# ==================== DRIVER ====================
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--views', nargs='+', default=VIEWS)
+    parser.add_argument('--top', type=int, default=10, help="packages listed per view")
+    parser.add_argument('--output', help="result file (default: benchmarks/results/startup-<date>-<commit>.json)")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, ROOT)
+        print(json.dumps(worker(args.worker)))
+        return
+
+    commit = git_commit()
+    views = []
+    for view in args.views:
+        result = profile(view, args.top)
+        views.append(result)
+        top = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in list(result['top_imports_s'].items())[:4])
+        print(f"  {result['view']:<22} first render {result['first_render_s']:6.2f}s  "
+              f"imports {result['app_imports_s']:5.2f}s  ({top})  heavy: {', '.join(result['heavy_modules']) or '-'}",
+              file=sys.stderr)
+
+    result = {
+        'format': RESULT_FORMAT,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'views': views,
+    }
+    results_dir = os.path.join(ROOT, 'benchmarks', 'results')
+    os.makedirs(results_dir, exist_ok=True)
+    output = args.output or os.path.join(results_dir, f"startup-{datetime.now():%Y%m%d}-{commit}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
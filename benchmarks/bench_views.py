@@ -0,0 +1,232 @@
+"""Benchmark every dashboard view at several data scales.
+
+Synthetic Fortune-style data is generated from the schema and value
+distributions of ``fortune500_cleaned.csv``. Each scale runs in its own
+subprocess (the data directory is read at import time), and every view is
+driven headlessly with Streamlit's ``AppTest``: one cold render after
+switching to the view, then warm reruns that change the view's widget.
+
+    python benchmarks/bench_views.py                 # 1x, 10x, 100x
+    python benchmarks/bench_views.py --scales 1 10 --reruns 5
+
+Results are written to ``benchmarks/results/<date>-<commit>.json``.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+APP = os.path.join(ROOT, 'fortune500_app.py')
+RESULT_FORMAT = 1
+
+BASE_ROWS_PER_YEAR = 500
+# نسبة الشركات التي تبقى في القائمة من سنة لأخرى (قريبة من البيانات الحقيقية)
+RETENTION = 0.93
+
+VIEWS = [
+    (' Year Analysis', 'Select Year'),
+    (' Company Analysis', 'Select Company'),
+    (' Year Comparison', 'First Year'),
+    (' Movers & Survival', 'Sort By'),
+    (' Predictions & Models', None),
+    (' Data Overview', None),
+]
+
+
+# ==================== SYNTHETIC DATA ====================
+def generate(scale, seed=0, source=os.path.join(ROOT, 'fortune500_cleaned.csv')):
+    rng = np.random.default_rng(seed)
+    real = pd.read_csv(source)
+    years = np.sort(real['year'].unique())
+    per_year = BASE_ROWS_PER_YEAR * scale
+
+    # الشركات الجديدة في كل سنة تأخذ أرقاماً متتالية، والباقي يستمر من السنة السابقة
+    next_id = per_year
+    members = np.arange(per_year)
+    frames = []
+    for year in years:
+        keep = rng.random(len(members)) < RETENTION
+        entrants = per_year - keep.sum()
+        members = np.concatenate([members[keep], np.arange(next_id, next_id + entrants)])
+        next_id += entrants
+        frames.append(pd.DataFrame({'company_id': members, 'year': year}))
+    df = pd.concat(frames, ignore_index=True)
+
+    n_companies = next_id
+    company_revenue = rng.choice(real['revenue_mil'].to_numpy(), n_companies)
+    growth = rng.normal(0.04, 0.12, len(df))
+    df['revenue_mil'] = company_revenue[df['company_id']] * np.exp(growth * (df['year'] - years[0]) / 4)
+    df['name'] = 'Company ' + df['company_id'].astype(str).str.zfill(7)
+
+    company_rows = real.sample(n_companies, replace=True, random_state=seed).reset_index(drop=True)
+    for col in ['industry', 'sector', 'headquarters_state', 'headquarters_city',
+                'founder_is_ceo', 'female_ceo', 'newcomer_to_fortune_500', 'global_500']:
+        df[col] = company_rows[col].to_numpy()[df['company_id']]
+    margin = np.clip(rng.normal(0.06, 0.08, len(df)), -0.5, 0.5)
+    df['profit_mil'] = (df['revenue_mil'] * margin).round(1)
+    df['market_value_mil'] = (df['revenue_mil'] * rng.lognormal(0, 0.6, len(df))).round(1)
+    df['asset_mil'] = (df['revenue_mil'] * rng.lognormal(0.2, 0.5, len(df))).round(1)
+    df['employees'] = (df['revenue_mil'] * rng.lognormal(1.5, 0.7, len(df))).round()
+    df['revenue_mil'] = df['revenue_mil'].round(1)
+    df['rank'] = df.groupby('year')['revenue_mil'].rank(ascending=False, method='first').astype(int)
+    return df[real.columns]
+
+
+def make_data_dir(scale, target):
+    generate(scale).to_csv(os.path.join(target, 'fortune500_cleaned.csv'), index=False)
+    for name in ['fortune500_2024_predictions.csv', 'fortune500_models_performance.csv',
+                 'fortune500_test_predictions.csv']:
+        shutil.copy(os.path.join(ROOT, name), target)
+
+
+# ==================== VIEW DRIVER ====================
+def rss_mb():
+    # ru_maxrss بالكيلوبايت على Linux وبالبايت على macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def find_selectbox(at, label):
+    for box in at.selectbox:
+        if box.label == label:
+            return box
+    return None
+
+
+def timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def run_views(reruns):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=600)
+    results = [{'view': 'startup', 'cold_s': timed_run(at), 'rss_mb': rss_mb()}]
+
+    for view, widget_label in VIEWS:
+        at.radio(key='analysis_menu_radio').set_value(view)
+        cold = timed_run(at)
+        warm = []
+        box = find_selectbox(at, widget_label) if widget_label else None
+        options = list(box.options) if box is not None else []
+        for i in range(reruns):
+            if box is not None:
+                # نختار قيمة مختلفة في كل مرة لأن هذا ما يفعله المستخدم
+                find_selectbox(at, widget_label).set_value(options[(i + 1) * 7 % len(options)])
+            warm.append(timed_run(at))
+        results.append({
+            'view': view.strip(),
+            'cold_s': cold,
+            'warm_median_s': statistics.median(warm) if warm else None,
+            'warm_p95_s': float(np.percentile(warm, 95)) if warm else None,
+            'reruns': len(warm),
+            'rss_mb': rss_mb(),
+        })
+
+    # tracemalloc يبطئ التنفيذ كثيراً، لذلك نقيس الذاكرة في جولة منفصلة بعد قياس الوقت
+    # مع مسح الـ caches حتى تشمل جولة البداية تحميل البيانات من جديد
+    import streamlit as st
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    at = AppTest.from_file(APP, default_timeout=600)
+    tracemalloc.start()
+    at.run()
+    results[0]['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+    for result, (view, _) in zip(results[1:], VIEWS):
+        tracemalloc.reset_peak()
+        at.radio(key='analysis_menu_radio').set_value(view)
+        at.run()
+        result['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return results
+
+
+def worker(scale, reruns):
+    with tempfile.TemporaryDirectory(prefix=f'fortune500-bench-{scale}x-') as data_dir:
+        make_data_dir(scale, data_dir)
+        os.environ['FORTUNE500_DATA_DIR'] = data_dir
+        os.environ['FORTUNE500_SNAPSHOT_DIR'] = os.path.join(data_dir, 'snapshots')
+        os.environ['FORTUNE500_ARTIFACT_DIR'] = os.path.join(data_dir, 'artifacts')
+        rows = len(pd.read_csv(os.path.join(data_dir, 'fortune500_cleaned.csv'), usecols=['year']))
+        os.chdir(ROOT)
+        sys.path.insert(0, ROOT)
+        views = run_views(reruns)
+    return {'scale': scale, 'rows': rows, 'views': views}
+
+
+# ==================== DRIVER ====================
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--reruns', type=int, default=10)
+    parser.add_argument('--output', help="result file (default: benchmarks/results/<date>-<commit>.json)")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.reruns)))
+        return
+
+    commit = git_commit()
+    runs = []
+    for scale in args.scales:
+        print(f"scale {scale}x ...", file=sys.stderr)
+        proc = subprocess.run([sys.executable, __file__, '--worker', str(scale), '--reruns', str(args.reruns)],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            raise SystemExit(f"scale {scale}x failed")
+        run = json.loads(proc.stdout.strip().splitlines()[-1])
+        runs.append(run)
+        for view in run['views']:
+            warm = view.get('warm_median_s')
+            print(f"  {view['view']:<22} cold {view['cold_s']:7.3f}s  "
+                  f"warm {warm if warm is None else f'{warm:7.3f}s'}  "
+                  f"peak {view['peak_traced_mb']:8.1f} MB", file=sys.stderr)
+
+    result = {
+        'format': RESULT_FORMAT,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'runs': runs,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d}-{commit}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""Precomputed aggregates shared by the dashboard pages."""
+import numpy as np
+import pandas as pd
+
+from fortune500_data import freeze
+from fortune500_schema import add_profit_margin
+
+# أكبر قيمة يسمح بها حقل عدد الشركات في صفحة تحليل السنوات
+TOP_N_MAX = 50
+
+CUBE_AGG = {
+    'companies': ('revenue_mil', 'size'),
+    'revenue_sum': ('revenue_mil', 'sum'),
+    'revenue_mean': ('revenue_mil', 'mean'),
+    'profit_sum': ('profit_mil', 'sum'),
+    'profit_mean': ('profit_mil', 'mean'),
+    'margin_mean': ('profit_margin', 'mean'),
+    'margin_median': ('profit_margin', 'median'),
+    'margin_std': ('profit_margin', 'std'),
+}
+
+
+# جداول الـ cube المفهرسة بالسنة: تُحسب لكل سنة بشكل مستقل
+YEAR_TABLES = ['by_year', 'by_year_industry', 'by_year_sector', 'top_by_year']
+
+
+def year_tables(df):
+    tables = {
+        'by_year': df.groupby('year').agg(**CUBE_AGG),
+        'by_year_industry': df.groupby(['year', 'industry'], observed=True).agg(**CUBE_AGG),
+        'by_year_sector': df.groupby(['year', 'sector'], observed=True).agg(**CUBE_AGG),
+    }
+    tables['top_by_year'] = (df.sort_values(['year', 'revenue_mil'], ascending=[True, False])
+                               .groupby('year').head(TOP_N_MAX)
+                               .set_index('year'))
+    # قيم الإيرادات مرتبة لكل سنة: تكفي للـ histogram والـ quantiles بدون فلترة البيانات
+    tables['revenue_by_year'] = {year: np.sort(values.to_numpy())
+                                 for year, values in df.groupby('year')['revenue_mil']}
+    return tables
+
+
+def finish_cube(cube, df):
+    # الأجزاء التي تعتمد على أكثر من سنة تُحسب بعد تجميع جداول السنوات
+    cube['by_year']['revenue_mean_growth'] = cube['by_year']['revenue_mean'].pct_change() * 100
+    cube['top_by_year'] = freeze(cube['top_by_year'])
+    cube['company_max_revenue'] = (df.groupby('name', observed=True)['revenue_mil'].max()
+                                     .sort_values(ascending=False))
+    cube['totals'] = {
+        'years': len(cube['by_year']),
+        'companies': len(cube['company_max_revenue']),
+        'revenue_sum': cube['by_year']['revenue_sum'].sum(),
+        'avg_annual_growth': cube['by_year']['revenue_mean_growth'].mean(),
+    }
+    return cube
+
+
+def build_cube(df):
+    add_profit_margin(df)
+    return finish_cube(year_tables(df), df)
+
+
+def update_cube(cube, df, years):
+    """New cube with only ``years`` recomputed from ``df``; the rest is reused.
+
+    ``df`` is the full updated frame. Years missing from it are dropped.
+    """
+    add_profit_margin(df)
+    years = sorted(set(years))
+    fresh = year_tables(df[df['year'].isin(years)])
+    updated = {}
+    for key in YEAR_TABLES:
+        old = cube[key].drop(columns='revenue_mean_growth', errors='ignore')
+        kept = old[~old.index.get_level_values('year').isin(years)]
+        updated[key] = pd.concat([kept, fresh[key]]).sort_index(kind='stable')
+    updated['revenue_by_year'] = {**{year: values for year, values in cube['revenue_by_year'].items()
+                                     if year not in years},
+                                  **fresh['revenue_by_year']}
+    return finish_cube(updated, df)
+
+
+def year_stats(cube, year):
+    return cube['by_year'].loc[year]
+
+
+def year_industries(cube, year, n=15):
+    return cube['by_year_industry'].loc[year].sort_values('revenue_sum', ascending=False).head(n)
+
+
+def year_sectors(cube, year):
+    return cube['by_year_sector'].loc[year].sort_values('revenue_sum', ascending=False)
+
+
+def year_top(cube, year, n):
+    return cube['top_by_year'].loc[[year]].head(n).reset_index()
+
+
+def build_company_index(df, company_ids, n_companies):
+    # ترتيب البيانات حسب (معرف الشركة، السنة) مع بداية ونهاية كل معرف
+    frame = df.assign(company_id=company_ids).sort_values(['company_id', 'year'], kind='stable')
+    frame = frame.reset_index(drop=True)
+    codes = frame['company_id'].to_numpy()
+    ids = np.arange(n_companies)
+    return {
+        'frame': freeze(frame),
+        'starts': np.searchsorted(codes, ids, side='left'),
+        'stops': np.searchsorted(codes, ids, side='right'),
+    }
+
+
+def company_history(index, company_id):
+    if not 0 <= company_id < len(index['starts']):
+        return index['frame'].iloc[0:0]
+    return index['frame'].iloc[index['starts'][company_id]:index['stops'][company_id]]
+
+
+# ==================== COMPANY × YEAR PANEL ====================
+PANEL_VALUES = ['revenue_mil', 'profit_mil', 'rank']
+MOVERS_N = 10
+
+
+def build_panel(df):
+    """Dense company × year matrices of ``PANEL_VALUES``, NaN where a company is not listed.
+
+    Rows follow the sorted company names and columns the sorted years, so
+    any multi-year question is column indexing instead of merging frames.
+    The engine passes canonical names so that one row covers every spelling
+    of a company.
+    """
+    # اسم مكرر في نفس السنة: يبقى الصف الأعلى إيرادات
+    frame = df.sort_values('revenue_mil', ascending=False, kind='stable').drop_duplicates(['name', 'year'])
+    codes, names = pd.factorize(frame['name'].astype(str), sort=True)
+    years = np.sort(frame['year'].unique().astype(int))
+    columns = np.searchsorted(years, frame['year'].to_numpy())
+    values = {}
+    for col in PANEL_VALUES:
+        matrix = np.full((len(names), len(years)), np.nan)
+        matrix[codes, columns] = frame[col].to_numpy(dtype='float64')
+        matrix.flags.writeable = False
+        values[col] = matrix
+    return {'names': np.asarray(names, dtype=object), 'years': years, 'values': values}
+
+
+def panel_columns(panel, years):
+    years = np.asarray(years, dtype=int)
+    positions = np.searchsorted(panel['years'], years)
+    found = (positions < len(panel['years'])) & (panel['years'][np.minimum(positions, len(panel['years']) - 1)] == years)
+    if not found.all():
+        raise KeyError(f"Years not in data: {years[~found].tolist()}")
+    return positions
+
+
+def growth_rate(first, last, span):
+    # معدل النمو السنوي المركب بالنسبة المئوية؛ NaN عند غياب إحدى القيمتين أو تغير الإشارة
+    # span رقم واحد أو مصفوفة بطول القيم (مدة مختلفة لكل شركة)
+    span = np.asarray(span, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (np.power(last / first, 1 / span) - 1) * 100
+    return np.where(np.isfinite(rate) & (span > 0), rate, np.nan)
+
+
+def panel_compare(panel, years):
+    """Companies listed in any of ``years``: revenue in each, then the change from the first to the last.
+
+    ``status`` is ``stayed`` (listed in both ends), ``entered``, ``exited``
+    or ``between`` (listed only in the years in between).
+    """
+    years = sorted({int(year) for year in years})
+    columns = panel_columns(panel, years)
+    revenue = panel['values']['revenue_mil'][:, columns]
+    rank = panel['values']['rank'][:, columns]
+    listed = ~np.isnan(revenue)
+    rows = listed.any(axis=1)
+    revenue, rank, listed = revenue[rows], rank[rows], listed[rows]
+    first, last = revenue[:, 0], revenue[:, -1]
+
+    frame = pd.DataFrame(revenue, columns=[f'revenue_{year}' for year in years])
+    frame.insert(0, 'name', panel['names'][rows])
+    frame['years_listed'] = listed.sum(axis=1)
+    frame['revenue_change'] = last - first
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frame['revenue_change_pct'] = (last - first) / first * 100
+    frame['cagr'] = growth_rate(first, last, years[-1] - years[0])
+    frame['rank_first'] = pd.array(rank[:, 0]).astype('Int64')
+    frame['rank_last'] = pd.array(rank[:, -1]).astype('Int64')
+    # موجب = تقدم في الترتيب
+    frame['rank_change'] = pd.array(rank[:, 0] - rank[:, -1]).astype('Int64')
+    frame['status'] = np.select([listed[:, 0] & listed[:, -1], listed[:, -1], listed[:, 0]],
+                                ['stayed', 'entered', 'exited'], 'between')
+    return frame.sort_values(['rank_last', 'rank_first'], na_position='last', ignore_index=True)
+
+
+def rank_movers(panel, y1, y2, n=MOVERS_N):
+    """The ``n`` biggest rank gains and losses between two years among companies listed in both."""
+    c1, c2 = panel_columns(panel, [y1, y2])
+    rank = panel['values']['rank']
+    change = rank[:, c1] - rank[:, c2]
+    both = np.flatnonzero(~np.isnan(change))
+    order = both[np.argsort(-change[both], kind='stable')]
+
+    def movers(rows):
+        return pd.DataFrame({
+            'name': panel['names'][rows],
+            f'rank_{y1}': rank[rows, c1].astype(int),
+            f'rank_{y2}': rank[rows, c2].astype(int),
+            'rank_change': change[rows].astype(int),
+        })
+    return {'risers': movers(order[:n][change[order[:n]] > 0]),
+            'fallers': movers(order[::-1][:n][change[order[::-1][:n]] < 0])}
+
+
+def turnover(panel, y1, y2):
+    """Companies that entered (listed in ``y2`` only) and exited (``y1`` only) between two years."""
+    c1, c2 = panel_columns(panel, [y1, y2])
+    revenue, rank = panel['values']['revenue_mil'], panel['values']['rank']
+    listed1, listed2 = ~np.isnan(revenue[:, c1]), ~np.isnan(revenue[:, c2])
+
+    def companies(rows, column):
+        frame = pd.DataFrame({'name': panel['names'][rows], 'rank': rank[rows, column].astype(int),
+                              'revenue_mil': revenue[rows, column]})
+        return frame.sort_values('rank', ignore_index=True)
+    return {'entrants': companies(listed2 & ~listed1, c2), 'exits': companies(listed1 & ~listed2, c1)}
+
+
+# ==================== RANK DYNAMICS ====================
+# عدد السنوات في النمو السنوي المركب المتحرك
+GROWTH_WINDOW = 3
+DYNAMICS_N = 50
+# المقاييس القابلة للترتيب وترتيبها الافتراضي (True = الأصغر أولاً)
+DYNAMICS_METRICS = {
+    'mean_rank_change': False,
+    'rank_volatility': False,
+    'biggest_rise': False,
+    'biggest_drop': True,
+    'years_listed': False,
+    'longest_streak': False,
+    're_entries': False,
+    'best_rank': True,
+    'latest_rank': True,
+    'revenue_cagr': False,
+    'growth_3y': False,
+    'best_growth_3y': False,
+}
+
+
+def segment_reduce(ufunc, values, starts):
+    # reduceat لا يقبل قائمة بدايات فارغة
+    return ufunc.reduceat(values, starts) if len(starts) else values[:0]
+
+
+def segment_stats(values, valid, group, starts):
+    # المتوسط والانحراف المعياري والأكبر والأصغر لكل شركة من القيم الصالحة فقط
+    n = np.bincount(group, weights=valid, minlength=len(starts))
+    filled = np.where(valid, values, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.bincount(group, weights=filled, minlength=len(starts)) / n
+        var = np.bincount(group, weights=filled ** 2, minlength=len(starts)) / n - mean ** 2
+    masked = np.where(valid, values, np.nan)
+    return {
+        'mean': np.where(n > 0, mean, np.nan),
+        'std': np.where(n > 1, np.sqrt(np.clip(var, 0, None)), np.nan),
+        'max': segment_reduce(np.fmax, masked, starts),
+        'min': segment_reduce(np.fmin, masked, starts),
+    }
+
+
+def build_rank_dynamics(index, names):
+    """One row per company of rank, tenure and growth metrics.
+
+    Computed in one pass over the (company, year) sorted frame of the company
+    index: every metric is a segment reduction (``np.bincount`` or
+    ``reduceat``) over the rows of each company, so the cost does not depend
+    on the number of companies. Rank changes are positive when the company
+    moved up and only count consecutive listed years; a gap of one or more
+    years off the list is a re-entry.
+    """
+    frame = index['frame']
+    # شركة مكررة في نفس السنة (اسمان لنفس المعرف): يبقى الصف الأعلى إيرادات
+    frame = (frame[frame['company_id'] >= 0]
+             .sort_values(['company_id', 'year', 'revenue_mil'], ascending=[True, True, False], kind='stable')
+             .drop_duplicates(['company_id', 'year']))
+    ids = frame['company_id'].to_numpy()
+    year = frame['year'].to_numpy(dtype=np.int64)
+    rank = frame['rank'].to_numpy(dtype='float64')
+    revenue = frame['revenue_mil'].to_numpy(dtype='float64')
+
+    # كل المصفوفات بطول الصفوف حتى يبقى الجدول الفارغ صحيحاً
+    new = np.diff(ids, prepend=-1) != 0
+    starts = np.flatnonzero(new)
+    stops = np.append(starts[1:], len(ids))[:len(starts)]
+    lasts = stops - 1
+    counts = stops - starts
+    group = np.cumsum(new) - 1
+    gap = np.diff(year, prepend=0)
+    consecutive = ~new & (gap == 1)
+    re_entry = ~new & (gap > 1)
+
+    # سلاسل السنوات المتتالية: كل صف غير متتال يبدأ سلسلة جديدة
+    run = np.cumsum(~consecutive) - 1
+    run_length = np.bincount(run)[run]
+    changes = segment_stats(-np.diff(rank, prepend=np.nan), consecutive, group, starts)
+
+    # النمو على GROWTH_WINDOW سنوات لكل صف: مقارنة بصف نفس الشركة قبل GROWTH_WINDOW سنوات إن وُجد
+    rows = pd.MultiIndex.from_arrays([ids, year])
+    back = rows.get_indexer(pd.MultiIndex.from_arrays([ids, year - GROWTH_WINDOW]))
+    window_growth = np.where(back >= 0, growth_rate(revenue[back], revenue, GROWTH_WINDOW), np.nan)
+
+    last_year = year[lasts]
+    active = last_year == (year.max() if len(year) else 0)
+    latest = frame.iloc[lasts]
+    table = pd.DataFrame({
+        'company_id': ids[starts],
+        'name': names[ids[starts]],
+        'sector': latest['sector'].astype(str).to_numpy(),
+        'industry': latest['industry'].astype(str).to_numpy(),
+        'first_year': year[starts],
+        'last_year': last_year,
+        'years_listed': counts,
+        'active': active,
+        're_entries': np.bincount(group, weights=re_entry).astype(int),
+        'first_streak': run_length[starts],
+        'longest_streak': segment_reduce(np.maximum, run_length, starts),
+        'current_streak': np.where(active, run_length[lasts], 0),
+        'best_rank': segment_reduce(np.minimum, rank, starts).astype(int),
+        'worst_rank': segment_reduce(np.maximum, rank, starts).astype(int),
+        'latest_rank': rank[lasts].astype(int),
+        'mean_rank': np.bincount(group, weights=rank) / counts,
+        'mean_rank_change': changes['mean'],
+        'rank_volatility': changes['std'],
+        'biggest_rise': pd.array(changes['max']).astype('Int64'),
+        'biggest_drop': pd.array(changes['min']).astype('Int64'),
+        'revenue_cagr': growth_rate(revenue[starts], revenue[lasts], last_year - year[starts]),
+        'growth_3y': window_growth[lasts],
+        'best_growth_3y': segment_reduce(np.fmax, window_growth, starts),
+    })
+    return freeze(table)
+
+
+def select_dynamics(table, sort='mean_rank_change', ascending=None, n=DYNAMICS_N, min_years=1,
+                    status=None, sectors=None):
+    """The first ``n`` companies of the dynamics table by ``sort`` after filtering.
+
+    ``status`` is ``active`` (on the latest list), ``exited`` or ``None`` for
+    both; companies without a value for ``sort`` are left out.
+    """
+    if sort not in DYNAMICS_METRICS:
+        raise KeyError(f"Unknown metric: {sort}")
+    ascending = DYNAMICS_METRICS[sort] if ascending is None else ascending
+    rows = (table['years_listed'] >= min_years) & table[sort].notna()
+    if status is not None:
+        rows &= table['active'] == (status == 'active')
+    if sectors:
+        rows &= table['sector'].isin(list(sectors))
+    return table[rows].sort_values([sort, 'latest_rank'], ascending=[ascending, True], kind='stable',
+                                   ignore_index=True).head(n)
+
+
+def survival_curve(table, first_year, last_year):
+    """Share of companies still on the list ``k`` years after they first entered it.
+
+    Companies listed in ``first_year`` are left out (they entered before the
+    data starts), and each ``k`` counts only the companies that entered at
+    least ``k`` years before ``last_year``.
+    """
+    entered = table.loc[table['first_year'] > first_year, ['first_year', 'first_streak']]
+    horizons = np.arange(1, last_year - first_year + 1)
+    # eligible[k] = الشركات التي دخلت قبل last_year - k + 1 أو فيها
+    entry = entered['first_year'].to_numpy()
+    streak = entered['first_streak'].to_numpy()
+    eligible = np.array([(entry <= last_year - k + 1).sum() for k in horizons])
+    surviving = np.array([((entry <= last_year - k + 1) & (streak >= k)).sum() for k in horizons])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = surviving / eligible * 100
+    return pd.DataFrame({'years': horizons, 'companies': eligible, 'surviving': surviving,
+                         'survival_pct': share})[lambda frame: frame['companies'] > 0]
@@ -0,0 +1,330 @@
+"""Reusable Fortune 500 analyses, each computed on first access.
+
+    python fortune500_analyzer.py                 # executive report
+    python fortune500_analyzer.py --clusters 5    # also the industry clusters
+
+Replaces ``Fortune500Analyzer`` in ``Untitled6.ipynb``, which validated the
+data and derived its features in ``__init__`` and recomputed every analysis
+from the raw frame. Here nothing runs until an analysis is requested. Each
+analysis and each intermediate several of them share (row features, yearly
+aggregates, the company × year panel, per-company CAGR) is memoized per
+dataset version in an ``LRUCache``, backed by the ``analyzer`` disk store when
+``FORTUNE500_CACHE_DIR`` is set. Analyses return frames and dicts; charts are
+left to the caller.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from fortune500_analytics import build_panel, growth_rate
+from fortune500_cache import LRUCache, open_store
+from fortune500_data import load_all
+from fortune500_search import company_ids, resolve_entities
+
+SIZE_LABELS = ['Small', 'Medium', 'Large', 'Giant']
+TOP_COMPANIES = 5
+TOP_INDUSTRIES = 10
+FORECAST_YEARS = 5
+N_CLUSTERS = 4
+# MiniBatchKMeans يتعلم من دفعات بهذا الحجم فتبقى الذاكرة ثابتة مهما زاد عدد الصفوف
+CLUSTER_BATCH = 4096
+CLUSTER_EPOCHS = 3
+CLUSTER_FEATURES = ['log_revenue', 'profit_margin', 'log_revenue_per_employee', 'log_asset_turnover']
+# هوامش الربح المتطرفة (شركات بإيرادات صغيرة جداً) تُقص حتى لا تسيطر على المجموعات
+MARGIN_CLIP = 100
+SEED = 42
+
+
+# ==================== SHARED INTERMEDIATES ====================
+def derive_features(df):
+    """The notebook's derived columns, with NaN where a ratio has no denominator."""
+    revenue = df['revenue_mil'].to_numpy(dtype='float64')
+    employees = df['employees'].to_numpy(dtype='float64')
+    assets = df['asset_mil'].to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_employee = np.where(employees > 0, revenue / employees, np.nan)
+        turnover = np.where(assets > 0, revenue / assets, np.nan)
+    return df.assign(
+        revenue_per_employee=per_employee,
+        asset_turnover=turnover,
+        size_category=pd.qcut(revenue, q=len(SIZE_LABELS), labels=SIZE_LABELS),
+        decade=(df['year'].astype(int) // 10) * 10,
+    )
+
+
+def yearly_stats(features):
+    return features.groupby('year', observed=True).agg(
+        companies=('name', 'size'),
+        revenue_mean=('revenue_mil', 'mean'),
+        revenue_std=('revenue_mil', 'std'),
+        revenue_skew=('revenue_mil', 'skew'),
+        margin_mean=('profit_margin', 'mean'),
+        margin_std=('profit_margin', 'std'),
+        revenue_per_employee=('revenue_per_employee', 'mean'),
+        asset_turnover=('asset_turnover', 'mean'),
+    )
+
+
+def company_panel(df):
+    # صف واحد لكل شركة مهما اختلفت كتابة اسمها، كما في المحرك
+    entities = resolve_entities(df)
+    return build_panel(df.assign(name=entities['names'][company_ids(entities, df['name'])]))
+
+
+def company_growth(panel):
+    """First and last listed year and revenue of every company, and its CAGR in between."""
+    revenue = panel['values']['revenue_mil']
+    listed = ~np.isnan(revenue)
+    rows = np.arange(len(revenue))
+    first = listed.argmax(axis=1)
+    last = listed.shape[1] - 1 - listed[:, ::-1].argmax(axis=1)
+    years = panel['years']
+    return pd.DataFrame({
+        'name': panel['names'],
+        'first_year': years[first],
+        'last_year': years[last],
+        'years_listed': listed.sum(axis=1),
+        'first_revenue': revenue[rows, first],
+        'last_revenue': revenue[rows, last],
+        'cagr': growth_rate(revenue[rows, first], revenue[rows, last], years[last] - years[first]),
+    })
+
+
+# ==================== ANALYSES ====================
+def validation_report(df):
+    return {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'missing_values': int(df.isna().sum().sum()),
+        'duplicate_rows': int(df.duplicated().sum()),
+        'memory_mb': df.memory_usage(deep=True).sum() / 1024 ** 2,
+        'dtypes': {str(dtype): int(count) for dtype, count in df.dtypes.astype(str).value_counts().items()},
+    }
+
+
+def time_series(features, yearly, panel, n=TOP_COMPANIES):
+    revenue = panel['values']['revenue_mil']
+    top = np.argsort(-np.nanmax(revenue, axis=1), kind='stable')[:n]
+    series = pd.DataFrame({
+        'name': np.repeat(panel['names'][top], len(panel['years'])),
+        'year': np.tile(panel['years'], len(top)),
+        'revenue_mil': revenue[top].ravel(),
+    }).dropna()
+    industries = features['industry'].astype(str).value_counts().head(TOP_INDUSTRIES)
+    return {
+        'yearly': yearly[['companies', 'revenue_mean', 'margin_mean']],
+        'top_companies': series.reset_index(drop=True),
+        'industries': industries,
+        'industry_by_decade': pd.crosstab(features['decade'], features['industry'].astype(str))[industries.index],
+    }
+
+
+def financial_ratios(features, yearly):
+    numeric = features.select_dtypes(include=[np.number])
+    return {
+        'by_year': yearly.drop(columns='companies'),
+        'correlation': numeric.corr(),
+    }
+
+
+def cluster_matrix(features):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        X = np.column_stack([
+            np.log10(features['revenue_mil'].to_numpy(dtype='float64')),
+            np.clip(features['profit_margin'].to_numpy(dtype='float64'), -MARGIN_CLIP, MARGIN_CLIP),
+            np.log10(features['revenue_per_employee'].to_numpy(dtype='float64')),
+            np.log10(features['asset_turnover'].to_numpy(dtype='float64')),
+        ])
+    return X, np.isfinite(X).all(axis=1)
+
+
+def fit_clusters(X, n_clusters, batch=CLUSTER_BATCH, epochs=CLUSTER_EPOCHS):
+    """Labels and centers of ``X`` from ``MiniBatchKMeans.partial_fit`` over shuffled batches.
+
+    Labels are renumbered by the first feature of the centers, so cluster 0
+    is always the smallest revenue group.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch, random_state=SEED, n_init=3)
+    rng = np.random.default_rng(SEED)
+    for _ in range(epochs):
+        order = rng.permutation(len(X))
+        for start in range(0, len(X), batch):
+            rows = order[start:start + batch]
+            # الدفعة الأخيرة قد تكون أصغر من عدد المجموعات
+            if len(rows) >= n_clusters:
+                model.partial_fit(X[rows])
+    labels = np.concatenate([model.predict(X[start:start + batch]) for start in range(0, len(X), batch)])
+    order = np.argsort(model.cluster_centers_[:, 0])
+    relabel = np.empty(n_clusters, dtype=np.int64)
+    relabel[order] = np.arange(n_clusters)
+    return relabel[labels], model.cluster_centers_[order]
+
+
+def industry_clusters(features, n_clusters=N_CLUSTERS):
+    """Industry statistics and a row-level clustering of company profiles.
+
+    Every company-year is clustered on revenue, margin, revenue per employee
+    and asset turnover (standardized); an industry gets the cluster most of
+    its rows fall in and the share of its rows in that cluster.
+    """
+    X, valid = cluster_matrix(features)
+    mean, std = X[valid].mean(axis=0), X[valid].std(axis=0)
+    std[std == 0] = 1
+    labels, centers = fit_clusters((X[valid] - mean) / std, n_clusters)
+
+    rows = features[valid].assign(cluster=labels, industry=features.loc[valid, 'industry'].astype(str))
+    shares = pd.crosstab(rows['industry'], rows['cluster'], normalize='index')
+    stats = features.assign(industry=features['industry'].astype(str)).groupby('industry').agg(
+        companies=('revenue_mil', 'size'),
+        revenue_mean=('revenue_mil', 'mean'),
+        revenue_median=('revenue_mil', 'median'),
+        revenue_std=('revenue_mil', 'std'),
+        margin_mean=('profit_margin', 'mean'),
+        market_value_median=('market_value_mil', 'median'),
+    )
+    stats['cluster'] = shares.idxmax(axis=1).reindex(stats.index).astype('Int64')
+    stats['cluster_share'] = shares.max(axis=1).reindex(stats.index)
+
+    centers = pd.DataFrame(centers * std + mean, columns=CLUSTER_FEATURES)
+    profile = pd.DataFrame({
+        'revenue_mil': 10 ** centers['log_revenue'],
+        'profit_margin': centers['profit_margin'],
+        'revenue_per_employee': 10 ** centers['log_revenue_per_employee'],
+        'asset_turnover': 10 ** centers['log_asset_turnover'],
+        'rows': np.bincount(labels, minlength=n_clusters),
+    }).rename_axis('cluster')
+    return {
+        'industries': stats.sort_values('revenue_mean', ascending=False),
+        'clusters': profile,
+    }
+
+
+def geography(features):
+    states = features.assign(headquarters_state=features['headquarters_state'].astype(str))
+    return states.groupby('headquarters_state').agg(
+        companies=('name', 'size'),
+        revenue_mil=('revenue_mil', 'sum'),
+        profit_mil=('profit_mil', 'sum'),
+        employees=('employees', 'sum'),
+    ).sort_values('revenue_mil', ascending=False)
+
+
+def trend_forecast(yearly, years=FORECAST_YEARS):
+    """Linear trend of the average revenue per year, extended ``years`` past the data."""
+    x = yearly.index.to_numpy(dtype='float64')
+    y = yearly['revenue_mean'].to_numpy(dtype='float64')
+    slope, intercept = np.polyfit(x, y, 1)
+    fitted = slope * x + intercept
+    future = np.arange(int(x.max()) + 1, int(x.max()) + 1 + years)
+    return {
+        'slope': float(slope),
+        'intercept': float(intercept),
+        'r2': float(1 - ((y - fitted) ** 2).sum() / ((y - y.mean()) ** 2).sum()),
+        'forecast': pd.DataFrame({'year': future, 'revenue_mean': slope * future + intercept}),
+    }
+
+
+def executive_report(features, yearly, growth):
+    first, last = yearly.index.min(), yearly.index.max()
+    return {
+        'data_summary': {
+            'period': f"{first} - {last}",
+            'observations': len(features),
+            'companies': len(growth),
+            'industries': features['industry'].nunique(),
+        },
+        'financial_highlights': {
+            'total_revenue_mil': float(features['revenue_mil'].sum()),
+            'average_revenue_mil': float(features['revenue_mil'].mean()),
+            'highest_revenue_mil': float(features['revenue_mil'].max()),
+            'average_profit_margin': float(features['profit_margin'].mean()),
+        },
+        'trends': {
+            # نمو متوسط الإيرادات بين أول وآخر سنة كما في الـ notebook
+            'average_revenue_cagr': float(growth_rate(yearly.loc[first, 'revenue_mean'],
+                                                      yearly.loc[last, 'revenue_mean'], last - first)),
+            'median_company_cagr': float(growth['cagr'].median()),
+            'most_frequent_industry': str(features['industry'].mode()[0]),
+            'top_state': str(features['headquarters_state'].mode()[0]),
+            'average_tenure_years': float(growth['years_listed'].mean()),
+        },
+    }
+
+
+class Fortune500Analyzer:
+    """The notebook's analyses over one dataset version, memoized on first access."""
+
+    def __init__(self, dataset=None, cache_size=64):
+        self.dataset = dataset if dataset is not None else load_all(['main'])
+        self.version = self.dataset.version('main')
+        self.cache = LRUCache(maxsize=cache_size, store=open_store('analyzer'))
+
+    @property
+    def df(self):
+        return self.dataset['main']
+
+    def memo(self, key, builder):
+        return self.cache.get_or_build((key, self.version), builder)
+
+    @property
+    def features(self):
+        return self.memo('features', lambda: derive_features(self.df))
+
+    @property
+    def yearly(self):
+        return self.memo('yearly', lambda: yearly_stats(self.features))
+
+    @property
+    def panel(self):
+        return self.memo('panel', lambda: company_panel(self.df))
+
+    @property
+    def company_growth(self):
+        return self.memo('company_growth', lambda: company_growth(self.panel))
+
+    def validation(self):
+        return self.memo('validation', lambda: validation_report(self.df))
+
+    def time_series(self, n=TOP_COMPANIES):
+        return self.memo(('time_series', n), lambda: time_series(self.features, self.yearly, self.panel, n))
+
+    def financial_ratios(self):
+        return self.memo('financial_ratios', lambda: financial_ratios(self.features, self.yearly))
+
+    def industry_clusters(self, n_clusters=N_CLUSTERS):
+        return self.memo(('industry_clusters', n_clusters), lambda: industry_clusters(self.features, n_clusters))
+
+    def geography(self):
+        return self.memo('geography', lambda: geography(self.features))
+
+    def trend_forecast(self, years=FORECAST_YEARS):
+        return self.memo(('trend_forecast', years), lambda: trend_forecast(self.yearly, years))
+
+    def report(self):
+        return self.memo('report', lambda: executive_report(self.features, self.yearly, self.company_growth))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fortune 500 executive report and analyses")
+    parser.add_argument('--clusters', type=int, help="also cluster the industries into this many groups")
+    args = parser.parse_args()
+
+    analyzer = Fortune500Analyzer()
+    for section, values in analyzer.report().items():
+        print(f"\n{section.replace('_', ' ').title()}:")
+        for name, value in values.items():
+            print(f"  {name.replace('_', ' ')}: {f'{value:,.2f}' if isinstance(value, float) else value}")
+    trend = analyzer.trend_forecast()
+    print(f"\nAverage revenue trend: {trend['slope']:+,.0f}M per year (R2 {trend['r2']:.3f})")
+    print(trend['forecast'].round(0).to_string(index=False))
+    if args.clusters:
+        clusters = analyzer.industry_clusters(args.clusters)
+        print(clusters['clusters'].round(2).to_string())
+        print(clusters['industries'].head(TOP_INDUSTRIES).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
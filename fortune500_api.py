@@ -0,0 +1,387 @@
+"""Local HTTP/JSON API over the analytics engine.
+
+Run it standalone with ``python fortune500_api.py --port 8500`` or start it
+inside the dashboard process with ``FORTUNE500_API_PORT`` so both share one
+warm engine. A new dataset version is picked up at most every
+``FORTUNE500_API_REFRESH_S`` seconds (default 5), not on every request.
+
+Endpoints (all GET unless noted)::
+
+    /health
+    /years
+    /years/<year>                       summary metrics
+    /years/<year>/top?n=15
+    /years/<year>/industries?n=15
+    /years/<year>/sectors
+    /compare?y1=2020&y2=2023
+    /compare?year=2000&year=2010&year=2023   totals, revenue CAGR and company-level changes
+    /movers?y1=2020&y2=2023&n=10         biggest rank gains and losses
+    /turnover?y1=2020&y2=2023            entrants and exits
+    /dynamics?sort=rank_volatility&n=50&min_years=5&status=active&sector=Retailing
+                                        per-company rank and tenure metrics, filtered and sorted
+    /survival                           share of entrants still listed k years later
+    /overview
+    /export/<year|company|compare|dynamics|predictions|test_predictions>?format=csv|parquet|xlsx&...
+                                        streamed file: year=2023, company=<name> or id=<id>, year=..&year=..,
+                                        the /dynamics filters, name=test|pred2024, or nothing for every
+                                        model's test predictions in the artifact bundle
+    /companies?prefix=gen&limit=20
+    /search?q=wal&limit=20              typeahead: [{"id", "name"}], best match first
+    /companies/history?name=A&name=B    batched histories (also POST {"names": [...]})
+    /company/<name>/history             any spelling of the name resolves to the same company
+    /company/history?id=<id>            the same history by the id returned from /search
+    /metrics                            rerun timings and cache stats (not cached)
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from fortune500_analytics import DYNAMICS_METRICS, DYNAMICS_N
+from fortune500_engine import Fortune500Engine
+from fortune500_export import export
+from fortune500_metrics import registry
+from fortune500_search import SEARCH_LIMIT
+
+MAX_BATCH = 500
+UNCACHED_PATHS = {'/health', '/metrics'}
+REFRESH_SECONDS = float(os.environ.get('FORTUNE500_API_REFRESH_S', 5))
+
+
+class ApiError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def to_payload(value):
+    if isinstance(value, pd.DataFrame):
+        # to_json يقرب إلى 10 خانات ويضيف ضوضاء للأرقام الكبيرة؛ repr في Python يعيد أقصر تمثيل دقيق
+        return [to_payload(row) for row in value.to_dict(orient='records')]
+    if isinstance(value, pd.Series):
+        return {str(k): to_payload(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(k): to_payload(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_payload(v) for v in value]
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def parse_year(engine, text):
+    try:
+        year = int(text)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"Invalid year: {text!r}")
+    if not engine.has_year(year):
+        raise ApiError(404, f"Year not found: {year}")
+    return year
+
+
+def parse_dynamics(query):
+    sort = query.get('sort', ['mean_rank_change'])[0]
+    if sort not in DYNAMICS_METRICS:
+        raise ApiError(400, f"Unknown metric: {sort}")
+    order = query.get('order', [None])[0]
+    status = query.get('status', [None])[0]
+    if order not in (None, 'asc', 'desc') or status not in (None, 'active', 'exited'):
+        raise ApiError(400, "order must be asc or desc and status active or exited")
+    return {'sort': sort, 'ascending': None if order is None else order == 'asc',
+            'min_years': parse_int(query, 'min_years', 1, 1), 'status': status,
+            'sectors': tuple(query.get('sector', []))}
+
+
+def export_params(engine, name, query):
+    # معاملات كل تصدير بنفس صيغة المسارات المقابلة في الـ API
+    if name == 'year':
+        return {'year': parse_year(engine, query.get('year', [None])[0])}
+    if name == 'company':
+        return {'company_id': parse_company(engine, query.get('company', [None])[0],
+                                            query.get('id', [None])[0])}
+    if name == 'compare':
+        years = tuple(sorted({parse_year(engine, text) for text in query.get('year', [])}))
+        if len(years) < 2:
+            raise ApiError(400, "At least two distinct years")
+        return {'years': years}
+    if name == 'dynamics':
+        return parse_dynamics(query)
+    if name == 'predictions':
+        return {'name': query.get('name', ['test'])[0]}
+    if name == 'test_predictions':
+        return {}
+    raise ApiError(404, f"Unknown export: {name}")
+
+
+def parse_company(engine, name=None, company_id=None):
+    # المعرف يُمرر صراحةً: بعض أسماء الشركات أرقام مثل "1" و"53"
+    if company_id is not None:
+        try:
+            company_id = int(company_id)
+        except ValueError:
+            raise ApiError(400, f"Invalid id: {company_id!r}")
+    elif name:
+        company_id = engine.company_id(name)
+    else:
+        raise ApiError(400, "A company name or id is required")
+    if company_id is None or not engine.has_company(company_id):
+        raise ApiError(404, f"Company not found: {name if name is not None else company_id}")
+    return company_id
+
+
+def parse_int(query, name, default, minimum=None):
+    try:
+        value = int(query.get(name, [default])[0])
+    except ValueError:
+        raise ApiError(400, f"Invalid {name}")
+    if minimum is not None and value < minimum:
+        raise ApiError(400, f"{name} must be at least {minimum}")
+    return value
+
+
+def route(engine, method, path, query, body=None):
+    parts = [unquote(p) for p in path.strip('/').split('/') if p]
+
+    if method == 'POST':
+        if parts == ['companies', 'history']:
+            if not isinstance(body, dict):
+                raise ApiError(400, "Body must be {\"names\": [...]}")
+            names = body.get('names')
+            if not isinstance(names, list):
+                raise ApiError(400, "Body must be {\"names\": [...]}")
+            return history_batch(engine, names)
+        raise ApiError(404, "Not found")
+
+    if parts == ['health']:
+        return {'status': 'ok', 'version': engine.version}
+    if parts == ['metrics']:
+        return registry.snapshot()
+    if parts == ['years']:
+        return engine.years()
+    if parts == ['overview']:
+        return engine.overview()
+    if parts == ['compare'] and 'year' in query:
+        years = [parse_year(engine, text) for text in query['year']]
+        if len(set(years)) < 2:
+            raise ApiError(400, "At least two distinct years")
+        comparison = engine.compare_many_years(years)
+        # السنة في فهرس الجدول، و to_payload لا يحتفظ بالفهرس
+        return {**comparison, 'years': comparison['years'].reset_index()}
+    if parts in (['compare'], ['movers'], ['turnover']):
+        y1 = parse_year(engine, query.get('y1', [None])[0])
+        y2 = parse_year(engine, query.get('y2', [None])[0])
+        if parts == ['movers']:
+            return engine.rank_movers(y1, y2, parse_int(query, 'n', 10, 1))
+        if parts == ['turnover']:
+            return engine.turnover(y1, y2)
+        return engine.compare_years(y1, y2)
+    if parts[:1] == ['years'] and len(parts) in (2, 3):
+        year = parse_year(engine, parts[1])
+        if len(parts) == 2:
+            return engine.year_summary(year)
+        if parts[2] == 'top':
+            return engine.top_companies(year, parse_int(query, 'n', 15, 1))
+        if parts[2] == 'industries':
+            return engine.industries(year, parse_int(query, 'n', 15, 1)).reset_index()
+        if parts[2] == 'sectors':
+            return engine.sectors(year).reset_index()
+    if parts == ['dynamics']:
+        params = parse_dynamics(query)
+        return engine.dynamics(params['sort'], params['ascending'], parse_int(query, 'n', DYNAMICS_N, 1),
+                               params['min_years'], params['status'], list(params['sectors']))
+    if parts == ['survival']:
+        return engine.survival()
+    if parts == ['companies']:
+        return engine.companies(query.get('prefix', [None])[0], parse_int(query, 'limit', 0, 0) or None)
+    if parts == ['search']:
+        ids = engine.search_companies(query.get('q', [''])[0], parse_int(query, 'limit', SEARCH_LIMIT, 1))
+        return [{'id': company_id, 'name': engine.company_name(company_id)} for company_id in ids]
+    if parts == ['companies', 'history']:
+        return history_batch(engine, query.get('name', []))
+    if parts == ['company', 'history']:
+        return engine.company_history(parse_company(engine, company_id=query.get('id', [None])[0]))
+    if len(parts) == 3 and parts[0] == 'company' and parts[2] == 'history':
+        return engine.company_history(parse_company(engine, parts[1]))
+    raise ApiError(404, "Not found")
+
+
+def cache_years(path, query):
+    # السنوات التي يعتمد عليها الرد: مفتاحه يبقى صالحاً ما لم تتغير هذه السنوات
+    parts = [p for p in path.strip('/').split('/') if p]
+    try:
+        if parts[:1] == ['years'] and len(parts) > 1:
+            return (int(parts[1]),)
+        if parts == ['compare'] and 'year' in query:
+            return tuple(int(year) for year in query['year'])
+        if parts in (['compare'], ['movers'], ['turnover']):
+            return (int(query['y1'][0]), int(query['y2'][0]))
+    except (KeyError, ValueError):
+        pass
+    return None
+
+
+def history_batch(engine, names):
+    if len(names) > MAX_BATCH:
+        raise ApiError(400, f"At most {MAX_BATCH} companies per request")
+    # كل اسم مطلوب يُحوّل إلى معرف، والرد مفهرس بالأسماء كما طُلبت
+    ids = {name: engine.company_id(str(name)) for name in names}
+    frame = engine.company_histories(list(dict.fromkeys(i for i in ids.values() if i is not None)))
+    groups = {company_id: group.drop(columns=['company_id', 'name'])
+              for company_id, group in frame.groupby('company_id', sort=False)}
+    return {
+        'companies': {name: to_payload(groups[company_id]) for name, company_id in ids.items()
+                      if company_id in groups},
+        'missing': [name for name, company_id in ids.items() if company_id is None],
+    }
+
+
+class RefreshThrottle:
+    """Calls ``engine.refresh`` at most once every ``seconds``."""
+
+    def __init__(self, engine, seconds=REFRESH_SECONDS):
+        self.engine = engine
+        self.seconds = seconds
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next:
+                return
+            self._next = now + self.seconds
+        # طلب واحد فقط في كل فترة يفحص الملفات، والبقية تستخدم الإصدار الحالي
+        self.engine.refresh()
+
+
+def make_handler(engine, refresh_seconds=REFRESH_SECONDS):
+    refresh = RefreshThrottle(engine, refresh_seconds)
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = 'Fortune500API/1.0'
+
+        def do_GET(self):
+            refresh()
+            url = urlparse(self.path)
+            if url.path.startswith('/export/'):
+                self.stream(url)
+                return
+            if url.path.rstrip('/') in UNCACHED_PATHS:
+                self.respond(lambda: self.encode('GET', url))
+                return
+            # الردود على GET تُخزن كنص JSON جاهز حسب المسار والاستعلام
+            query = parse_qs(url.query)
+            key = ('GET', url.path, tuple(sorted((name, tuple(values)) for name, values in query.items())))
+            self.respond(lambda: engine.cached(key, lambda: self.encode('GET', url), cache_years(url.path, query)))
+
+        def do_POST(self):
+            refresh()
+            url = urlparse(self.path)
+            self.respond(lambda: self.encode('POST', url))
+
+        def encode(self, method, url):
+            body = None
+            if method == 'POST':
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except json.JSONDecodeError:
+                    raise ApiError(400, "Invalid JSON body")
+            result = route(engine, method, url.path, parse_qs(url.query), body)
+            return json.dumps(to_payload(result), ensure_ascii=False).encode('utf-8')
+
+        def respond(self, produce):
+            try:
+                status, payload = 200, produce()
+            except ApiError as e:
+                status, payload = e.status, json.dumps({'error': str(e)}).encode('utf-8')
+            except Exception as e:
+                status, payload = 500, json.dumps({'error': f"{type(e).__name__}: {e}"}).encode('utf-8')
+            self.send_json(status, payload)
+
+        def send_error_json(self, status, message):
+            self.send_json(status, json.dumps({'error': message}).encode('utf-8'))
+
+        def send_json(self, status, payload):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def stream(self, url):
+            # الملف يُرسل جزءاً بجزء بدون Content-Length، وينتهي الرد بإغلاق الاتصال
+            query = parse_qs(url.query)
+            name = unquote(url.path[len('/export/'):].strip('/'))
+            try:
+                params = export_params(engine, name, query)
+                filename, mime, chunks = export(engine, name, query.get('format', ['csv'])[0], **params)
+            except ApiError as e:
+                self.send_error_json(e.status, str(e))
+                return
+            except (KeyError, ValueError) as e:
+                self.send_error_json(400, e.args[0] if e.args else str(e))
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', mime)
+            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+            self.end_headers()
+            try:
+                for chunk in chunks:
+                    self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # العميل أغلق الاتصال: الملف المؤقت يُحذف عند إغلاق المولد
+                chunks.close()
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(engine=None, host='127.0.0.1', port=8500, refresh_seconds=REFRESH_SECONDS):
+    engine = engine or Fortune500Engine()
+    server = ThreadingHTTPServer((host, port), make_handler(engine, refresh_seconds))
+    server.daemon_threads = True
+    server.engine = engine
+    registry.register_cache('engine', engine.cache)
+    if engine.cache.store is not None:
+        registry.register_cache('engine (disk)', engine.cache.store)
+    return server
+
+
+def start_in_background(engine=None, host='127.0.0.1', port=8500):
+    server = make_server(engine, host, port)
+    threading.Thread(target=server.serve_forever, name='fortune500-api', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fortune 500 analytics API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8500)
+    args = parser.parse_args()
+    server = make_server(host=args.host, port=args.port)
+    print(f"Serving on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
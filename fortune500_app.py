@@ -1,11 +1,14 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import base64
+import os
 import warnings
+from fortune500_data import load_all, dataset_version
+import fortune500_metrics as metrics
+from fortune500_cache import LRUCache, open_store
+from fortune500_engine import Fortune500Engine
+from fortune500_prefetch import Prefetcher
+import views
 warnings.filterwarnings('ignore')
 
 st.set_page_config(
@@ -15,17 +18,23 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+STATIC_DIR = "static"
+
+@st.cache_resource
 def get_base64_of_image(image_path):
     with open(image_path, "rb") as f:
         data = f.read()
     return base64.b64encode(data).decode()
 
-# تحميل الصور
-background_image_path = r"background.jpeg"
-profile_image_path = r"devleoper.jpeg"
+def image_url(file_name):
+    # مع enableStaticServing يحمّل المتصفح الصورة مرة واحدة ويحفظها في الـ cache
+    if st.get_option("server.enableStaticServing"):
+        return f"app/static/{file_name}"
+    return f"data:image/jpeg;base64,{get_base64_of_image(os.path.join(STATIC_DIR, file_name))}"
 
-background_image_base64 = get_base64_of_image(background_image_path)
-profile_image_base64 = get_base64_of_image(profile_image_path)
+# تحميل الصور
+background_image_url = image_url("background.jpeg")
+profile_image_url = image_url("devleoper.jpeg")
 
 # تهيئة حالة الشريط الجانبي في session state
 if 'lang' not in st.session_state:
@@ -54,7 +63,7 @@ header {{
 
 /* تنسيق خلفية التطبيق */
 .stApp {{
-    background-image: url("data:image/jpeg;base64,{background_image_base64}");
+    background-image: url("{background_image_url}");
     background-size: cover;
     background-attachment: fixed;
     background-position: center;
@@ -307,7 +316,7 @@ st.markdown(f"""
 with st.sidebar:
     st.markdown(f"""
     <div class="developer-profile">
-        <img src="data:image/jpeg;base64,{profile_image_base64}" class="developer-image" alt="Developer">
+        <img src="{profile_image_url}" class="developer-image" alt="Developer">
         <div class="developer-name">Mohammad Naser</div>
     </div> 
     """, unsafe_allow_html=True)
@@ -316,376 +325,87 @@ with st.sidebar:
     
     st.markdown("<hr style='margin: 15px 0;'>", unsafe_allow_html=True)
 
-    if st.session_state.lang == "English":
-        menu_options = [
-            " Year Analysis",
-            " Company Analysis",
-            " Year Comparison",
-            " Predictions & Models",
-            " Data Overview"
-        ]
-    else:
-        menu_options = [
-            " تحليل السنوات",
-            " تحليل الشركات",
-            " مقارنة السنوات",
-            " التوقعات والنماذج",
-            " نظرة عامة"
-        ]
-    
     st.session_state.menu = st.radio(
         "Select Analysis" if st.session_state.lang == "English" else "اختر التحليل",
-        menu_options,
+        views.menu_options(st.session_state.lang),
         key="analysis_menu_radio"
     )
     
     st.markdown("<hr style='margin: 15px 0;'>", unsafe_allow_html=True)
 
 # ==================== DATA LOADING ====================
-@st.cache_data
-def load_data():
-    files = {}
-    try:
-        files['main'] = pd.read_csv('fortune500_cleaned.csv')
-        st.sidebar.success(f" Main: {len(files['main']):,} rows")
-    except:
-        files['main'] = pd.DataFrame()
-    try:
-        files['pred2024'] = pd.read_csv('fortune500_2024_predictions.csv')
-        st.sidebar.success(f" 2024: {len(files['pred2024']):,} rows")
-    except:
-        files['pred2024'] = pd.DataFrame()
-    try:
-        files['models'] = pd.read_csv('fortune500_models_performance.csv')
-        st.sidebar.success(f" Models: {len(files['models'])} models")
-    except:
-        files['models'] = pd.DataFrame()
-    try:
-        files['test'] = pd.read_csv('fortune500_test_predictions.csv')
-        st.sidebar.success(f" Test: {len(files['test']):,} rows")
-    except:
-        files['test'] = pd.DataFrame()
-    return files
-
-data = load_data()
+# البيانات تُحمّل مرة واحدة لكل عملية وتُشارك بين جميع الجلسات بدون نسخ
+# (ملفات التوقعات تحملها صفحتها عند أول زيارة)
+@st.cache_resource(max_entries=2)
+def load_data(version):
+    return load_all(['main'])
+
+diagnostics = metrics.env_enabled() or st.query_params.get("diagnostics") == "1"
+timer = metrics.RerunTimer(page=st.session_state.menu.strip())
+
+def timed(stage, func, *args, **kwargs):
+    with timer.stage(stage):
+        return func(*args, **kwargs)
+
+data = timed('data load', load_data, dataset_version('main'))
 df = data['main']
 
 if df.empty:
     st.error("Main data file not found!" if st.session_state.lang == "English" else "ملف البيانات الرئيسي غير موجود!")
     st.stop()
 
-df['profit_margin'] = (df['profit_mil'] / df['revenue_mil']) * 100
-
-# ==================== MAIN CONTENT BASED ON SELECTION ====================
-menu = st.session_state.menu
-
-if menu == " Year Analysis" or menu == " تحليل السنوات":
-    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-    st.header(" Year Analysis" if st.session_state.lang == "English" else " تحليل السنوات")
-    col1, col2 = st.columns([3,1])
-    with col1:
-        year = st.selectbox("Select Year" if st.session_state.lang == "English" else "اختر السنة", sorted(df['year'].unique(), reverse=True))
-    with col2:
-        top_n = st.number_input("Companies" if st.session_state.lang == "English" else "الشركات", 5, 50, 15)
-    df_year = df[df['year'] == year]
-    if not df_year.empty:
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Companies" if st.session_state.lang == "English" else "الشركات", f"{len(df_year):,}")
-        with col2:
-            st.metric("Total Revenue" if st.session_state.lang == "English" else "إجمالي الإيرادات", f"${df_year['revenue_mil'].sum():,.0f}M")
-        with col3:
-            st.metric("Avg Revenue" if st.session_state.lang == "English" else "متوسط الإيرادات", f"${df_year['revenue_mil'].mean():,.0f}M")
-        with col4:
-            st.metric("Avg Margin" if st.session_state.lang == "English" else "متوسط الهامش", f"{df_year['profit_margin'].mean():.1f}%")
-        
-        tabs = st.tabs([
-            "Top Companies" if st.session_state.lang == "English" else "أفضل الشركات",
-            "Revenue Distribution" if st.session_state.lang == "English" else "توزيع الإيرادات",
-            "Industry Analysis" if st.session_state.lang == "English" else "تحليل الصناعات"
-        ])
-        
-        with tabs[0]:
-            top = df_year.nlargest(top_n, 'revenue_mil')
-            fig = px.bar(top, x='revenue_mil', y='name', orientation='h',
-                        title=f"{'Top' if st.session_state.lang == 'English' else 'أفضل'} {top_n} {'Companies' if st.session_state.lang == 'English' else 'شركة'} - {year}",
-                        color='revenue_mil', color_continuous_scale='gray')
-            fig.update_layout(height=500, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                            font=dict(color='white', size=12), title_font_color='white')
-            st.plotly_chart(fig, use_container_width=True)
-            st.dataframe(top[['rank','name','revenue_mil','profit_mil','profit_margin','industry']], use_container_width=True)
-        
-        with tabs[1]:
-            fig = px.histogram(df_year, x='revenue_mil', nbins=50, 
-                             title="Revenue Distribution" if st.session_state.lang == "English" else "توزيع الإيرادات")
-            fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                            height=400, font=dict(color='white'), title_font_color='white')
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with tabs[2]:
-            ind = df_year.groupby('industry').agg({'revenue_mil':'sum','profit_margin':'mean'}).sort_values('revenue_mil', ascending=False).head(15)
-            col1, col2 = st.columns(2)
-            with col1:
-                fig1 = px.bar(ind.reset_index(), x='revenue_mil', y='industry', orientation='h',
-                            title="Revenue by Industry" if st.session_state.lang == "English" else "الإيرادات حسب الصناعة",
-                            color='revenue_mil', color_continuous_scale='gray')
-                fig1.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                                 height=500, font=dict(color='white'), title_font_color='white')
-                st.plotly_chart(fig1, use_container_width=True)
-            with col2:
-                fig2 = px.bar(ind.reset_index(), x='profit_margin', y='industry', orientation='h',
-                            title="Margin by Industry" if st.session_state.lang == "English" else "الهامش حسب الصناعة",
-                            color='profit_margin', color_continuous_scale='gray')
-                fig2.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                                 height=500, font=dict(color='white'), title_font_color='white')
-                st.plotly_chart(fig2, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-elif menu == " Company Analysis" or menu == " تحليل الشركات":
-    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-    st.header(" Company Analysis" if st.session_state.lang == "English" else " تحليل الشركات")
-    company = st.selectbox("Select Company" if st.session_state.lang == "English" else "اختر الشركة", sorted(df['name'].unique()))
-    df_comp = df[df['name'] == company].sort_values('year')
-    if not df_comp.empty:
-        latest = df_comp.iloc[-1]
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Years in List" if st.session_state.lang == "English" else "السنوات في القائمة", len(df_comp))
-        with col2:
-            st.metric("Latest Revenue" if st.session_state.lang == "English" else "آخر إيرادات", f"${latest['revenue_mil']:,.0f}M")
-        with col3:
-            st.metric("Latest Rank" if st.session_state.lang == "English" else "آخر ترتيب", f"#{int(latest['rank'])}")
-        with col4:
-            st.metric("Latest Margin" if st.session_state.lang == "English" else "آخر هامش", f"{latest['profit_margin']:.1f}%")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            fig1 = px.line(df_comp, x='year', y='revenue_mil', 
-                         title="Revenue Trend" if st.session_state.lang == "English" else "اتجاه الإيرادات", markers=True)
-            fig1.update_traces(line=dict(color='#A0AEC0', width=3), marker=dict(color='#A0AEC0', size=8))
-            fig1.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                             height=400, font=dict(color='white'), title_font_color='white')
-            st.plotly_chart(fig1, use_container_width=True)
-        
-        with col2:
-            fig2 = px.line(df_comp, x='year', y='rank', 
-                         title="Rank Trend" if st.session_state.lang == "English" else "اتجاه الترتيب", markers=True)
-            fig2.update_traces(line=dict(color='#718096', width=3), marker=dict(color='#718096', size=8))
-            fig2.update_yaxes(autorange="reversed")
-            fig2.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                             height=400, font=dict(color='white'), title_font_color='white')
-            st.plotly_chart(fig2, use_container_width=True)
-        
-        st.subheader("Historical Data" if st.session_state.lang == "English" else "البيانات التاريخية")
-        st.dataframe(df_comp[['year','rank','revenue_mil','profit_mil','profit_margin']], use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-elif menu == " Year Comparison" or menu == " مقارنة السنوات":
-    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-    st.header(" Year Comparison" if st.session_state.lang == "English" else " مقارنة السنوات")
-    years = sorted(df['year'].unique(), reverse=True)
-    col1, col2 = st.columns(2)
-    with col1:
-        y1 = st.selectbox("First Year" if st.session_state.lang == "English" else "السنة الأولى", years, index=3)
-    with col2:
-        y2 = st.selectbox("Second Year" if st.session_state.lang == "English" else "السنة الثانية", years, index=0)
-    
-    if y1 != y2:
-        d1 = df[df['year'] == y1]
-        d2 = df[df['year'] == y2]
-        rev_growth = ((d2['revenue_mil'].sum() - d1['revenue_mil'].sum()) / d1['revenue_mil'].sum()) * 100
-        avg_growth = ((d2['revenue_mil'].mean() - d1['revenue_mil'].mean()) / d1['revenue_mil'].mean()) * 100
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Revenue Growth" if st.session_state.lang == "English" else "نمو الإيرادات", f"{rev_growth:+.1f}%")
-        with col2:
-            st.metric("Avg Growth" if st.session_state.lang == "English" else "متوسط النمو", f"{avg_growth:+.1f}%")
-        with col3:
-            st.metric("Companies Change" if st.session_state.lang == "English" else "تغير الشركات", f"{len(d2)-len(d1):+d}")
-        
-        comp = pd.DataFrame({
-            "Year" if st.session_state.lang == "English" else "السنة": [str(y1), str(y2)],
-            "Total Revenue" if st.session_state.lang == "English" else "إجمالي الإيرادات": [d1['revenue_mil'].sum(), d2['revenue_mil'].sum()],
-            "Avg Revenue" if st.session_state.lang == "English" else "متوسط الإيرادات": [d1['revenue_mil'].mean(), d2['revenue_mil'].mean()],
-            "Companies" if st.session_state.lang == "English" else "الشركات": [len(d1), len(d2)]
-        })
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(name="Total Revenue" if st.session_state.lang == "English" else "إجمالي الإيرادات", 
-                            x=comp["Year" if st.session_state.lang == "English" else "السنة"], 
-                            y=comp["Total Revenue" if st.session_state.lang == "English" else "إجمالي الإيرادات"],
-                            marker_color='#A0AEC0'))
-        fig.add_trace(go.Bar(name="Avg Revenue" if st.session_state.lang == "English" else "متوسط الإيرادات", 
-                            x=comp["Year" if st.session_state.lang == "English" else "السنة"], 
-                            y=comp["Avg Revenue" if st.session_state.lang == "English" else "متوسط الإيرادات"],
-                            marker_color='#718096'))
-        fig.update_layout(barmode='group', height=400, 
-                         plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                         font=dict(color='white', size=12), title_font_color='white',
-                         legend_font_color='white')
+st.sidebar.success(f" Main: {len(df):,} rows")
+
+# محرك واحد لكل عملية: عند وصول سنة جديدة يُحدّث في مكانه بدلاً من إعادة بنائه
+@st.cache_resource
+def get_engine(_data):
+    engine = Fortune500Engine(_data)
+    # تشغيل الـ API داخل نفس العملية حتى يشارك المحرك نفسه مع الواجهة
+    if os.environ.get('FORTUNE500_API_PORT'):
+        from fortune500_api import start_in_background
+        start_in_background(engine, os.environ.get('FORTUNE500_API_HOST', '127.0.0.1'),
+                            int(os.environ['FORTUNE500_API_PORT']))
+    metrics.registry.register_cache('engine', engine.cache)
+    if engine.cache.store is not None:
+        metrics.registry.register_cache('engine (disk)', engine.cache.store)
+    return engine
+
+engine = timed('data load', get_engine, data)
+timed('aggregation', engine.refresh, data)
+timed('aggregation', lambda: engine.cube)
+
+@st.cache_resource
+def get_figure_cache():
+    # مع FORTUNE500_CACHE_DIR تُحفظ الأشكال أيضاً على القرص فتبدأ النسخ الجديدة دافئة
+    cache = LRUCache(maxsize=256, store=open_store('figures'))
+    metrics.registry.register_cache('figures', cache)
+    if cache.store is not None:
+        metrics.registry.register_cache('figures (disk)', cache.store)
+    return cache
+
+figure_cache = get_figure_cache()
+
+@st.cache_resource
+def get_prefetcher():
+    prefetcher = Prefetcher()
+    metrics.registry.register_cache('prefetch', prefetcher)
+    return prefetcher
+
+prefetcher = get_prefetcher()
+# تشغيل جديد يلغي ما تبقى من التحميل المسبق للتشغيل السابق في هذه الجلسة قبل الرسم
+prefetcher.cancel(st.session_state.get('prefetch'))
+prefetch_tasks = []
+
+def chart(key, builder):
+    with timer.stage('figure build'):
+        fig = figure_cache.get_or_build(key, builder)
+    with timer.stage('render'):
         st.plotly_chart(fig, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+lang = st.session_state.lang
 
-elif menu == " Predictions & Models" or menu == " التوقعات والنماذج":
-    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-    st.header(" Predictions & AI Models" if st.session_state.lang == "English" else " التوقعات والنماذج الذكية")
-    
-    if not data['pred2024'].empty:
-        st.subheader("2024 Predictions" if st.session_state.lang == "English" else "توقعات 2024")
-        df_pred = data['pred2024']
-        
-        revenue_col = None
-        name_col = None
-        rank_col = None
-        
-        for col in df_pred.columns:
-            col_lower = col.lower()
-            if 'revenue' in col_lower or 'rev' in col_lower or 'pred' in col_lower:
-                revenue_col = col
-            if 'name' in col_lower or 'company' in col_lower:
-                name_col = col
-            if 'rank' in col_lower:
-                rank_col = col
-        
-        if revenue_col is None and len(df_pred.select_dtypes(include=[np.number]).columns) > 0:
-            revenue_col = df_pred.select_dtypes(include=[np.number]).columns[0]
-        
-        display_cols = []
-        if name_col:
-            display_cols.append(name_col)
-        if revenue_col:
-            display_cols.append(revenue_col)
-        if rank_col:
-            display_cols.append(rank_col)
-        
-        if revenue_col and name_col:
-            df_pred_sorted = df_pred.sort_values(revenue_col, ascending=False).head(20)
-            fig = px.bar(df_pred_sorted, x=revenue_col, y=name_col, orientation='h',
-                        title="Top 20 Predicted Companies 2024" if st.session_state.lang == "English" else "أفضل 20 شركة متوقعة 2024",
-                        color=revenue_col, color_continuous_scale='gray')
-            fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                            height=500, font=dict(color='white'), title_font_color='white')
-            st.plotly_chart(fig, use_container_width=True)
-        
-        if display_cols:
-            st.dataframe(df_pred[display_cols].head(50), use_container_width=True)
-        else:
-            st.dataframe(df_pred.head(50), use_container_width=True)
-    else:
-        st.info("2024 predictions file not available" if st.session_state.lang == "English" else "ملف توقعات 2024 غير متوفر")
-    
-    if not data['models'].empty:
-        st.subheader("Model Performance" if st.session_state.lang == "English" else "أداء النماذج")
-        df_models = data['models']
-        
-        model_col = None
-        accuracy_col = None
-        
-        for col in df_models.columns:
-            col_lower = col.lower()
-            if 'model' in col_lower or 'name' in col_lower:
-                model_col = col
-            if 'acc' in col_lower or 'score' in col_lower or 'r2' in col_lower:
-                accuracy_col = col
-        
-        if accuracy_col:
-            if model_col:
-                fig = px.bar(df_models, x=model_col, y=accuracy_col, 
-                           title="Model Accuracy" if st.session_state.lang == "English" else "دقة النماذج",
-                           color=accuracy_col, color_continuous_scale='gray')
-                fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                                height=400, xaxis_tickangle=45, font=dict(color='white'), 
-                                title_font_color='white')
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                fig = px.bar(df_models, y=accuracy_col, 
-                           title="Model Accuracy" if st.session_state.lang == "English" else "دقة النماذج",
-                           color=accuracy_col, color_continuous_scale='gray')
-                fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                                height=400, font=dict(color='white'), title_font_color='white')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        st.dataframe(df_models, use_container_width=True)
-    
-    if not data['test'].empty:
-        st.subheader("Test Predictions" if st.session_state.lang == "English" else "توقعات الاختبار")
-        df_test = data['test']
-        
-        actual_col = None
-        predicted_col = None
-        
-        for col in df_test.columns:
-            col_lower = col.lower()
-            if 'actual' in col_lower or 'true' in col_lower:
-                actual_col = col
-            if 'pred' in col_lower or 'predict' in col_lower:
-                predicted_col = col
-        
-        if actual_col and predicted_col:
-            fig = px.scatter(df_test.head(100), x=actual_col, y=predicted_col,
-                           title="Actual vs Predicted" if st.session_state.lang == "English" else "الفعلية مقابل المتوقعة",
-                           labels={actual_col: "Actual" if st.session_state.lang == "English" else "فعلية", 
-                                  predicted_col: "Predicted" if st.session_state.lang == "English" else "متوقعة"})
-            fig.update_traces(marker=dict(color='#A0AEC0', size=5))
-            fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                            height=500, font=dict(color='white'), title_font_color='white')
-            st.plotly_chart(fig, use_container_width=True)
-        
-        st.dataframe(df_test.head(50), use_container_width=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-else:  # Data Overview
-    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-    st.header(" Data Overview" if st.session_state.lang == "English" else "نظرة عامة")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total Years" if st.session_state.lang == "English" else "إجمالي السنوات", df['year'].nunique())
-    with col2:
-        st.metric("Unique Companies" if st.session_state.lang == "English" else "الشركات الفريدة", df['name'].nunique())
-    with col3:
-        st.metric("Total Revenue" if st.session_state.lang == "English" else "إجمالي الإيرادات", f"${df['revenue_mil'].sum()/1000000:,.1f}T")
-    with col4:
-        st.metric("Avg Annual Growth" if st.session_state.lang == "English" else "متوسط النمو السنوي", 
-                 f"{df.groupby('year')['revenue_mil'].mean().pct_change().mean()*100:.1f}%")
-    
-    yearly = df.groupby('year').agg({'revenue_mil':'mean','profit_mil':'mean','profit_margin':'mean'}).reset_index()
-    
-    fig = make_subplots(rows=3, cols=1, 
-                       subplot_titles=(
-                           "Average Revenue Trend" if st.session_state.lang == "English" else "اتجاه متوسط الإيرادات",
-                           "Average Profit Trend" if st.session_state.lang == "English" else "اتجاه متوسط الأرباح",
-                           "Average Margin Trend" if st.session_state.lang == "English" else "اتجاه متوسط الهامش"
-                       ))
-    
-    fig.add_trace(go.Scatter(x=yearly['year'], y=yearly['revenue_mil'], 
-                            name="Revenue" if st.session_state.lang == "English" else "الإيرادات", 
-                            line=dict(color='#A0AEC0', width=3)), row=1, col=1)
-    fig.add_trace(go.Scatter(x=yearly['year'], y=yearly['profit_mil'], 
-                            name="Profit" if st.session_state.lang == "English" else "الأرباح", 
-                            line=dict(color='#48BB78', width=3)), row=2, col=1)
-    fig.add_trace(go.Scatter(x=yearly['year'], y=yearly['profit_margin'], 
-                            name="Margin" if st.session_state.lang == "English" else "الهامش", 
-                            line=dict(color='#ECC94B', width=3)), row=3, col=1)
-    
-    fig.update_layout(height=700, showlegend=True, 
-                     plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                     font=dict(color='white', size=12), title_font_color='white',
-                     legend_font_color='white')
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    top = df.groupby('name')['revenue_mil'].max().nlargest(15)
-    fig2 = px.bar(x=top.values, y=top.index, orientation='h',
-                 title="Top 15 Companies All Time" if st.session_state.lang == "English" else "أفضل 15 شركة على الإطلاق",
-                 color=top.values, color_continuous_scale='gray')
-    fig2.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
-                      height=500, font=dict(color='white', size=12), title_font_color='white')
-    st.plotly_chart(fig2, use_container_width=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+# ==================== MAIN CONTENT BASED ON SELECTION ====================
+# كل صفحة وحدة مستقلة تُستورد عند أول زيارة لها مع ما تحتاجه من مكتبات وبيانات
+views.render(st.session_state.menu, views.Page(data, engine, lang, chart, timed, prefetch_tasks))
 
 # ==================== FOOTER ====================
 st.markdown(f"""
@@ -701,3 +421,20 @@ st.markdown(f"""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+# ==================== PREFETCH ====================
+# بعد اكتمال الرسم فقط، حتى لا يبطئ التحميل المسبق الصفحة الحالية
+st.session_state.prefetch = prefetcher.submit(figure_cache, prefetch_tasks)
+
+# ==================== DIAGNOSTICS ====================
+if diagnostics:
+    metrics.configure_log()
+    record = metrics.finish(timer, session=st.runtime.scriptrunner.get_script_run_ctx().session_id
+                            if st.runtime.exists() else None)
+    with st.sidebar.expander("Diagnostics" if lang == "English" else "التشخيص", expanded=True):
+        st.caption(f"{timer.page} · {record['total_s'] * 1000:,.0f} ms · RSS {record['rss_mb']:,.0f} MB")
+        st.dataframe(pd.DataFrame({'ms': {name: seconds * 1000 for name, seconds in record['stages_s'].items()}}).round(1),
+                     use_container_width=True)
+        frames_mb = {name: size / 2**20 for name, size in data.memory_usage().items()}
+        st.dataframe(pd.DataFrame({'MB': frames_mb}).round(2), use_container_width=True)
+        st.dataframe(pd.DataFrame(metrics.registry.cache_stats()).T, use_container_width=True)
@@ -0,0 +1,192 @@
+"""Model artifact bundle: typed metrics, full prediction vectors and a manifest.
+
+Layout of a bundle directory::
+
+    manifest.json        models, files, column names, target and features
+    metrics.parquet      one row per model (RMSE, MAE, R2, MAPE as float64)
+    y_true.npy           actual values of the evaluation rows
+    keys.parquet         company / year of each evaluation row
+    predictions/<slug>.npy
+    models/<slug>.joblib fitted estimators (bundles written by the training pipeline)
+    backtest.parquet     walk-forward metrics per model and cutoff year (optional)
+
+``python fortune500_artifacts.py`` converts the legacy CSV outputs of the
+training notebook into a bundle.
+"""
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from fortune500_data import DATA_DIR, DATASETS, content_hash
+
+ARTIFACT_DIR = os.environ.get('FORTUNE500_ARTIFACT_DIR', os.path.join(DATA_DIR, 'artifacts'))
+BUNDLE_FORMAT = 1
+METRIC_COLUMNS = ['RMSE', 'MAE', 'R2', 'MAPE']
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def regression_metrics(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype='float64')
+    y_pred = np.asarray(y_pred, dtype='float64')
+    errors = y_pred - y_true
+    ss_res = np.sum(errors ** 2)
+    ss_tot = np.sum((y_true - y_true.mean()) ** 2)
+    return {
+        'RMSE': float(np.sqrt(np.mean(errors ** 2))),
+        'MAE': float(np.mean(np.abs(errors))),
+        'R2': float(1 - ss_res / ss_tot) if ss_tot else np.nan,
+        'MAPE': float(np.mean(np.abs(errors / y_true)) * 100),
+    }
+
+
+def write_bundle(y_true, predictions, keys=None, metrics=None, path=None, model_files=None, **manifest_fields):
+    path = path or ARTIFACT_DIR
+    tmp = path.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(os.path.join(tmp, 'predictions'))
+
+    # النماذج المحفوظة مسبقاً تُنقل إلى الحزمة بدلاً من إعادة تسلسلها
+    estimators = {}
+    for name, source in (model_files or {}).items():
+        os.makedirs(os.path.join(tmp, 'models'), exist_ok=True)
+        file_name = os.path.join('models', slugify(name) + os.path.splitext(source)[1])
+        shutil.move(source, os.path.join(tmp, file_name))
+        estimators[name] = file_name
+
+    y_true = np.asarray(y_true, dtype='float64')
+    np.save(os.path.join(tmp, 'y_true.npy'), y_true)
+    if keys is not None:
+        keys.reset_index(drop=True).to_parquet(os.path.join(tmp, 'keys.parquet'), index=False)
+
+    models = {}
+    for name, values in predictions.items():
+        values = np.asarray(values, dtype='float64')
+        if len(values) != len(y_true):
+            raise ValueError(f"{name}: {len(values)} predictions for {len(y_true)} rows")
+        file_name = os.path.join('predictions', slugify(name) + '.npy')
+        np.save(os.path.join(tmp, file_name), values)
+        models[name] = file_name
+
+    rows = dict(metrics or {})
+    for name, file_name in models.items():
+        rows.setdefault(name, regression_metrics(y_true, predictions[name]))
+    table = pd.DataFrame.from_dict(rows, orient='index').reindex(columns=METRIC_COLUMNS).astype('float64')
+    table.index.name = 'model'
+    table.reset_index().to_parquet(os.path.join(tmp, 'metrics.parquet'), index=False)
+
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'rows': int(len(y_true)),
+        'metrics': 'metrics.parquet',
+        'y_true': 'y_true.npy',
+        'keys': 'keys.parquet' if keys is not None else None,
+        'key_columns': list(keys.columns) if keys is not None else [],
+        'predictions': models,
+        'models': estimators,
+        **manifest_fields,
+    }
+    write_manifest(manifest, tmp)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+def write_manifest(manifest, path):
+    target = os.path.join(path, 'manifest.json')
+    with open(target + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(target + '.tmp', target)
+
+
+def write_backtest(table, path=None):
+    """Add (or replace) the walk-forward metrics of an existing bundle."""
+    path = path or ARTIFACT_DIR
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    table.to_parquet(os.path.join(path, 'backtest.parquet.tmp'), index=False)
+    os.replace(os.path.join(path, 'backtest.parquet.tmp'), os.path.join(path, 'backtest.parquet'))
+    manifest['backtest'] = 'backtest.parquet'
+    # يغيّر محتوى الـ manifest (ومعه bundle_version) حتى عند إعادة نفس الاختبار
+    manifest['backtest_created'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    write_manifest(manifest, path)
+    return os.path.join(path, 'backtest.parquet')
+
+
+def bundle_version(path=None):
+    manifest = os.path.join(path or ARTIFACT_DIR, 'manifest.json')
+    try:
+        return content_hash(manifest)
+    except OSError:
+        return None
+
+
+def load_bundle(path=None):
+    path = path or ARTIFACT_DIR
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported artifact format: {manifest.get('format')}")
+    # المتجهات تُقرأ عبر memory-map ولا تُحمّل بالكامل في الذاكرة
+    return {
+        'manifest': manifest,
+        'metrics': pd.read_parquet(os.path.join(path, manifest['metrics'])),
+        'y_true': np.load(os.path.join(path, manifest['y_true']), mmap_mode='r'),
+        'keys': pd.read_parquet(os.path.join(path, manifest['keys'])) if manifest.get('keys') else None,
+        'predictions': {name: np.load(os.path.join(path, file_name), mmap_mode='r')
+                        for name, file_name in manifest['predictions'].items()},
+        'backtest': (pd.read_parquet(os.path.join(path, manifest['backtest']))
+                     if manifest.get('backtest') else None),
+    }
+
+
+def test_predictions(bundle):
+    """Every test row of a loaded bundle: its keys, the actual value and each model's prediction."""
+    frame = pd.DataFrame({'Actual': np.asarray(bundle['y_true'])})
+    for name, values in bundle['predictions'].items():
+        frame[name] = np.asarray(values)
+    if bundle['keys'] is not None:
+        frame = pd.concat([bundle['keys'].reset_index(drop=True), frame], axis=1)
+    return frame
+
+
+def load_model(name, path=None):
+    import joblib
+
+    path = path or ARTIFACT_DIR
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    return joblib.load(os.path.join(path, manifest['models'][name]))
+
+
+def convert_legacy(path=None):
+    # ملف أداء النماذج القديم يحتوي على متجهات مقطوعة بـ "..."، لذلك نأخذ منه المقاييس فقط
+    models = pd.read_csv(os.path.join(DATA_DIR, DATASETS['models']), index_col=0)
+    models = models.rename(columns={'R²': 'R2'}).drop(columns=['predictions'], errors='ignore')
+    metrics = models.reindex(columns=METRIC_COLUMNS).astype('float64')
+    best_model = metrics['R2'].idxmax()
+
+    test = pd.read_csv(os.path.join(DATA_DIR, DATASETS['test']))
+    return write_bundle(
+        y_true=test['Actual_Revenue'].to_numpy(),
+        predictions={best_model: test['Predicted_Revenue'].to_numpy()},
+        keys=test[['Company', 'Year']],
+        metrics=metrics.to_dict(orient='index'),
+        path=path,
+        target='next_year_revenue',
+        best_model=best_model,
+        source='legacy-csv',
+    )
+
+
+if __name__ == "__main__":
+    print(f"Wrote {convert_legacy()}")
@@ -0,0 +1,147 @@
+"""Walk-forward backtest of the next-year revenue models.
+
+    python fortune500_backtest.py                              # every installed candidate, every cutoff
+    python fortune500_backtest.py --models "Random Forest" --first 2005 --jobs 4
+    python fortune500_backtest.py --no-warm-start              # refit every fold from scratch
+
+For each cutoff year ``t`` a model is trained on the company-years whose
+target was known by ``t`` (next appearance in or before ``t``) and scores the
+companies listed in ``t`` that appear again in ``t + 1``, so no fold sees
+data from after its forecast date.
+
+The cutoffs of each model are split into contiguous chains that run in
+parallel processes. Within a chain the model is updated between folds
+instead of refitted: new trees (Random Forest) or stages (Gradient Boosting)
+are added on the grown training set, and XGBoost / LightGBM continue
+boosting from the previous booster. Per-year metrics are written into the
+artifact bundle as ``backtest.parquet``.
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from fortune500_artifacts import METRIC_COLUMNS, regression_metrics, write_backtest
+from fortune500_features import FEATURE_COLUMNS, TARGET, feature_matrix, training_rows
+from fortune500_training import CANDIDATES, available_models
+
+ESTIMATORS = 100
+# عدد الأشجار أو المراحل المضافة في كل سنة عند التحديث التدريجي
+WARM_INCREMENT = 20
+MIN_TRAIN_ROWS = 200
+
+BACKTEST_COLUMNS = ['model', 'cutoff', 'target_year', 'train_rows', 'rows'] + METRIC_COLUMNS + ['fit_s']
+
+
+def fold_rows(rows, cutoff):
+    train = rows[rows['target_year'] <= cutoff]
+    test = rows[(rows['year'] == cutoff) & (rows['target_year'] == cutoff + 1)]
+    return train, test
+
+
+def cutoffs(rows, first=None, last=None):
+    years = []
+    for year in sorted(int(y) for y in rows['year'].unique()):
+        train, test = fold_rows(rows, year)
+        if len(train) >= MIN_TRAIN_ROWS and len(test):
+            years.append(year)
+    return [year for year in years if (first is None or year >= first) and (last is None or year <= last)]
+
+
+def chains(years, count):
+    # سلاسل متتالية: التحديث التدريجي يحتاج السنوات بالترتيب داخل كل سلسلة
+    return [list(chain) for chain in np.array_split(years, min(count, len(years))) if len(chain)]
+
+
+def run_chain(name, matrix_path, years, estimators, increment, threads, warm_start):
+    from threadpoolctl import threadpool_limits
+
+    rows = training_rows(pd.read_parquet(matrix_path))
+    candidate = CANDIDATES[name]
+    model = None
+    results = []
+    with threadpool_limits(threads):
+        for cutoff in years:
+            train, test = fold_rows(rows, cutoff)
+            X = train[FEATURE_COLUMNS].to_numpy()
+            y = train[TARGET].to_numpy()
+            start = time.perf_counter()
+            if model is None or not warm_start:
+                model = candidate['build'](estimators, threads, 0)
+                candidate['fit'](model, X, y, X[:0], y[:0], 0)
+            else:
+                model = candidate['warm'](model, X, y, increment)
+            fit_s = time.perf_counter() - start
+            predicted = model.predict(test[FEATURE_COLUMNS].to_numpy())
+            results.append({
+                'model': name,
+                'cutoff': cutoff,
+                'target_year': cutoff + 1,
+                'train_rows': len(train),
+                'rows': len(test),
+                **regression_metrics(test[TARGET].to_numpy(), predicted),
+                'fit_s': fit_s,
+            })
+    return results
+
+
+def backtest(models=None, first=None, last=None, jobs=None, estimators=ESTIMATORS,
+             increment=WARM_INCREMENT, warm_start=True, dataset=None):
+    """Per-model, per-cutoff metrics as a frame with ``BACKTEST_COLUMNS``."""
+    _, _, matrix_path = feature_matrix(dataset)
+    years = cutoffs(training_rows(pd.read_parquet(matrix_path)), first, last)
+    names = available_models(models)
+    if not names or not years:
+        return pd.DataFrame(columns=BACKTEST_COLUMNS)
+
+    cpus = os.cpu_count() or 1
+    jobs = jobs or cpus
+    # بدون تحديث تدريجي كل سنة مستقلة، ومعه سلسلة واحدة على الأقل لكل نموذج
+    per_model = len(years) if not warm_start else max(1, math.ceil(jobs / len(names)))
+    tasks = [(name, chain) for name in names for chain in chains(years, per_model)]
+    jobs = min(jobs, len(tasks))
+    threads = max(1, cpus // jobs)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_chain, name, matrix_path, chain, estimators, increment, threads, warm_start)
+                   for name, chain in tasks]
+        results = [row for future in futures for row in future.result()]
+    table = pd.DataFrame(results, columns=BACKTEST_COLUMNS).sort_values(['model', 'cutoff'], ignore_index=True)
+    return table.astype({col: 'float64' for col in METRIC_COLUMNS + ['fit_s']})
+
+
+def summarize(table):
+    return table.groupby('model').agg(folds=('cutoff', 'size'), RMSE=('RMSE', 'mean'),
+                                      MAPE=('MAPE', 'mean'), fit_s=('fit_s', 'sum'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the revenue models")
+    parser.add_argument('--models', nargs='+', help=f"subset of: {', '.join(CANDIDATES)}")
+    parser.add_argument('--first', type=int, help="first cutoff year")
+    parser.add_argument('--last', type=int, help="last cutoff year")
+    parser.add_argument('--jobs', type=int, help="parallel processes (default: one per core)")
+    parser.add_argument('--estimators', type=int, default=ESTIMATORS, help="size of a model fitted from scratch")
+    parser.add_argument('--increment', type=int, default=WARM_INCREMENT,
+                        help="trees or boosting rounds added per fold when warm-starting")
+    parser.add_argument('--no-warm-start', action='store_true')
+    parser.add_argument('--output', help="artifact bundle to add backtest.parquet to (default: artifacts/)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = backtest(args.models, args.first, args.last, args.jobs, args.estimators, args.increment,
+                     not args.no_warm_start)
+    if table.empty:
+        raise SystemExit("Nothing to backtest")
+    print(table.pivot(index='target_year', columns='model', values='MAPE').round(2).to_string())
+    print()
+    print(summarize(table).round(2).to_string())
+    print(f"\n{len(table)} folds in {time.perf_counter() - start:.1f}s, wrote {write_backtest(table, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Caches shared by the dashboard, the engine and the API.
+
+``LRUCache`` is the in-process tier. With ``FORTUNE500_CACHE_DIR`` set it is
+backed by a ``DiskCache``: a SQLite file of pickled values that survives
+restarts and can be shared by the replicas on one volume, so a new process
+starts warm. Disk entries are keyed by the cache key (which carries the
+dataset content hash) and the code version, are read only when a key is
+first requested, and the least recently used ones are evicted once the file
+exceeds ``FORTUNE500_CACHE_MB``.
+"""
+import glob
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from importlib import metadata
+
+CACHE_DIR = os.environ.get('FORTUNE500_CACHE_DIR')
+CACHE_MB = float(os.environ.get('FORTUNE500_CACHE_MB', 512))
+# المكتبات التي تدخل أنواعها في القيم المحفوظة (DataFrame وأشكال plotly)
+PICKLED_LIBRARIES = ['pandas', 'numpy', 'plotly']
+
+_code_version = None
+
+
+def code_version():
+    """Hash of the project modules and of the libraries whose objects are pickled."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha1()
+        root = os.path.dirname(os.path.abspath(__file__))
+        sources = glob.glob(os.path.join(root, 'fortune500_*.py')) + glob.glob(os.path.join(root, 'views', '*.py'))
+        for path in sorted(sources):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        for name in PICKLED_LIBRARIES:
+            try:
+                digest.update(f"{name}={metadata.version(name)}".encode())
+            except metadata.PackageNotFoundError:
+                pass
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+class DiskCache:
+    """Size-bounded persistent store of pickled values in one SQLite file."""
+
+    def __init__(self, path, max_bytes=None, version=None):
+        self.path = path
+        self.max_bytes = int(max_bytes if max_bytes is not None else CACHE_MB * 2**20)
+        self.version = version or code_version()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        # WAL يسمح للنسخ الأخرى بالقراءة أثناء الكتابة
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                         'size INTEGER NOT NULL, accessed REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+
+    def digest(self, key):
+        return hashlib.sha1(f"{self.version}|{key!r}".encode()).hexdigest()
+
+    def get(self, key, prefetch=False):
+        """``(True, value)`` for a stored key, ``(False, None)`` otherwise.
+
+        Lookups made by the prefetcher are not counted as hits or misses.
+        """
+        digest = self.digest(key)
+        with self._lock:
+            row = self._db.execute('SELECT value FROM entries WHERE key = ?', (digest,)).fetchone()
+            if row is None:
+                self.misses += not prefetch
+                return False, None
+            self._db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), digest))
+        try:
+            value = pickle.loads(row[0])
+        except Exception:
+            # قيمة تالفة أو من نسخة غير متوافقة: تُحذف وتُعامل كغياب
+            with self._lock:
+                self._db.execute('DELETE FROM entries WHERE key = ?', (digest,))
+                self.misses += not prefetch
+            return False, None
+        with self._lock:
+            self.hits += not prefetch
+        return True, value
+
+    def set(self, key, value):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(blob) > self.max_bytes:
+            return False
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                             (self.digest(key), blob, len(blob), time.time()))
+            self._evict()
+        return True
+
+    def _evict(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # الأقدم استخداماً أولاً حتى يعود الحجم تحت الحد
+        freed = 0
+        doomed = []
+        for digest, size in self._db.execute('SELECT key, size FROM entries ORDER BY accessed'):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((digest,))
+            freed += size
+        self._db.executemany('DELETE FROM entries WHERE key = ?', doomed)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM entries')
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            count, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+            return {'hits': self.hits, 'misses': self.misses, 'entries': count,
+                    'size_mb': size / 2**20, 'max_mb': self.max_bytes / 2**20}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(name):
+    """The process-wide ``DiskCache`` for ``name``, or ``None`` when persistence is off."""
+    if not CACHE_DIR:
+        return None
+    with _stores_lock:
+        if name not in _stores:
+            _stores[name] = DiskCache(os.path.join(CACHE_DIR, f'{name}.sqlite'))
+        return _stores[name]
+
+
+class LRUCache:
+    """Thread-safe bounded LRU shared by every session of the process.
+
+    Keys are tuples of the view parameters, e.g.
+    ``('year_top', year, top_n, lang, version)``. With a ``store`` a miss is
+    looked up on disk before it is built, and built values are written back.
+    Builds ahead of a request (``prefetch=True``) are counted as
+    ``prefetched``, not as misses, so the hit rate reflects user lookups.
+    """
+
+    def __init__(self, maxsize=256, store=None):
+        self.maxsize = maxsize
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, builder, prefetch=False):
+        with self._lock:
+            if key in self._items:
+                if not prefetch:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                return self._items[key]
+            if prefetch:
+                self.prefetched += 1
+            else:
+                self.misses += 1
+        # البناء خارج القفل حتى لا تنتظر الجلسات الأخرى
+        found, value = self.store.get(key, prefetch) if self.store is not None else (False, None)
+        if not found:
+            value = builder()
+            if self.store is not None:
+                self.store.set(key, value)
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.prefetched = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'prefetched': self.prefetched,
+                'size': len(self._items),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,345 @@
+"""Cleaning rules of the raw Fortune 500 list (from ``Untitled5.ipynb``).
+
+Fill values are computed once with ``compute_fill_values`` and stored, so a
+new year can be cleaned on its own with the same medians and modes as the
+history instead of recomputing them over every row.
+
+Run as a module it cleans a raw file of any size in chunks: a first pass
+collects the statistics (null counts, value counts for medians, mode counts),
+a second pass applies them and writes CSV or Parquet::
+
+    python fortune500_cleaning.py                                  # -> fortune500_cleaned.csv
+    python fortune500_cleaning.py extract.csv.gz -o cleaned.parquet --chunksize 500000
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+RAW_CSV = 'Fortune 500 Companies.csv'
+CLEANED_CSV = 'fortune500_cleaned.csv'
+NUMERIC_COLUMNS = ['market_value_mil', 'revenue_mil', 'profit_mil', 'asset_mil', 'employees']
+
+# الأعمدة الفارغة بأكثر من هذه النسبة تُحذف
+DROP_NULL_RATIO = 0.95
+# الأعمدة النصية بعدد قيم فريدة أقل من هذا تُملأ بالقيمة الأكثر تكراراً
+MODE_MAX_UNIQUE = 50
+MISSING_TEXT = 'Not Available'
+
+CHUNKSIZE = 200_000
+
+
+def coerce_numeric(df):
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def text_fill_value(series):
+    unique_count = series.nunique()
+    if 0 < unique_count < MODE_MAX_UNIQUE:
+        mode = series.mode()
+        return mode.iloc[0] if not mode.empty else MISSING_TEXT
+    return MISSING_TEXT
+
+
+def compute_fill_values(df):
+    df = coerce_numeric(df.copy())
+    null_ratio = df.isna().mean()
+    drop = [col for col in df.columns if null_ratio[col] > DROP_NULL_RATIO]
+    df = df.drop(columns=drop)
+    fill = {}
+    for col in df.columns:
+        if is_numeric(df[col]):
+            median = df[col].median()
+            fill[col] = None if pd.isna(median) else float(median)
+        else:
+            fill[col] = text_fill_value(df[col])
+    float_columns = [col for col in df.columns if pd.api.types.is_float_dtype(df[col])]
+    return {'columns': list(df.columns), 'drop': drop, 'fill': fill, 'float_columns': float_columns}
+
+
+def apply_cleaning(df, fill_values):
+    df = coerce_numeric(df.drop(columns=fill_values['drop'], errors='ignore'))
+    df = df.reindex(columns=fill_values['columns'])
+    # جزء من الملف بدون قيم فارغة يُقرأ كأعداد صحيحة، فنوحد النوع مع الملف كاملاً
+    floats = [col for col in fill_values.get('float_columns', []) if df[col].dtype.kind in 'iu']
+    if floats:
+        df[floats] = df[floats].astype('float64')
+    fill = {col: value for col, value in fill_values['fill'].items() if value is not None}
+    return df.fillna(fill).drop_duplicates().reset_index(drop=True)
+
+
+def clean(df):
+    return apply_cleaning(df, compute_fill_values(df))
+
+
+# ==================== STREAMING STATISTICS ====================
+def round_significant(values, digits):
+    magnitude = np.floor(np.log10(np.abs(np.where(values == 0, 1, values))))
+    scale = 10.0 ** (digits - 1 - magnitude)
+    return np.round(values * scale) / scale
+
+
+class QuantileSketch:
+    """Quantiles of a numeric column from merged value counts.
+
+    Exact while the column has at most ``max_distinct`` distinct values; past
+    that, values are rounded to fewer significant digits so memory stays
+    bounded (relative error about ``10 ** -digits``).
+    """
+
+    def __init__(self, max_distinct=1_000_000, digits=7):
+        self.max_distinct = max_distinct
+        self.start_digits = digits
+        self.digits = None
+        self.values = np.empty(0)
+        self.counts = np.empty(0, dtype='int64')
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if self.digits is not None:
+            values = round_significant(values, self.digits)
+        values, counts = np.unique(values, return_counts=True)
+        self._set(np.concatenate([self.values, values]), np.concatenate([self.counts, counts]))
+        while len(self.values) > self.max_distinct:
+            self.digits = self.start_digits if self.digits is None else self.digits - 1
+            self._set(round_significant(self.values, self.digits), self.counts)
+
+    def _set(self, values, counts):
+        self.values, inverse = np.unique(values, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts, minlength=len(self.values)).astype('int64')
+
+    def value_at(self, position):
+        return self.values[np.searchsorted(np.cumsum(self.counts), position, side='right')]
+
+    def quantile(self, q):
+        n = int(self.counts.sum())
+        if not n:
+            return None
+        position = q * (n - 1)
+        low, high = self.value_at(int(np.floor(position))), self.value_at(int(np.ceil(position)))
+        return float(low + (high - low) * (position - np.floor(position)))
+
+    def median(self):
+        n = int(self.counts.sum())
+        if not n:
+            return None
+        # نفس طريقة pandas: متوسط القيمتين الوسطيين عند عدد زوجي
+        return float((self.value_at((n - 1) // 2) + self.value_at(n // 2)) / 2)
+
+
+class ModeCounter:
+    """Value counts of a text column, dropped once there are too many values for a mode."""
+
+    def __init__(self, max_unique=MODE_MAX_UNIQUE):
+        self.max_unique = max_unique
+        self.counts = pd.Series(dtype='int64')
+
+    def update(self, series):
+        if self.counts is None:
+            return
+        self.counts = self.counts.add(series.value_counts(), fill_value=0)
+        if len(self.counts) >= self.max_unique:
+            self.counts = None
+
+    def fill_value(self):
+        if self.counts is None or self.counts.empty:
+            return MISSING_TEXT
+        # عند التساوي تختار pandas أصغر قيمة بعد الترتيب
+        return sorted(self.counts.index[self.counts == self.counts.max()])[0]
+
+
+class ColumnStats:
+
+    def __init__(self):
+        self.nulls = 0
+        self.numeric = True
+        self.float = False
+        self.sketch = QuantileSketch()
+        self.modes = ModeCounter()
+
+    def update(self, series):
+        nulls = int(series.isna().sum())
+        self.nulls += nulls
+        self.float = self.float or pd.api.types.is_float_dtype(series)
+        if nulls == len(series):
+            return
+        self.modes.update(series)
+        # عمود فارغ بالكامل في جزء ما يُقرأ كأرقام، لذلك لا يحدد نوع العمود
+        if self.numeric and is_numeric(series):
+            self.sketch.update(series.to_numpy())
+        else:
+            self.numeric = False
+
+    def fill_value(self):
+        return self.sketch.median() if self.numeric else self.modes.fill_value()
+
+
+def read_chunks(source, chunksize=CHUNKSIZE):
+    return pd.read_csv(source, chunksize=chunksize)
+
+
+def stream_fill_values(source, chunksize=CHUNKSIZE, workers=None):
+    """Same result as ``compute_fill_values`` without loading ``source`` at once."""
+    stats = {}
+    rows = 0
+    with ThreadPoolExecutor(workers) as pool:
+        for chunk in read_chunks(source, chunksize):
+            chunk = coerce_numeric(chunk)
+            rows += len(chunk)
+            for col in chunk.columns:
+                stats.setdefault(col, ColumnStats())
+            # كل عمود مستقل عن الباقي فتُحدّث إحصاءاته بالتوازي
+            list(pool.map(lambda col: stats[col].update(chunk[col]), chunk.columns))
+    drop = [col for col, s in stats.items() if rows and s.nulls / rows > DROP_NULL_RATIO]
+    columns = [col for col in stats if col not in drop]
+    return {
+        'columns': columns,
+        'drop': drop,
+        'fill': {col: stats[col].fill_value() for col in columns},
+        'float_columns': [col for col in columns if stats[col].numeric and stats[col].float],
+        'rows': rows,
+        'nulls': {col: stats[col].nulls for col in columns},
+    }
+
+
+# ==================== STREAMING CLEANING ====================
+class SeenRows:
+    """64-bit hashes of rows already written, kept as a few sorted runs (8 bytes per row)."""
+
+    def __init__(self):
+        self.runs = []
+
+    def keep(self, df):
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        for run in self.runs:
+            found = run[np.minimum(np.searchsorted(run, hashes), len(run) - 1)] == hashes
+            keep &= ~found
+        self.add(np.sort(hashes[keep]))
+        return keep
+
+    def add(self, run):
+        if not len(run):
+            return
+        self.runs.append(run)
+        # دمج الأجزاء المتقاربة في الحجم يبقي عددها لوغاريتمياً
+        while len(self.runs) > 1 and len(self.runs[-2]) <= len(self.runs[-1]):
+            last = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], last]))
+
+
+class CsvSink:
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.file, index=False, header=self.header)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        import pyarrow.parquet as pq
+        from fortune500_ingest import to_table
+
+        table = to_table(df)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+SINKS = {'.csv': CsvSink, '.parquet': ParquetSink}
+
+
+def clean_file(source, target, chunksize=CHUNKSIZE, workers=None, fill_values=None):
+    """Clean ``source`` into ``target`` (.csv or .parquet) in two streaming passes."""
+    sink_type = SINKS.get(os.path.splitext(target)[1].lower())
+    if sink_type is None:
+        raise ValueError(f"Unsupported output format: {target}")
+    fill_values = fill_values or stream_fill_values(source, chunksize, workers)
+
+    workers = workers or os.cpu_count() or 1
+    seen = SeenRows()
+    summary = {'rows_in': 0, 'rows_out': 0}
+    tmp = target + '.tmp'
+    sink = sink_type(tmp)
+    try:
+        with ThreadPoolExecutor(workers) as pool:
+            # الأجزاء تُنظف بالتوازي مع حد لعدد الأجزاء الموجودة في الذاكرة، وتُكتب بالترتيب
+            pending = deque()
+
+            def drain(count):
+                while len(pending) > count:
+                    raw_rows, future = pending.popleft()
+                    cleaned = future.result()
+                    cleaned = cleaned[seen.keep(cleaned)]
+                    summary['rows_in'] += raw_rows
+                    summary['rows_out'] += len(cleaned)
+                    sink.write(cleaned)
+
+            for chunk in read_chunks(source, chunksize):
+                pending.append((len(chunk), pool.submit(apply_cleaning, chunk, fill_values)))
+                drain(workers)
+            drain(0)
+    finally:
+        sink.close()
+    os.replace(tmp, target)
+    summary['duplicates'] = summary['rows_in'] - summary['rows_out']
+    return {**summary, 'fill_values': fill_values}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean the raw Fortune 500 list in chunks")
+    parser.add_argument('source', nargs='?', default=RAW_CSV)
+    parser.add_argument('-o', '--output', default=CLEANED_CSV, help="output file, .csv or .parquet")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument('--workers', type=int, help="threads (default: one per core)")
+    parser.add_argument('--fill-values', help="also write the computed fill values to this JSON file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = clean_file(args.source, args.output, args.chunksize, args.workers)
+    fill_values = summary['fill_values']
+    for col in fill_values['drop']:
+        print(f"Deleted {col}")
+    for col, nulls in fill_values['nulls'].items():
+        if nulls:
+            print(f"Filled {col}: {nulls:,} values with {fill_values['fill'][col]!r}")
+    print(f"Rows: {summary['rows_in']:,} in, {summary['rows_out']:,} out "
+          f"({summary['duplicates']:,} duplicates) in {time.perf_counter() - start:.2f}s")
+    if args.fill_values:
+        with open(args.fill_values, 'w', encoding='utf-8') as f:
+            json.dump(fill_values, f, indent=2, ensure_ascii=False)
+    print(f"Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
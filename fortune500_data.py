@@ -0,0 +1,277 @@
+"""Dataset loading for the Fortune 500 dashboard.
+
+CSV files are converted once into Arrow IPC snapshots (``python fortune500_data.py``)
+which are memory-mapped on load; the CSV is only parsed when no up-to-date snapshot exists.
+When a per-year partition store exists (``python fortune500_ingest.py init``) the main
+dataset is read from its partitions instead.
+"""
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from fortune500_schema import SCHEMA_VERSION, add_profit_margin, apply_schema, memory_report
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional: without it everything is read from CSV
+    pa = None
+
+DATA_DIR = os.environ.get('FORTUNE500_DATA_DIR', os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_DIR = os.environ.get('FORTUNE500_SNAPSHOT_DIR', os.path.join(DATA_DIR, 'snapshots'))
+PARTITION_DIR = os.environ.get('FORTUNE500_PARTITION_DIR', os.path.join(DATA_DIR, 'partitions'))
+
+DATASETS = {
+    'main': 'fortune500_cleaned.csv',
+    'pred2024': 'fortune500_2024_predictions.csv',
+    'models': 'fortune500_models_performance.csv',
+    'test': 'fortune500_test_predictions.csv',
+}
+
+# مجموعة البيانات المخزنة كقسم لكل سنة عند وجود مخزن الأقسام
+PARTITIONED = 'main'
+
+# الأعمدة ذات schema محدد، والباقي يُحوّل نصياً إلى category
+SCHEMAS = {'main': apply_schema}
+
+# نسبة القيم الفريدة التي نحول تحتها الأعمدة النصية إلى category
+CATEGORY_MAX_RATIO = 0.5
+
+
+def csv_path(name):
+    return os.path.join(DATA_DIR, DATASETS[name])
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, os.path.splitext(DATASETS[name])[0] + '.arrow')
+
+
+def to_categoricals(df):
+    for col in df.select_dtypes(include=['object']).columns:
+        if df[col].nunique() <= len(df) * CATEGORY_MAX_RATIO:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def snapshot_is_fresh(name):
+    snap = snapshot_path(name)
+    if pa is None or not os.path.exists(snap):
+        return False
+    src = csv_path(name)
+    if os.path.exists(src) and os.path.getmtime(snap) < os.path.getmtime(src):
+        return False
+    with pa.memory_map(snap, 'r') as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return metadata.get(b'fortune500_schema') == SCHEMA_VERSION.encode()
+
+
+def write_snapshot(name, df):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           b'fortune500_schema': SCHEMA_VERSION.encode()})
+    target = snapshot_path(name)
+    tmp = target + '.tmp'
+    # بدون ضغط حتى يمكن قراءة الملف مباشرة عبر memory-map
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, target)
+    return target
+
+
+def read_snapshot(name):
+    with pa.memory_map(snapshot_path(name), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def partition_manifest_path():
+    return os.path.join(PARTITION_DIR, 'manifest.json')
+
+
+def read_partition_manifest():
+    try:
+        with open(partition_manifest_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def is_partitioned(name):
+    return name == PARTITIONED and pa is not None and os.path.exists(partition_manifest_path())
+
+
+def partition_versions(manifest):
+    return {int(year): part['hash'] for year, part in manifest['partitions'].items()}
+
+
+def read_partitions(manifest):
+    tables = []
+    for year in sorted(manifest['partitions'], key=int):
+        with pa.memory_map(os.path.join(PARTITION_DIR, manifest['partitions'][year]['file']), 'r') as source:
+            tables.append(pa.ipc.open_file(source).read_all())
+    # القواميس (categories) تختلف بين الأقسام ويوحدها to_pandas
+    table = pa.concat_tables(tables, promote_options='default')
+    return table.to_pandas(split_blocks=True)
+
+
+def typed(name, df):
+    return SCHEMAS.get(name, to_categoricals)(df)
+
+
+def read_csv(name):
+    return typed(name, pd.read_csv(csv_path(name)))
+
+
+# بصمة محتوى كل ملف، تُحسب مرة واحدة لكل (تاريخ تعديل، حجم)
+_content_hashes = {}
+
+
+def content_hash(path):
+    """SHA-1 of the file's bytes, recomputed only when its mtime or size changes.
+
+    Unlike the mtime the hash is the same on every replica that serves the
+    same data, so it can key caches that outlive the process.
+    """
+    stat = os.stat(path)
+    stamp = (path, stat.st_mtime_ns, stat.st_size)
+    if stamp not in _content_hashes:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _content_hashes[stamp] = digest.hexdigest()[:16]
+    return _content_hashes[stamp]
+
+
+def dataset_version(name):
+    # يتغير الإصدار عند تعديل محتوى ملف البيانات فتُعاد الحسابات المخزنة
+    if is_partitioned(name):
+        path = partition_manifest_path()
+    else:
+        path = csv_path(name) if os.path.exists(csv_path(name)) else snapshot_path(name)
+    try:
+        return f"{name}:{content_hash(path)}"
+    except OSError:
+        return f"{name}:missing"
+
+
+def load_dataset(name):
+    if is_partitioned(name):
+        return read_partitions(read_partition_manifest())
+    if snapshot_is_fresh(name):
+        return read_snapshot(name)
+    df = read_csv(name)
+    if pa is not None:
+        try:
+            write_snapshot(name, df)
+        except OSError:
+            pass
+    return df
+
+
+def frozen_values(series):
+    # نسخة مملوكة للقيم مع منع الكتابة عليها؛ أعمدة object والأنواع ذات القناع تبقى كما هي
+    # لأن بعض دوال pandas لا تقبل مصفوفاتها للقراءة فقط
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy(copy=True)
+        codes.setflags(write=False)
+        return pd.Categorical.from_codes(codes, dtype=series.dtype)
+    if isinstance(series.dtype, np.dtype) and series.dtype != object:
+        values = series.to_numpy(copy=True)
+        values.setflags(write=False)
+        return values
+    return series.to_numpy()
+
+
+def freeze(df):
+    """Copy of ``df`` whose numeric and categorical values cannot be written.
+
+    Every column is rebuilt from its own read-only array with ``copy=False``,
+    so writes through ``loc``/``iloc`` or ``.values`` raise ``ValueError``.
+    """
+    return pd.DataFrame({col: frozen_values(df[col]) for col in df.columns}, index=df.index, copy=False)
+
+
+def add_derived_columns(name, df):
+    if name == 'main' and not df.empty:
+        add_profit_margin(df)
+    return df
+
+
+class Fortune500Dataset:
+    """Read-only frames loaded once per process and shared by every session.
+
+    Indexing returns a shallow copy: adding columns stays local to the caller,
+    while writing into the shared values raises ``ValueError``. Partitioned
+    datasets also carry one version per year, so caches of unchanged years
+    survive an ingestion.
+    """
+
+    def __init__(self, frames, versions, partitions=None):
+        self._frames = {name: freeze(df) for name, df in frames.items()}
+        self.versions = dict(versions)
+        self.partitions = dict(partitions or {})
+
+    def __getitem__(self, name):
+        return self._frames[name].copy(deep=False)
+
+    def __contains__(self, name):
+        return name in self._frames
+
+    def version(self, name):
+        return self.versions[name]
+
+    def year_version(self, name, year):
+        if name not in self.partitions:
+            return self.versions[name]
+        return self.partitions[name].get(year, 'missing')
+
+    def memory_usage(self):
+        return {name: int(df.memory_usage(deep=True).sum()) for name, df in self._frames.items()}
+
+
+def load_all(names=None):
+    frames = {}
+    partitions = {}
+    for name in names or DATASETS:
+        try:
+            if is_partitioned(name):
+                # إصدارات السنوات تُؤخذ من نفس الـ manifest الذي قُرئت منه الأقسام
+                manifest = read_partition_manifest()
+                partitions[name] = partition_versions(manifest)
+                df = read_partitions(manifest)
+            else:
+                df = load_dataset(name)
+            frames[name] = add_derived_columns(name, df)
+        except FileNotFoundError:
+            frames[name] = pd.DataFrame()
+    return Fortune500Dataset(frames, {name: dataset_version(name) for name in frames}, partitions)
+
+
+def datasets_version(names=None):
+    return '|'.join(dataset_version(name) for name in names or DATASETS)
+
+
+def build_snapshots(names=None, verbose=False):
+    if pa is None:
+        raise RuntimeError("pyarrow is required to build snapshots")
+    built = {}
+    for name in names or DATASETS:
+        if not os.path.exists(csv_path(name)):
+            continue
+        raw = pd.read_csv(csv_path(name))
+        df = typed(name, raw)
+        built[name] = write_snapshot(name, df)
+        if verbose:
+            print(f"{name}: {built[name]}")
+            print(memory_report(raw, df).to_string())
+    return built
+
+
+if __name__ == "__main__":
+    build_snapshots(sys.argv[1:] or None, verbose=True)
@@ -0,0 +1,256 @@
+"""Headless analytics engine: the dashboard's computations without Streamlit.
+
+The engine holds one read-only dataset in memory together with its
+aggregate cube and company index, and answers the questions the pages ask
+(year summaries, top-N, industry breakdowns, year-over-year growth,
+company histories and rank dynamics). ``fortune500_api.py`` exposes it over HTTP.
+
+``refresh`` picks up a new dataset version in place: when the data comes
+from the per-year partition store only the changed years of the cube are
+recomputed, and cache entries scoped to unchanged years stay valid.
+
+With the persistent cache tier enabled (``FORTUNE500_CACHE_DIR``) answers,
+the cube and the company index are also kept on disk, so a new process
+serving the same data starts warm.
+"""
+import threading
+
+import pandas as pd
+
+from fortune500_analytics import (build_cube, build_company_index, build_panel, build_rank_dynamics, company_history,
+                                  panel_compare, rank_movers, select_dynamics, survival_curve, turnover, update_cube,
+                                  year_industries, year_sectors, year_stats, year_top, DYNAMICS_N, MOVERS_N, TOP_N_MAX)
+from fortune500_cache import LRUCache, open_store
+from fortune500_data import dataset_version, load_all
+from fortune500_search import SEARCH_LIMIT, SearchIndex, company_ids, resolve_entities
+
+HISTORY_COLUMNS = ['year', 'rank', 'revenue_mil', 'profit_mil', 'profit_margin']
+
+
+class Fortune500Engine:
+
+    def __init__(self, dataset=None, cache_size=1024):
+        self.dataset = dataset if dataset is not None else load_all(['main'])
+        self.version = self.dataset.version('main')
+        self.cache = LRUCache(maxsize=cache_size, store=open_store('engine'))
+        self._lock = threading.Lock()
+        self._cube = None
+        self._company_index = None
+        self._panel = None
+        self._entities = None
+        self._search_index = None
+        self._rank_dynamics = None
+
+    @property
+    def df(self):
+        return self.dataset['main']
+
+    # تُبنى عند أول طلب فقط، وتحت قفل حتى لا تبنيها عدة طلبات متزامنة
+    @property
+    def cube(self):
+        if self._cube is None:
+            with self._lock:
+                if self._cube is None:
+                    self._cube = self.persisted('cube', lambda: build_cube(self.df))
+        return self._cube
+
+    @property
+    def entities(self):
+        if self._entities is None:
+            with self._lock:
+                if self._entities is None:
+                    self._entities = self.persisted('entities', lambda: resolve_entities(self.df))
+        return self._entities
+
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            entities = self.entities
+            with self._lock:
+                if self._search_index is None:
+                    self._search_index = self.persisted('search_index', lambda: SearchIndex(entities))
+        return self._search_index
+
+    @property
+    def company_index(self):
+        if self._company_index is None:
+            entities = self.entities
+            with self._lock:
+                if self._company_index is None:
+                    self._company_index = self.persisted('company_index', lambda: build_company_index(
+                        self.df, company_ids(entities, self.df['name']), len(entities['names'])))
+        return self._company_index
+
+    @property
+    def panel(self):
+        if self._panel is None:
+            entities = self.entities
+            with self._lock:
+                if self._panel is None:
+                    # صف واحد لكل شركة مهما اختلفت كتابة اسمها بين السنوات
+                    canonical = entities['names'][company_ids(entities, self.df['name'])]
+                    self._panel = self.persisted('panel', lambda: build_panel(self.df.assign(name=canonical)))
+        return self._panel
+
+    @property
+    def rank_dynamics(self):
+        if self._rank_dynamics is None:
+            index, names = self.company_index, self.entities['names']
+            with self._lock:
+                if self._rank_dynamics is None:
+                    self._rank_dynamics = self.persisted('rank_dynamics', lambda: build_rank_dynamics(index, names))
+        return self._rank_dynamics
+
+    def persisted(self, name, builder):
+        # الحسابات الكبيرة تُحفظ على القرص فقط، فنسختها في الذاكرة هي الخاصية نفسها
+        store = self.cache.store
+        if store is None:
+            return builder()
+        found, value = store.get((name, self.version))
+        if not found:
+            value = builder()
+            store.set((name, self.version), value)
+        return value
+
+    def cached(self, key, builder, years=None):
+        # المفاتيح المرتبطة بسنوات محددة تبقى صالحة ما لم تتغير هذه السنوات
+        scope = tuple(self.year_version(year) for year in years) if years else self.version
+        return self.cache.get_or_build((key, scope), builder)
+
+    def year_version(self, year):
+        # ملخص السنة يشمل النمو مقارنة بالسنة السابقة، لذلك يعتمد على الاثنتين
+        return (self.dataset.year_version('main', year), self.dataset.year_version('main', year - 1))
+
+    def changed_years(self, dataset):
+        old, new = self.dataset.partitions.get('main'), dataset.partitions.get('main')
+        if old is None or new is None:
+            return None
+        return sorted(year for year in set(old) | set(new) if old.get(year) != new.get(year))
+
+    def refresh(self, dataset=None):
+        """Switch to the current dataset version; returns the years that changed.
+
+        ``None`` means the change could not be narrowed to years and everything
+        is rebuilt on next access.
+        """
+        if (dataset.version('main') if dataset is not None else dataset_version('main')) == self.version:
+            return []
+        with self._lock:
+            dataset = dataset if dataset is not None else load_all(['main'])
+            if dataset.version('main') == self.version:
+                return []
+            years = self.changed_years(dataset)
+            cube = self._cube
+            if cube is not None:
+                cube = update_cube(cube, dataset['main'], years) if years is not None else None
+            self.dataset, self.version = dataset, dataset.version('main')
+            self._cube = cube
+            if cube is not None and self.cache.store is not None:
+                self.cache.store.set(('cube', self.version), cube)
+            self._company_index = None
+            self._panel = None
+            self._entities = None
+            self._search_index = None
+            self._rank_dynamics = None
+        return years
+
+    # ==================== YEARS ====================
+    def years(self):
+        return [int(year) for year in self.cube['by_year'].index]
+
+    def has_year(self, year):
+        return year in self.cube['by_year'].index
+
+    def year_summary(self, year):
+        summary = year_stats(self.cube, year).to_dict()
+        summary['companies'] = int(summary['companies'])
+        return summary
+
+    def top_companies(self, year, n=15):
+        n = max(1, min(int(n), TOP_N_MAX))
+        return year_top(self.cube, year, n)
+
+    def industries(self, year, n=15):
+        return year_industries(self.cube, year, n)
+
+    def sectors(self, year):
+        return year_sectors(self.cube, year)
+
+    def compare_years(self, y1, y2):
+        d1 = self.year_summary(y1)
+        d2 = self.year_summary(y2)
+        return {
+            'first': d1,
+            'second': d2,
+            'revenue_growth': ((d2['revenue_sum'] - d1['revenue_sum']) / d1['revenue_sum']) * 100,
+            'avg_growth': ((d2['revenue_mean'] - d1['revenue_mean']) / d1['revenue_mean']) * 100,
+            'companies_change': int(d2['companies'] - d1['companies']),
+        }
+
+    def compare_many_years(self, years):
+        """Totals per year and company-level changes from the first to the last of ``years``."""
+        years = sorted({int(year) for year in years})
+        summary = self.cube['by_year'].loc[years, ['companies', 'revenue_sum', 'revenue_mean', 'margin_mean']]
+        first, last = summary['revenue_sum'].iloc[0], summary['revenue_sum'].iloc[-1]
+        span = years[-1] - years[0]
+        companies = panel_compare(self.panel, years)
+        return {
+            'years': summary,
+            'revenue_cagr': ((last / first) ** (1 / span) - 1) * 100 if span else float('nan'),
+            'status': companies['status'].value_counts().to_dict(),
+            'companies': companies,
+        }
+
+    def rank_movers(self, y1, y2, n=MOVERS_N):
+        return rank_movers(self.panel, y1, y2, max(1, min(int(n), TOP_N_MAX)))
+
+    def turnover(self, y1, y2):
+        return turnover(self.panel, y1, y2)
+
+    def dynamics(self, sort='mean_rank_change', ascending=None, n=DYNAMICS_N, min_years=1, status=None, sectors=None):
+        return select_dynamics(self.rank_dynamics, sort, ascending, max(1, int(n)), min_years, status, sectors)
+
+    def survival(self):
+        years = self.cube['by_year'].index
+        return self.cached('survival', lambda: survival_curve(self.rank_dynamics, int(years.min()), int(years.max())))
+
+    def yearly_trends(self):
+        return self.cube['by_year']
+
+    def overview(self):
+        return dict(self.cube['totals'])
+
+    # ==================== COMPANIES ====================
+    # الشركات معرفة بأرقام صحيحة تجمع كل كتابات الاسم؛ الأسماء تُحوّل إلى معرفات عند الحدود فقط
+    def companies(self, prefix=None, limit=None):
+        names = self.entities['names']
+        if prefix:
+            return [names[company_id] for company_id in self.search_companies(prefix, limit or SEARCH_LIMIT)]
+        names = sorted(names)
+        return names[:limit] if limit else names
+
+    def search_companies(self, query, limit=SEARCH_LIMIT):
+        return self.search_index.search(query, limit)
+
+    def company_id(self, name):
+        return self.search_index.lookup(name)
+
+    def company_name(self, company_id):
+        return self.entities['names'][company_id]
+
+    def company_aliases(self, company_id):
+        return self.entities['aliases'][company_id]
+
+    def has_company(self, company_id):
+        return 0 <= company_id < len(self.entities['names'])
+
+    def company_history(self, company_id):
+        return company_history(self.company_index, company_id)
+
+    def company_histories(self, company_ids, columns=HISTORY_COLUMNS):
+        # دفعة واحدة لعدة شركات: شرائح متتالية من الإطار المرتب بدون مقارنة نصوص
+        frames = [self.company_history(company_id)[['company_id', 'name'] + columns]
+                  for company_id in company_ids if self.has_company(company_id)]
+        if not frames:
+            return pd.DataFrame(columns=['company_id', 'name'] + columns)
+        return pd.concat(frames, ignore_index=True)
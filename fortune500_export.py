@@ -0,0 +1,329 @@
+"""Streaming exports of the dashboard's result sets to CSV, Parquet or XLSX.
+
+A query (all companies of a year, a company's history, a multi-year
+comparison, the rank-dynamics table, the prediction files) is answered from
+the in-memory engine, and the file is produced ``CHUNK_ROWS`` rows at a
+time: every chunk is encoded, handed to the caller and appended to a
+temporary file, so the exporter never holds the complete file in memory
+(the API streams it as is; a Streamlit download button receives the
+finished file as bytes). A finished
+file is kept under ``FORTUNE500_EXPORT_DIR`` keyed by the query, its dataset
+version and the code version; the next request for it is streamed from
+disk. The least recently used files are removed above
+``FORTUNE500_EXPORT_MB``.
+
+XLSX is written directly as SpreadsheetML with inline strings into a
+streamed zip, so it needs no spreadsheet library.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from fortune500_artifacts import bundle_version, load_bundle, test_predictions
+from fortune500_cache import code_version
+from fortune500_data import SNAPSHOT_DIR, dataset_version, load_all
+
+EXPORT_DIR = os.environ.get('FORTUNE500_EXPORT_DIR', os.path.join(SNAPSHOT_DIR, 'exports'))
+EXPORT_MB = float(os.environ.get('FORTUNE500_EXPORT_MB', 1024))
+CHUNK_ROWS = 50_000
+READ_BYTES = 1 << 20
+# حد Excel لعدد الصفوف (بدون صف العناوين)
+XLSX_MAX_ROWS = 1_048_575
+# ورقة أكبر من ذلك قد تتجاوز 4GB قبل الضغط فتحتاج ZIP64
+XLSX_ZIP64_CELLS = 20_000_000
+PREDICTION_FILES = ['pred2024', 'test']
+
+
+# ==================== ENCODERS ====================
+class ChunkSink:
+    """Write-only file object whose bytes are taken out as they are written."""
+
+    def __init__(self):
+        self.closed = False
+        self._parts = []
+        self._position = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def csv_chunks(frame, chunk_rows):
+    # الملف الفارغ يبقى فيه صف العناوين
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+def parquet_chunks(frame, chunk_rows):
+    # مجموعة صفوف لكل جزء؛ الأعمدة الفئوية تحتفظ بنفس القاموس في كل الأجزاء
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = ChunkSink()
+    schema = pa.Schema.from_pandas(frame.iloc[:chunk_rows], preserve_index=False)
+    with pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema) as writer:
+        for start in range(0, len(frame), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(frame.iloc[start:start + chunk_rows], schema=schema,
+                                                    preserve_index=False))
+            yield sink.drain()
+    yield sink.drain()
+
+
+XLSX_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+XLSX_RELS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+XLSX_DOC_RELS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'),
+    '_rels/.rels': (
+        f'<Relationships xmlns="{XLSX_RELS}"><Relationship Id="rId1" '
+        f'Type="{XLSX_DOC_RELS}/officeDocument" Target="xl/workbook.xml"/></Relationships>'),
+    'xl/workbook.xml': (
+        f'<workbook xmlns="{XLSX_MAIN}" xmlns:r="{XLSX_DOC_RELS}">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+    'xl/_rels/workbook.xml.rels': (
+        f'<Relationships xmlns="{XLSX_RELS}"><Relationship Id="rId1" '
+        f'Type="{XLSX_DOC_RELS}/worksheet" Target="worksheets/sheet1.xml"/><Relationship Id="rId2" '
+        f'Type="{XLSX_DOC_RELS}/styles" Target="styles.xml"/></Relationships>'),
+    # أقل جدول أنماط مطلوب: بعض القارئات ترفض الملف بدونه
+    'xl/styles.xml': (
+        f'<styleSheet xmlns="{XLSX_MAIN}">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'),
+}
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+# محارف التحكم غير مسموحة في XML
+XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def xlsx_cell(value):
+    if isinstance(value, str):
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(XML_ILLEGAL.sub("", value))}</t></is></c>'
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c><v>{int(value)}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        return f'<c><v>{float(value)!r}</v></c>' if np.isfinite(value) else '<c/>'
+    if value is None or value is pd.NA or value is pd.NaT:
+        return '<c/>'
+    return xlsx_cell(str(value))
+
+
+def xlsx_rows(rows):
+    return ''.join('<row>' + ''.join(map(xlsx_cell, row)) + '</row>' for row in rows).encode('utf-8')
+
+
+def xlsx_chunks(frame, chunk_rows):
+    sink = ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as book:
+        for name, xml in XLSX_PARTS.items():
+            book.writestr(name, XML_HEADER + xml)
+        yield sink.drain()
+        with book.open('xl/worksheets/sheet1.xml', 'w',
+                       force_zip64=frame.size > XLSX_ZIP64_CELLS) as sheet:
+            sheet.write(f'{XML_HEADER}<worksheet xmlns="{XLSX_MAIN}"><sheetData>'.encode('utf-8'))
+            sheet.write(xlsx_rows([[str(col) for col in frame.columns]]))
+            for start in range(0, len(frame), chunk_rows):
+                chunk = frame.iloc[start:start + chunk_rows].astype(object)
+                sheet.write(xlsx_rows(chunk.itertuples(index=False, name=None)))
+                yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+FORMATS = {
+    'csv': {'mime': 'text/csv', 'chunks': csv_chunks},
+    'parquet': {'mime': 'application/vnd.apache.parquet', 'chunks': parquet_chunks},
+    'xlsx': {'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'chunks': xlsx_chunks},
+}
+
+
+# ==================== QUERIES ====================
+def year_rows(engine, year):
+    df = engine.df
+    return df[df['year'] == year].sort_values('rank', ignore_index=True)
+
+
+def prediction_rows(engine, name):
+    if name not in PREDICTION_FILES:
+        raise KeyError(f"Unknown prediction file: {name}")
+    return load_all([name])[name]
+
+
+def bundle_scope(engine):
+    version = bundle_version()
+    if version is None:
+        raise KeyError("No artifact bundle")
+    return version
+
+
+def dynamics_rows(engine, sort='mean_rank_change', ascending=None, min_years=1, status=None, sectors=()):
+    return engine.dynamics(sort, ascending, len(engine.rank_dynamics), min_years, status, list(sectors))
+
+
+# لكل استعلام: نطاق الإصدار الذي يبطل الملف عند تغيره، والدالة التي تعيد صفوفه
+QUERIES = {
+    'year': {
+        'scope': lambda engine, year: engine.year_version(year),
+        'rows': year_rows,
+    },
+    'company': {
+        'scope': lambda engine, company_id: engine.version,
+        'rows': lambda engine, company_id: engine.company_history(company_id),
+    },
+    'compare': {
+        'scope': lambda engine, years: tuple(engine.year_version(year) for year in years),
+        'rows': lambda engine, years: engine.compare_many_years(years)['companies'],
+    },
+    'dynamics': {
+        'scope': lambda engine, **params: engine.version,
+        'rows': dynamics_rows,
+    },
+    'predictions': {
+        'scope': lambda engine, name: dataset_version(name),
+        'rows': prediction_rows,
+    },
+    # توقعات كل النماذج على صفوف الاختبار من حزمة artifacts/
+    'test_predictions': {
+        'scope': bundle_scope,
+        'rows': lambda engine: test_predictions(load_bundle()),
+    },
+}
+
+
+def export_name(query, params, fmt):
+    # اسم ملف مقروء مثل fortune500-year-2023.csv
+    values = [str(value) for value in params.values() if value not in (None, '', ())]
+    values = [re.sub(r'[^A-Za-z0-9]+', '_', value).strip('_') for value in values]
+    return '-'.join(['fortune500', query] + [value for value in values if value][:4]) + f'.{fmt}'
+
+
+def export_path(engine, query, fmt, params):
+    scope = QUERIES[query]['scope'](engine, **params)
+    key = repr((query, sorted(params.items()), fmt, scope, code_version()))
+    return os.path.join(EXPORT_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest() + f'.{fmt}')
+
+
+def read_chunks(f):
+    # الملف مفتوح مسبقاً فتبقى قراءته ممكنة حتى لو أزاله evict في هذه الأثناء
+    with f:
+        for block in iter(lambda: f.read(READ_BYTES), b''):
+            yield block
+
+
+def write_through(path, chunks):
+    # كل جزء يُرسل ويُكتب في ملف مؤقت، والملف يحمل اسمه النهائي فقط بعد اكتماله
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=EXPORT_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp, path)
+        evict(keep=path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def touch(path):
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict(max_bytes=None, keep=None):
+    # keep: الملف المكتوب للتو لا يُزال حتى لو كان وحده أكبر من الحد
+    max_bytes = max_bytes if max_bytes is not None else int(EXPORT_MB * 1024 * 1024)
+    files = []
+    for entry in os.scandir(EXPORT_DIR):
+        if entry.is_file() and not entry.name.endswith('.part') and entry.path != keep:
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+def export(engine, query, fmt, chunk_rows=CHUNK_ROWS, **params):
+    """``(file name, MIME type, chunks)`` of the result of ``query`` in ``fmt``.
+
+    The query runs before this returns, so an invalid request fails here and
+    not halfway through a download; the file itself is encoded while the
+    chunks are consumed.
+    """
+    if query not in QUERIES:
+        raise KeyError(f"Unknown export: {query}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (one of {', '.join(FORMATS)})")
+    name, mime = export_name(query, params, fmt), FORMATS[fmt]['mime']
+    path = export_path(engine, query, fmt, params)
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        # تاريخ التعديل يحدد الأقدم استخداماً عند الإزالة
+        touch(path)
+        return name, mime, read_chunks(f)
+    frame = QUERIES[query]['rows'](engine, **params)
+    if fmt == 'xlsx' and len(frame) > XLSX_MAX_ROWS:
+        raise ValueError(f"{len(frame):,} rows do not fit in one XLSX sheet; export CSV or Parquet instead")
+    return name, mime, write_through(path, FORMATS[fmt]['chunks'](frame, chunk_rows))
+
+
+def export_bytes(engine, query, fmt, **params):
+    """The finished export as bytes, from the cached file or while it is written."""
+    _, _, chunks = export(engine, query, fmt, **params)
+    return b''.join(chunks)
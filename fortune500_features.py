@@ -0,0 +1,151 @@
+"""Feature matrix of the next-year revenue models (from ``Untitled7.ipynb``).
+
+Lag, growth and rolling features are computed with array operations over
+the (company, year) sorted frame instead of per-company ``groupby`` lambdas.
+The matrix is cached on disk per dataset version, so retraining after a code
+change or reruns of the same data skip the feature build entirely.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from fortune500_data import SNAPSHOT_DIR, dataset_version, load_all
+
+# يتغير عند تعديل طريقة بناء الخصائص حتى لا تُستخدم ملفات قديمة
+FEATURES_VERSION = '1'
+FEATURE_CACHE_DIR = os.path.join(SNAPSHOT_DIR, 'features')
+
+TARGET = 'next_year_revenue'
+KEY_COLUMNS = ['name', 'year']
+CATEGORICAL_COLUMNS = ['industry', 'sector', 'headquarters_state']
+NUMERIC_FEATURES = [
+    'year', 'rank', 'revenue_mil', 'profit_mil',
+    'asset_mil', 'employees', 'profit_margin',
+    'revenue_growth', 'profit_growth', 'revenue_per_employee',
+    'revenue_3yr_avg',
+]
+FEATURE_COLUMNS = NUMERIC_FEATURES + [f'{col}_encoded' for col in CATEGORICAL_COLUMNS]
+ROLLING_WINDOW = 3
+
+
+def fit_encoders(df):
+    # مثل LabelEncoder: الفئات مرتبة أبجدياً ورقم كل فئة هو موقعها
+    return {col: sorted(df[col].astype(str).unique()) for col in CATEGORICAL_COLUMNS}
+
+
+def encode(values, classes):
+    values = np.asarray(values, dtype=str)
+    classes = np.asarray(classes, dtype=str)
+    position = np.searchsorted(classes, values)
+    found = classes[np.minimum(position, len(classes) - 1)] == values
+    # الفئات غير المعروفة وقت التدريب تأخذ -1
+    return np.where(found, position, -1)
+
+
+def group_starts(codes):
+    starts = np.ones(len(codes), dtype=bool)
+    starts[1:] = codes[1:] != codes[:-1]
+    return starts
+
+
+def lag(values, starts):
+    previous = np.empty_like(values)
+    previous[0] = np.nan
+    previous[1:] = values[:-1]
+    previous[starts] = np.nan
+    return previous
+
+
+def lead(values, starts):
+    following = np.empty_like(values)
+    following[-1] = np.nan
+    following[:-1] = values[1:]
+    ends = np.roll(starts, -1)
+    ends[-1] = True
+    following[ends] = np.nan
+    return following
+
+
+def rolling_mean(values, starts, window=ROLLING_WINDOW):
+    # متوسط متحرك داخل كل شركة من المجاميع التراكمية (min_periods=1)
+    index = np.arange(len(values))
+    first = np.maximum.accumulate(np.where(starts, index, 0))
+    count = np.minimum(index - first + 1, window)
+    cumulative = np.concatenate([[0.0], np.cumsum(values)])
+    return (cumulative[index + 1] - cumulative[index + 1 - count]) / count
+
+
+def build_features(df, encoders=None):
+    """Features, target and keys for every company-year, sorted by (name, year).
+
+    The target is the revenue of the company's next appearance in the list;
+    ``target_year`` is the year of that appearance.
+    """
+    frame = df.sort_values(KEY_COLUMNS, kind='stable').reset_index(drop=True)
+    encoders = encoders or fit_encoders(frame)
+    codes = pd.factorize(frame['name'])[0]
+    starts = group_starts(codes)
+
+    revenue = frame['revenue_mil'].to_numpy(dtype='float64')
+    profit = frame['profit_mil'].to_numpy(dtype='float64')
+    employees = frame['employees'].to_numpy(dtype='float64')
+    years = frame['year'].to_numpy(dtype='float64')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        features = pd.DataFrame({
+            'year': years,
+            'rank': frame['rank'].to_numpy(dtype='float64'),
+            'revenue_mil': revenue,
+            'profit_mil': profit,
+            'asset_mil': frame['asset_mil'].to_numpy(dtype='float64'),
+            'employees': employees,
+            'profit_margin': profit / revenue * 100,
+            'revenue_growth': revenue / lag(revenue, starts) - 1,
+            'profit_growth': profit / lag(profit, starts) - 1,
+            'revenue_per_employee': revenue / employees,
+            'revenue_3yr_avg': rolling_mean(revenue, starts),
+        })
+    for col in CATEGORICAL_COLUMNS:
+        features[f'{col}_encoded'] = encode(frame[col].astype(str), encoders[col])
+
+    features = features.replace([np.inf, -np.inf], np.nan)
+    features.insert(0, 'name', frame['name'].astype(str).to_numpy())
+    features[TARGET] = lead(revenue, starts)
+    features['target_year'] = lead(years, starts)
+    return features, encoders
+
+
+def training_rows(matrix):
+    # مثل الـ notebook: تُحذف الصفوف التي ينقصها أي خاصية أو الهدف
+    return matrix.dropna(subset=FEATURE_COLUMNS + [TARGET]).reset_index(drop=True)
+
+
+def cache_key(version):
+    return hashlib.sha1(f"{version}|{FEATURES_VERSION}".encode()).hexdigest()[:16]
+
+
+def cache_paths(version):
+    stem = os.path.join(FEATURE_CACHE_DIR, cache_key(version))
+    return stem + '.parquet', stem + '.json'
+
+
+def feature_matrix(dataset=None, refresh=False):
+    """Cached ``build_features`` of the main dataset; returns (matrix, encoders, path)."""
+    version = dataset.version('main') if dataset is not None else dataset_version('main')
+    matrix_path, encoders_path = cache_paths(version)
+    if not refresh and os.path.exists(matrix_path) and os.path.exists(encoders_path):
+        with open(encoders_path, encoding='utf-8') as f:
+            encoders = json.load(f)
+        return pd.read_parquet(matrix_path), encoders, matrix_path
+
+    dataset = dataset if dataset is not None else load_all(['main'])
+    matrix, encoders = build_features(dataset['main'])
+    os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+    matrix.to_parquet(matrix_path + '.tmp', index=False)
+    os.replace(matrix_path + '.tmp', matrix_path)
+    with open(encoders_path, 'w', encoding='utf-8') as f:
+        json.dump(encoders, f, ensure_ascii=False)
+    return matrix, encoders, matrix_path
@@ -0,0 +1,179 @@
+"""Plotly figure builders for the dashboard.
+
+``plotly.express`` is imported by the builders that use it: it costs more
+at startup than the rest of Plotly together.
+"""
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+TRANSPARENT = dict(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', title_font_color='white')
+
+# حدود حجم البيانات المرسلة للمتصفح مهما كان حجم البيانات الأصلية
+LINE_MAX_POINTS = 500
+SCATTER_MAX_POINTS = 5000
+DENSITY_BINS = 100
+
+
+# ==================== SERVER-SIDE AGGREGATION ====================
+def histogram_bins(values, nbins=50):
+    values = np.asarray(values, dtype='float64')
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=nbins)
+    return counts, edges
+
+
+def quantiles(values, qs=(0.1, 0.25, 0.5, 0.75, 0.9)):
+    values = np.asarray(values, dtype='float64')
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return {q: np.nan for q in qs}
+    return dict(zip(qs, np.quantile(values, qs)))
+
+
+def lttb(x, y, threshold=LINE_MAX_POINTS):
+    # Largest-Triangle-Three-Buckets: يحافظ على شكل الخط بعدد نقاط ثابت
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    bucket_edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = bucket_edges[i], bucket_edges[i + 1]
+        next_start, next_stop = bucket_edges[i + 1], bucket_edges[i + 2] if i + 2 < len(bucket_edges) else n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        area = np.abs((x[previous] - avg_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return x[keep], y[keep]
+
+
+def style(fig, height, font_size=None, **layout):
+    font = dict(color='white') if font_size is None else dict(color='white', size=font_size)
+    fig.update_layout(height=height, font=font, **TRANSPARENT, **layout)
+    return fig
+
+
+def gray_bar(frame, x, y, title, height=500, font_size=None, **layout):
+    import plotly.express as px
+    fig = px.bar(frame, x=x, y=y, orientation='h', title=title,
+                 color=x, color_continuous_scale='gray')
+    return style(fig, height, font_size, **layout)
+
+
+def top_companies_bar(top, title):
+    return gray_bar(top, 'revenue_mil', 'name', title, font_size=12)
+
+
+def binned_histogram(values, title, x_title, nbins=50, color='#636EFA'):
+    counts, edges = histogram_bins(values, nbins)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                           marker_color=color, name=x_title))
+    for q, value in quantiles(values, (0.25, 0.5, 0.75)).items():
+        if np.isfinite(value):
+            fig.add_vline(x=value, line_dash='dash', line_color='rgba(255,255,255,0.5)',
+                          annotation_text=f"P{int(q * 100)}", annotation_font_color='white')
+    fig.update_layout(title=title, bargap=0, xaxis_title=x_title, yaxis_title='count')
+    return style(fig, 400)
+
+
+def revenue_histogram(values, title, nbins=50):
+    return binned_histogram(values, title, 'revenue_mil', nbins)
+
+
+def error_histogram(errors, title, x_title, nbins=60):
+    return binned_histogram(errors, title, x_title, nbins, color='#A0AEC0')
+
+
+def industry_bar(ind, x, title):
+    return gray_bar(ind.reset_index(), x, 'industry', title)
+
+
+def company_trend(df_comp, y, title, color, reverse=False):
+    xs, ys = lttb(df_comp['year'], df_comp[y])
+    fig = go.Figure(go.Scatter(x=xs, y=ys, mode='lines+markers',
+                               line=dict(color=color, width=3), marker=dict(color=color, size=8)))
+    fig.update_layout(title=title, xaxis_title='year', yaxis_title=y)
+    if reverse:
+        fig.update_yaxes(autorange="reversed")
+    return style(fig, 400)
+
+
+def year_comparison_bars(years, totals, means, total_name, mean_name):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name=total_name, x=years, y=totals, marker_color='#A0AEC0'))
+    fig.add_trace(go.Bar(name=mean_name, x=years, y=means, marker_color='#718096'))
+    return style(fig, 400, 12, barmode='group', legend_font_color='white')
+
+
+def rank_change_bar(names, changes, title):
+    # تقدم في الترتيب بالأخضر وتراجع بالأحمر، والأكبر تغيراً في الأعلى
+    changes = np.asarray(changes, dtype='float64')
+    fig = go.Figure(go.Bar(x=changes, y=list(names), orientation='h',
+                           marker_color=np.where(changes >= 0, '#48BB78', '#F56565')))
+    return style(fig, 500, 12, title=title, yaxis_autorange='reversed')
+
+
+def survival_line(curve, title, x_title, y_title):
+    fig = go.Figure(go.Scatter(x=curve['years'], y=curve['survival_pct'], mode='lines+markers',
+                               line=dict(color='#48BB78', width=3), marker=dict(size=6)))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, yaxis_range=[0, 100])
+    return style(fig, 400)
+
+
+def overview_trends(yearly, titles, names):
+    fig = make_subplots(rows=3, cols=1, subplot_titles=titles)
+    colors = ['#A0AEC0', '#48BB78', '#ECC94B']
+    for row, (col, name, color) in enumerate(zip(['revenue_mil', 'profit_mil', 'profit_margin'], names, colors), 1):
+        xs, ys = lttb(yearly['year'], yearly[col])
+        fig.add_trace(go.Scatter(x=xs, y=ys, name=name,
+                                 line=dict(color=color, width=3)), row=row, col=1)
+    return style(fig, 700, 12, showlegend=True, legend_font_color='white')
+
+
+def all_time_top(top, title):
+    import plotly.express as px
+    fig = px.bar(x=top.values, y=top.index, orientation='h', title=title,
+                 color=top.values, color_continuous_scale='gray')
+    return style(fig, 500, 12)
+
+
+def model_accuracy_bar(df_models, model_col, accuracy_col, title):
+    import plotly.express as px
+    fig = px.bar(df_models, x=model_col, y=accuracy_col, title=title,
+                 color=accuracy_col, color_continuous_scale='gray')
+    if model_col:
+        return style(fig, 400, xaxis_tickangle=45)
+    return style(fig, 400)
+
+
+def backtest_lines(table, metric, title, x_title):
+    fig = go.Figure()
+    colors = ['#A0AEC0', '#48BB78', '#ECC94B', '#718096', '#F56565']
+    for (model, rows), color in zip(table.groupby('model', sort=True), colors * len(table)):
+        fig.add_trace(go.Scatter(x=rows['target_year'], y=rows[metric], name=model, mode='lines+markers',
+                                 line=dict(color=color, width=2)))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=metric)
+    return style(fig, 400, 12, showlegend=True, legend_font_color='white')
+
+
+def actual_vs_predicted(actual, predicted, title, x_title, y_title):
+    actual = np.asarray(actual, dtype='float64')
+    predicted = np.asarray(predicted, dtype='float64')
+    if len(actual) <= SCATTER_MAX_POINTS:
+        # WebGL يرسم آلاف النقاط بدون بطء في المتصفح
+        fig = go.Figure(go.Scattergl(x=actual, y=predicted, mode='markers',
+                                     marker=dict(color='#A0AEC0', size=5)))
+    else:
+        ok = np.isfinite(actual) & np.isfinite(predicted)
+        counts, x_edges, y_edges = np.histogram2d(actual[ok], predicted[ok], bins=DENSITY_BINS)
+        fig = go.Figure(go.Heatmap(x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+                                   z=np.where(counts.T > 0, counts.T, np.nan), colorscale='gray'))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title)
+    return style(fig, 500)
@@ -0,0 +1,149 @@
+"""On-demand next-year revenue forecasts from a trained artifact bundle.
+
+A ``Forecaster`` pairs a fitted model with the feature encoders it was
+trained with. Features are built only from the trailing window of years the
+lag and rolling features need, so scoring a whole year is a few array
+operations plus one ``predict`` call. Target years past the data are reached
+by rolling the forecast forward one year at a time.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from fortune500_artifacts import ARTIFACT_DIR, load_model
+from fortune500_features import FEATURE_COLUMNS, FEATURES_VERSION, ROLLING_WINDOW, build_features
+
+# الأعمدة التي يمكن تعديلها في سيناريو "ماذا لو"
+OVERRIDE_COLUMNS = ['revenue_mil', 'profit_mil', 'employees']
+MAX_HORIZON = 10
+
+
+def has_models(path=None):
+    try:
+        with open(os.path.join(path or ARTIFACT_DIR, 'manifest.json'), encoding='utf-8') as f:
+            return bool(json.load(f).get('models'))
+    except FileNotFoundError:
+        return False
+
+
+def listed_once(df):
+    # بعض السنوات فيها الاسم مرتين (Willamette Industries 1999، TruServ 2001، Caremark Rx وITT Industries 2002):
+    # يُبقى الصف الأعلى ترتيباً حتى يكون الاسم مفتاحاً فريداً داخل كل سنة
+    return df.sort_values('rank', kind='stable').drop_duplicates(['name', 'year']).sort_index()
+
+
+def apply_overrides(df, year, overrides):
+    # overrides: {company: {column: value}} على صف الشركة في سنة الأساس
+    df = df.copy()
+    names = df['name'].astype(str)
+    for company, values in (overrides or {}).items():
+        rows = (names == company) & (df['year'] == year)
+        for col, value in values.items():
+            if col not in OVERRIDE_COLUMNS:
+                raise ValueError(f"Cannot override {col}")
+            df.loc[rows, col] = value
+    return df
+
+
+def next_year_rows(window, scored):
+    # صف مفترض لكل شركة في السنة التالية: الإيرادات المتوقعة مع ثبات الهامش والإنتاجية
+    base = window[window['year'] == scored['year'].iloc[0]].copy()
+    base['name'] = base['name'].astype(str)
+    base = base.set_index('name').loc[scored['name']]
+    growth = scored['predicted'].to_numpy() / base['revenue_mil'].to_numpy()
+    rows = base.reset_index()
+    rows['year'] = rows['year'] + 1
+    rows['revenue_mil'] = scored['predicted'].to_numpy()
+    rows['profit_mil'] = base['profit_mil'].to_numpy() * growth
+    rows['asset_mil'] = base['asset_mil'].to_numpy() * growth
+    rows['employees'] = base['employees'].to_numpy() * growth
+    rows['rank'] = rows['revenue_mil'].rank(ascending=False, method='first').to_numpy()
+    return rows
+
+
+class Forecaster:
+    """A fitted model together with the feature builder it was trained with."""
+
+    def __init__(self, model, encoders, model_name=None):
+        self.model = model
+        self.encoders = encoders
+        self.model_name = model_name
+
+    @classmethod
+    def from_bundle(cls, path=None, model_name=None):
+        path = path or ARTIFACT_DIR
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        features = manifest.get('features') or {}
+        if features.get('version') != FEATURES_VERSION:
+            raise ValueError(f"Bundle was trained with features version {features.get('version')!r}, "
+                             f"expected {FEATURES_VERSION!r}; retrain with fortune500_training.py")
+        model_name = model_name or manifest.get('best_model')
+        if model_name not in manifest.get('models', {}):
+            raise ValueError(f"No fitted model {model_name!r} in {path}")
+        return cls(load_model(model_name, path), features['encoders'], model_name)
+
+    def year_features(self, df, year):
+        # يكفي آخر ROLLING_WINDOW سنوات لحساب النمو والمتوسط المتحرك
+        window = listed_once(df[(df['year'] > year - ROLLING_WINDOW) & (df['year'] <= year)])
+        features, _ = build_features(window, self.encoders)
+        return features[features['year'] == year].reset_index(drop=True)
+
+    def score(self, features, fill):
+        X = features[FEATURE_COLUMNS].fillna(fill)
+        return np.clip(self.model.predict(X.to_numpy()), 0, None)
+
+    def predict_year(self, df, year, companies=None, overrides=None):
+        """Next-year revenue of the companies listed in ``year``."""
+        if overrides:
+            df = apply_overrides(df[(df['year'] > year - ROLLING_WINDOW) & (df['year'] <= year)], year, overrides)
+        features = self.year_features(df, year)
+        # القيم الناقصة تُملأ بمتوسط السنة كلها كما في الـ notebook، حتى عند اختيار شركات محددة
+        fill = features[FEATURE_COLUMNS].mean()
+        if companies is not None:
+            features = features[features['name'].isin(list(companies))].reset_index(drop=True)
+        predicted = self.score(features, fill)
+        return pd.DataFrame({
+            'name': features['name'],
+            'year': year,
+            'target_year': year + 1,
+            'rank': features['rank'].astype(int),
+            'revenue_mil': features['revenue_mil'],
+            'predicted': predicted,
+            'predicted_growth': (predicted - features['revenue_mil']) / features['revenue_mil'] * 100,
+        })
+
+    def forecast(self, df, target_year, companies=None, overrides=None):
+        """Revenue in ``target_year`` from the latest listed year before it.
+
+        Past the end of the data the forecast is rolled forward year by year
+        from synthetic rows (predicted revenue, same margin and productivity);
+        ``actual`` is filled when ``target_year`` is in the data.
+        """
+        last = int(df['year'].max())
+        base = min(target_year - 1, last)
+        if target_year - base > MAX_HORIZON:
+            raise ValueError(f"At most {MAX_HORIZON} years past {last}")
+        if base < int(df['year'].min()):
+            raise ValueError(f"No data before {target_year}")
+
+        window = listed_once(df[(df['year'] > base - ROLLING_WINDOW) & (df['year'] <= base)])
+        if overrides:
+            window = apply_overrides(window, base, overrides)
+        scored = self.predict_year(window, base)
+        while base + 1 < target_year:
+            window = pd.concat([window[window['year'] > base + 1 - ROLLING_WINDOW], next_year_rows(window, scored)],
+                               ignore_index=True)
+            base += 1
+            scored = self.predict_year(window, base)
+
+        result = scored.assign(target_year=target_year)
+        if target_year <= last:
+            actual = listed_once(df[df['year'] == target_year])[['name', 'revenue_mil']]
+            actual = actual.astype({'name': str}).set_index('name')['revenue_mil']
+            result['actual'] = result['name'].map(actual).astype('float64')
+        if companies is not None:
+            result = result[result['name'].isin(list(companies))]
+        return result.sort_values('predicted', ascending=False, ignore_index=True)
@@ -0,0 +1,141 @@
+"""Per-year partition store for the main dataset.
+
+    python fortune500_ingest.py init                          # partition the full history once
+    python fortune500_ingest.py add fortune500_2024.csv --year 2024
+    python fortune500_ingest.py status
+
+``init`` cleans the raw history and stores the fill values (medians and modes)
+in the manifest. ``add`` cleans only the new year's rows with those stored
+values and rewrites only that year's partition; running dashboards and API
+servers pick it up on their next rerun or request and recompute only the
+aggregates of that year.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from fortune500_cleaning import RAW_CSV, apply_cleaning, compute_fill_values
+from fortune500_data import (DATA_DIR, PARTITION_DIR, pa, partition_manifest_path,
+                             read_partition_manifest)
+from fortune500_schema import SCHEMA_VERSION, apply_schema
+
+STORE_FORMAT = 1
+
+
+def partition_file(year):
+    return f"year={year}.arrow"
+
+
+def to_table(df):
+    table = pa.Table.from_pandas(apply_schema(df), preserve_index=False)
+    # نفس نوع الفهارس في كل الأقسام حتى تُدمج بدون تحويل
+    fields = [pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+              if pa.types.is_dictionary(f.type) else f for f in table.schema]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+def write_partition(year, df):
+    os.makedirs(PARTITION_DIR, exist_ok=True)
+    target = os.path.join(PARTITION_DIR, partition_file(year))
+    tmp = target + '.tmp'
+    table = to_table(df)
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    with open(tmp, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    os.replace(tmp, target)
+    return {'file': partition_file(year), 'rows': len(df), 'hash': digest}
+
+
+def write_manifest(manifest):
+    manifest['updated'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    target = partition_manifest_path()
+    tmp = target + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    # الـ manifest يُستبدل أخيراً: القراء يرون إما الأقسام القديمة أو الجديدة كاملة
+    os.replace(tmp, target)
+    return target
+
+
+def init_store(raw=None):
+    if pa is None:
+        raise RuntimeError("pyarrow is required for the partition store")
+    df = pd.read_csv(raw or os.path.join(DATA_DIR, RAW_CSV))
+    fill_values = compute_fill_values(df)
+    cleaned = apply_cleaning(df, fill_values)
+    partitions = {str(year): write_partition(year, rows)
+                  for year, rows in cleaned.groupby('year', sort=True)}
+    write_manifest({
+        'format': STORE_FORMAT,
+        'schema': SCHEMA_VERSION,
+        'cleaning': fill_values,
+        'partitions': partitions,
+    })
+    return sorted(int(year) for year in partitions)
+
+
+def ingest(source, year=None):
+    """Clean and store the rows of ``source`` (a path or frame), one partition per year."""
+    manifest = read_partition_manifest()
+    if manifest is None:
+        raise RuntimeError("No partition store found; run `python fortune500_ingest.py init` first")
+    if manifest.get('schema') != SCHEMA_VERSION:
+        raise RuntimeError(f"Store was built with schema {manifest.get('schema')}; run init again")
+
+    df = pd.read_csv(source) if isinstance(source, (str, os.PathLike)) else source
+    if year is not None:
+        df = df.assign(year=year) if 'year' not in df.columns else df[df['year'] == year]
+    if df.empty:
+        raise ValueError("No rows to ingest")
+
+    written = []
+    for part_year, rows in df.groupby('year', sort=True):
+        part = write_partition(int(part_year), apply_cleaning(rows, manifest['cleaning']))
+        manifest['partitions'][str(int(part_year))] = part
+        written.append(int(part_year))
+    write_manifest(manifest)
+    return written
+
+
+def status():
+    manifest = read_partition_manifest()
+    if manifest is None:
+        return pd.DataFrame(columns=['rows', 'hash'])
+    table = pd.DataFrame.from_dict(manifest['partitions'], orient='index')[['rows', 'hash']]
+    table.index = table.index.astype(int)
+    return table.sort_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fortune 500 partition store")
+    commands = parser.add_subparsers(dest='command', required=True)
+    init_cmd = commands.add_parser('init', help="partition the raw history and store the fill values")
+    init_cmd.add_argument('--raw', help=f"raw list (default: {RAW_CSV})")
+    add_cmd = commands.add_parser('add', help="clean and store one new list")
+    add_cmd.add_argument('source')
+    add_cmd.add_argument('--year', type=int, help="year of the list when the file has no year column")
+    commands.add_parser('status', help="rows and hash of each partition")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'init':
+        years = init_store(args.raw)
+        print(f"Partitioned {len(years)} years ({years[0]}-{years[-1]}) into {PARTITION_DIR}")
+    elif args.command == 'add':
+        years = ingest(args.source, args.year)
+        print(f"Ingested {', '.join(map(str, years))}")
+    else:
+        print(status().to_string())
+        return
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
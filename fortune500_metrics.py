@@ -0,0 +1,126 @@
+"""Opt-in performance instrumentation for dashboard reruns.
+
+Enable with ``FORTUNE500_DIAGNOSTICS=1`` or the ``?diagnostics=1`` query
+parameter. Each rerun records the wall time of its stages (data load,
+filtering, aggregation, figure build, render); completed reruns are added
+to a process-wide registry that the sidebar panel and the API's
+``/metrics`` endpoint read, and can be written as JSON log lines with
+``FORTUNE500_METRICS_LOG=stderr`` or ``=<path>``.
+"""
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+STAGES = ['data load', 'filtering', 'aggregation', 'figure build', 'render']
+
+logger = logging.getLogger('fortune500.metrics')
+
+
+def env_enabled():
+    return os.environ.get('FORTUNE500_DIAGNOSTICS', '').lower() in ('1', 'true', 'yes')
+
+
+def process_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        # بدون /proc نكتفي بالذروة بدلاً من القيمة الحالية
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+class RerunTimer:
+    """Wall-time per stage for a single rerun; repeated stages accumulate."""
+
+    def __init__(self, page=None):
+        self.page = page
+        self.stages = OrderedDict((name, 0.0) for name in STAGES)
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def record(self, **extra):
+        return {
+            'page': self.page,
+            'total_s': self.total(),
+            'stages_s': dict(self.stages),
+            'rss_mb': process_rss_mb(),
+            **extra,
+        }
+
+
+class MetricsRegistry:
+    """Process-wide aggregate of rerun records, shared by sessions and the API."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._caches = {}
+        self.reruns = 0
+
+    def observe(self, record):
+        with self._lock:
+            self.reruns += 1
+            page = self._pages.setdefault(record['page'], {'reruns': 0, 'total_s': 0.0, 'max_s': 0.0,
+                                                           'stages_s': OrderedDict()})
+            page['reruns'] += 1
+            page['total_s'] += record['total_s']
+            page['max_s'] = max(page['max_s'], record['total_s'])
+            for name, seconds in record['stages_s'].items():
+                page['stages_s'][name] = page['stages_s'].get(name, 0.0) + seconds
+
+    def register_cache(self, name, cache):
+        with self._lock:
+            self._caches[name] = cache
+
+    def cache_stats(self):
+        with self._lock:
+            caches = dict(self._caches)
+        return {name: cache.stats() for name, cache in caches.items()}
+
+    def snapshot(self):
+        with self._lock:
+            pages = {page: {**values, 'mean_s': values['total_s'] / values['reruns'],
+                            'stages_s': dict(values['stages_s'])}
+                     for page, values in self._pages.items()}
+            reruns = self.reruns
+        return {'reruns': reruns, 'rss_mb': process_rss_mb(), 'pages': pages, 'caches': self.cache_stats()}
+
+
+registry = MetricsRegistry()
+
+
+def configure_log():
+    target = os.environ.get('FORTUNE500_METRICS_LOG')
+    if not target or logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == 'stderr' else logging.FileHandler(target)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def finish(timer, **extra):
+    record = timer.record(**extra)
+    registry.observe(record)
+    if logger.handlers:
+        logger.info(json.dumps({'event': 'rerun', **record}, default=str))
+    return record
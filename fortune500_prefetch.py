@@ -0,0 +1,98 @@
+"""Background precomputation of the views a user is likely to open next.
+
+After a rerun has rendered, the dashboard hands the prefetcher the cache keys
+and builders of neighbouring states (adjacent years, common year pairs).
+They are built by a small thread pool straight into the shared ``LRUCache``,
+so the next click is a cache hit. Each session keeps only its latest batch:
+the next rerun cancels it before rendering, so prefetching never competes
+with the view the user is waiting for.
+
+``FORTUNE500_PREFETCH_WORKERS`` sets the pool size; ``0`` disables prefetching.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_WORKERS = int(os.environ.get('FORTUNE500_PREFETCH_WORKERS', 1))
+
+
+class PrefetchBatch:
+    """The pending builds scheduled by one rerun."""
+
+    def __init__(self):
+        self.futures = []
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        # المهام في الطابور تُلغى، والمهمة الجارية تكمل شكلها الحالي فقط
+        self._cancelled.set()
+        return sum(future.cancel() for future in self.futures)
+
+    def done(self):
+        return all(future.done() for future in self.futures)
+
+    def wait(self, timeout=None):
+        for future in self.futures:
+            if not future.cancelled():
+                future.exception(timeout)
+
+
+class Prefetcher:
+    """Thread pool that fills caches ahead of the user, shared by every session."""
+
+    def __init__(self, workers=PREFETCH_WORKERS):
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fortune500-prefetch') \
+            if workers > 0 else None
+        self._lock = threading.Lock()
+        self.counts = {'scheduled': 0, 'built': 0, 'skipped': 0, 'cancelled': 0, 'failed': 0}
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def submit(self, cache, tasks):
+        """Build the ``(key, builder)`` pairs that are not cached yet; returns their batch."""
+        batch = PrefetchBatch()
+        if self._pool is None:
+            return batch
+        seen = set()
+        for key, builder in tasks:
+            if key in seen or key in cache:
+                continue
+            seen.add(key)
+            batch.futures.append(self._pool.submit(self._build, batch, cache, key, builder))
+        self.count('scheduled', len(batch.futures))
+        return batch
+
+    def cancel(self, batch):
+        if batch is not None:
+            self.count('cancelled', batch.cancel())
+
+    def _build(self, batch, cache, key, builder):
+        if batch.cancelled:
+            self.count('cancelled')
+            return
+        # قد تكون جلسة أخرى بنته في هذه الأثناء
+        if key in cache:
+            self.count('skipped')
+            return
+        try:
+            cache.get_or_build(key, builder, prefetch=True)
+        except Exception:
+            # فشل التحميل المسبق لا يظهر للمستخدم: الصفحة تبني الشكل عند طلبه
+            self.count('failed')
+            return
+        self.count('built')
+
+    def stats(self):
+        with self._lock:
+            return {'workers': self.workers, **self.counts}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
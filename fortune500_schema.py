@@ -0,0 +1,67 @@
+"""Compact dtypes for the cleaned Fortune 500 frame."""
+import pandas as pd
+
+# يتغير عند تعديل SCHEMA حتى يُعاد بناء الـ snapshots القديمة
+SCHEMA_VERSION = '2'
+
+FLAG_VALUES = {'yes': True, 'no': False}
+
+SCHEMA = {
+    'name': 'category',
+    'rank': 'int16',
+    'year': 'int16',
+    'industry': 'category',
+    'sector': 'category',
+    'headquarters_state': 'category',
+    'headquarters_city': 'category',
+    # الأعمدة المالية تبقى float64: float32 يضيف ضوضاء تظهر في الـ JSON والتصدير والمجاميع
+    'market_value_mil': 'float64',
+    'revenue_mil': 'float64',
+    'profit_mil': 'float64',
+    'asset_mil': 'float64',
+    'employees': 'float64',
+    'founder_is_ceo': 'flag',
+    'female_ceo': 'flag',
+    'newcomer_to_fortune_500': 'flag',
+    'global_500': 'flag',
+}
+
+
+def to_flag(series):
+    if series.dtype == bool:
+        return series
+    values = series.astype(str).str.strip().str.lower().map(FLAG_VALUES)
+    # القيم غير المعروفة تبقى فارغة بدلاً من اعتبارها "no"
+    return values.astype('boolean') if values.isna().any() else values.astype(bool)
+
+
+def apply_schema(df, schema=SCHEMA):
+    typed = df.copy()
+    for col, dtype in schema.items():
+        if col not in typed.columns:
+            continue
+        if dtype == 'flag':
+            typed[col] = to_flag(typed[col])
+        elif dtype.startswith('int') and typed[col].isna().any():
+            typed[col] = typed[col].astype(dtype.capitalize())
+        else:
+            typed[col] = typed[col].astype(dtype)
+    return typed
+
+
+def add_profit_margin(df):
+    if 'profit_margin' not in df.columns:
+        df['profit_margin'] = (df['profit_mil'] / df['revenue_mil']) * 100
+    return df
+
+
+def memory_report(before, after):
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.reindex(before.columns).astype(str),
+        'bytes_before': before.memory_usage(deep=True, index=False),
+        'bytes_after': after.memory_usage(deep=True, index=False).reindex(before.columns),
+    })
+    report.loc['TOTAL'] = ['', '', report['bytes_before'].sum(), report['bytes_after'].sum()]
+    report['saved_pct'] = (1 - report['bytes_after'] / report['bytes_before']) * 100
+    return report
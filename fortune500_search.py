@@ -0,0 +1,207 @@
+"""Company search and name-variant resolution.
+
+The list spells one company differently across years ("Wal-Mart Stores,
+Inc.", "Wal-Mart Stores", "Walmart"). ``resolve_entities`` gives every raw
+name an integer company ID: names that normalize to the same key are one
+company, and a key that leaves the list in the year another key with the
+same stem enters it, with continuous revenue, is treated as a rename.
+
+``SearchIndex`` answers typeahead queries over every variant with a sorted
+table of name and word prefixes (binary search) and falls back to a trigram
+index for infix and misspelled queries. Both are built once per dataset
+version by the engine.
+"""
+import bisect
+import math
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# لواحق الشكل القانوني التي لا تميز شركة عن أخرى
+LEGAL_WORDS = {'the', 'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'companies',
+               'ltd', 'limited', 'plc', 'llc', 'lp'}
+# أقصر جذر مشترك يُقبل لربط اسمين كإعادة تسمية
+STEM_MIN = 4
+# أقصى تغير في الإيرادات بين آخر سنة للاسم القديم وأول سنة للجديد
+RENAME_MAX_RATIO = 1.5
+SEARCH_LIMIT = 20
+# نسبة الـ trigrams المشتركة المطلوبة في البحث التقريبي
+NGRAM_MIN_SHARE = 0.6
+# استعلام أقصر من ذلك له trigram واحد فيطابق أسماء كثيرة بلا معنى
+NGRAM_MIN_LENGTH = 4
+MEMO_MAX_LENGTH = 2
+
+
+def normalize(name):
+    """Lowercase ASCII words of ``name`` without legal-form words."""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode().lower()
+    # AT&T -> att، أما "Johnson & Johnson" فتصبح and
+    text = re.sub(r'(?<=\w)&(?=\w)', '', text).replace('&', ' and ')
+    words = re.findall(r'[a-z0-9]+', text)
+    kept = [word for word in words if word not in LEGAL_WORDS]
+    return ' '.join(kept or words)
+
+
+def name_key(name):
+    return normalize(name).replace(' ', '')
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def is_stem(a, b):
+    short, long = sorted((a, b), key=len)
+    return len(short) >= STEM_MIN and long.startswith(short)
+
+
+def resolve_entities(df):
+    """Company IDs for the raw names of ``df``.
+
+    Returns a dict with ``names`` (canonical name per ID: the spelling of the
+    latest year), ``variants`` (raw name -> ID), ``aliases`` (raw names per
+    ID) and ``best_rank`` / ``first_year`` / ``last_year`` arrays per ID.
+    """
+    # العمل بلغة Python على الأسماء الفريدة فقط، ثم يُوزع على الصفوف بالفهارس
+    name_codes, raw_names = pd.factorize(df['name'].astype(str).to_numpy())
+    key_of_name, keys = pd.factorize(np.array([name_key(name) for name in raw_names], dtype=object))
+    row_keys = key_of_name[name_codes]
+    frame = pd.DataFrame({'name': raw_names[name_codes], 'key': keys[row_keys],
+                          'year': df['year'].to_numpy(dtype=int),
+                          'revenue_mil': df['revenue_mil'].to_numpy(dtype='float64'),
+                          'rank': df['rank'].to_numpy(dtype='float64')})
+
+    spans = frame.groupby('key')['year'].agg(['min', 'max'])
+    revenue = frame.groupby(['key', 'year'])['revenue_mil'].max()
+    parent = {key: key for key in spans.index}
+
+    def root(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    # إعادة التسمية: اسم يختفي في سنة واسم بنفس الجذر يظهر في السنة التالية بإيرادات قريبة
+    entering = defaultdict(list)
+    for key, first in spans['min'].items():
+        entering[first].append(key)
+    links = []
+    for key, last in spans['max'].items():
+        for other in entering.get(last + 1, []):
+            if is_stem(key, other):
+                ratio = revenue[other, last + 1] / revenue[key, last]
+                if 1 / RENAME_MAX_RATIO <= ratio <= RENAME_MAX_RATIO:
+                    links.append((abs(math.log(ratio)), key, other))
+    linked_old, linked_new = set(), set()
+    for _, old, new in sorted(links):
+        if old not in linked_old and new not in linked_new:
+            linked_old.add(old)
+            linked_new.add(new)
+            parent[root(old)] = root(new)
+
+    entity_of_key = np.array([root(key) for key in keys], dtype=object)
+    frame['entity'] = entity_of_key[row_keys]
+    latest = frame.sort_values(['year', 'revenue_mil'], ascending=False, kind='stable').drop_duplicates('entity')
+    canonical = dict(zip(latest['entity'], latest['name']))
+    # المعرفات مرتبة حسب الاسم المعتمد حتى تبقى ثابتة لنفس البيانات
+    entities = sorted(canonical, key=lambda entity: (canonical[entity], entity))
+    ids = {entity: i for i, entity in enumerate(entities)}
+    id_of_key = np.array([ids[entity] for entity in entity_of_key], dtype=np.int64)
+    frame['company_id'] = id_of_key[row_keys]
+
+    per_id = frame.groupby('company_id')
+    aliases = per_id['name'].unique()
+    return {
+        'names': np.array([canonical[entity] for entity in entities], dtype=object),
+        'variants': dict(zip(raw_names, id_of_key[key_of_name].tolist())),
+        'aliases': [sorted(aliases[i]) for i in range(len(entities))],
+        'best_rank': per_id['rank'].min().to_numpy(),
+        'first_year': per_id['year'].min().to_numpy(),
+        'last_year': per_id['year'].max().to_numpy(),
+    }
+
+
+def company_ids(entities, names):
+    """Company ID per raw name (-1 for names not in ``entities``)."""
+    # البحث في القاموس مرة لكل اسم فريد (فئات العمود الفئوي)، ثم take على الصفوف
+    codes, uniques = pd.factorize(pd.Series(names), use_na_sentinel=True)
+    variants = entities['variants']
+    # عنصر أخير -1 للقيم الفارغة (رمزها -1 في factorize)
+    lookup = np.array([variants.get(str(name), -1) for name in uniques] + [-1], dtype=np.int64)
+    return lookup[codes]
+
+
+class SearchIndex:
+    """Typeahead over every name variant; results are company IDs, best first."""
+
+    def __init__(self, entities):
+        self.names = entities['names']
+        # الأشهر أولاً: أفضل ترتيب وصلت إليه الشركة ثم الأحدث
+        order = np.lexsort((-entities['last_year'], entities['best_rank']))
+        self.popularity = np.empty(len(order), dtype=np.int64)
+        self.popularity[order] = np.arange(len(order))
+        self.top = [int(i) for i in order]
+
+        # (المفتاح، 0 للاسم كاملاً و1 لبداية كلمة داخله، المعرف)
+        entries = set()
+        grams = defaultdict(set)
+        self.exact = {}
+        for raw, company_id in entities['variants'].items():
+            company_id = int(company_id)
+            words = normalize(raw).split()
+            compact = ''.join(words)
+            self.exact.setdefault(compact, company_id)
+            entries.add((' '.join(words), 0, company_id))
+            entries.add((compact, 0, company_id))
+            for i in range(1, len(words)):
+                entries.add((' '.join(words[i:]), 1, company_id))
+            for gram in trigrams(compact):
+                grams[gram].add(company_id)
+        entries = sorted(entries)
+        self.keys = [key for key, _, _ in entries]
+        self.entries = [(inner, company_id) for _, inner, company_id in entries]
+        self.grams = {gram: np.fromiter(ids, dtype=np.int64) for gram, ids in grams.items()}
+        self._memo = {}
+
+    def lookup(self, name):
+        """Company ID of an exact name (any spelling), or ``None``."""
+        return self.exact.get(name_key(name))
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        text = normalize(query)
+        if not text:
+            return self.top[:limit]
+        if len(text) <= MEMO_MAX_LENGTH and (text, limit) in self._memo:
+            return list(self._memo[text, limit])
+        results = self.prefix_matches(text, limit)
+        if len(results) < limit and len(text.replace(' ', '')) >= NGRAM_MIN_LENGTH:
+            seen = set(results)
+            results += [company_id for company_id in self.ngram_matches(text.replace(' ', ''), limit)
+                        if company_id not in seen][:limit - len(results)]
+        if len(text) <= MEMO_MAX_LENGTH:
+            self._memo[text, limit] = list(results)
+        return results
+
+    def prefix_matches(self, text, limit):
+        start = bisect.bisect_left(self.keys, text)
+        stop = bisect.bisect_left(self.keys, text + '\x7f', start)
+        best = {}
+        for key, (inner, company_id) in zip(self.keys[start:stop], self.entries[start:stop]):
+            # بداية الاسم قبل بداية كلمة داخله، والتطابق التام أولاً داخل كل منهما
+            score = (inner, key != text)
+            if company_id not in best or score < best[company_id]:
+                best[company_id] = score
+        return sorted(best, key=lambda company_id: (best[company_id], self.popularity[company_id]))[:limit]
+
+    def ngram_matches(self, text, limit):
+        postings = [self.grams[gram] for gram in trigrams(text) if gram in self.grams]
+        needed = max(1, math.ceil(len(trigrams(text)) * NGRAM_MIN_SHARE))
+        if len(postings) < needed:
+            return []
+        ids, counts = np.unique(np.concatenate(postings), return_counts=True)
+        ids, counts = ids[counts >= needed], counts[counts >= needed]
+        order = np.lexsort((self.popularity[ids], -counts))
+        return [int(company_id) for company_id in ids[order[:limit]]]
@@ -0,0 +1,267 @@
+"""Train the next-year revenue models in parallel and write an artifact bundle.
+
+    python fortune500_training.py                                  # every installed candidate
+    python fortune500_training.py --models "Random Forest" XGBoost --early-stopping 30
+    python fortune500_training.py --jobs 2 --output /tmp/artifacts
+    python fortune500_training.py --backtest                       # also run fortune500_backtest.py
+
+Replaces ``AdvancedMLModels`` in ``Untitled7.ipynb``. The feature matrix comes
+from the per-version cache in ``fortune500_features``; each candidate is fitted
+in its own process with its threads limited to its share of the cores, and
+the boosting models stop early on a validation slice at the end of the
+training rows. XGBoost and LightGBM are used when installed.
+"""
+import argparse
+import importlib.util
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from fortune500_artifacts import regression_metrics, slugify, write_bundle
+from fortune500_data import csv_path, load_all
+from fortune500_features import (FEATURE_COLUMNS, FEATURES_VERSION, TARGET, feature_matrix,
+                                 training_rows)
+
+ESTIMATORS = 200
+EARLY_STOPPING = 20
+TEST_SIZE = 0.2
+# الجزء الأخير من صفوف التدريب يُستخدم للإيقاف المبكر
+VALID_SIZE = 0.1
+SEED = 42
+
+
+# ==================== CANDIDATES ====================
+def build_xgboost(estimators, threads, early_stopping):
+    import xgboost as xgb
+    return xgb.XGBRegressor(n_estimators=estimators, learning_rate=0.1, max_depth=6, subsample=0.8,
+                            colsample_bytree=0.8, random_state=SEED, n_jobs=threads,
+                            early_stopping_rounds=early_stopping or None)
+
+
+def fit_xgboost(model, X, y, X_valid, y_valid, early_stopping):
+    model.fit(X, y, eval_set=[(X_valid, y_valid)] if early_stopping else None, verbose=False)
+    return getattr(model, 'best_iteration', None)
+
+
+def warm_xgboost(model, X, y, increment):
+    # تكملة التدريب من الأشجار السابقة على البيانات الجديدة
+    booster = model.get_booster()
+    model.set_params(n_estimators=increment, early_stopping_rounds=None)
+    model.fit(X, y, xgb_model=booster, verbose=False)
+    return model
+
+
+def build_lightgbm(estimators, threads, early_stopping):
+    import lightgbm as lgb
+    return lgb.LGBMRegressor(n_estimators=estimators, learning_rate=0.1, num_leaves=31, subsample=0.8,
+                             colsample_bytree=0.8, random_state=SEED, n_jobs=threads, verbose=-1)
+
+
+def fit_lightgbm(model, X, y, X_valid, y_valid, early_stopping):
+    import lightgbm as lgb
+    if not early_stopping:
+        model.fit(X, y)
+        return None
+    model.fit(X, y, eval_set=[(X_valid, y_valid)],
+              callbacks=[lgb.early_stopping(early_stopping, verbose=False)])
+    return model.best_iteration_
+
+
+def warm_lightgbm(model, X, y, increment):
+    booster = model.booster_
+    model.set_params(n_estimators=increment)
+    model.fit(X, y, init_model=booster)
+    return model
+
+
+def build_random_forest(estimators, threads, early_stopping):
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(n_estimators=estimators, max_depth=15, min_samples_split=5,
+                                 min_samples_leaf=2, random_state=SEED, n_jobs=threads)
+
+
+def build_gradient_boosting(estimators, threads, early_stopping):
+    from sklearn.ensemble import GradientBoostingRegressor
+    # يقتطع جزء التحقق من بيانات التدريب بنفسه
+    return GradientBoostingRegressor(n_estimators=estimators, learning_rate=0.1, max_depth=5,
+                                     random_state=SEED, n_iter_no_change=early_stopping or None,
+                                     validation_fraction=VALID_SIZE)
+
+
+def fit_sklearn(model, X, y, X_valid, y_valid, early_stopping):
+    model.fit(np.concatenate([X, X_valid]), np.concatenate([y, y_valid]))
+    return getattr(model, 'n_estimators_', None)
+
+
+def warm_sklearn(model, X, y, increment):
+    # warm_start يضيف أشجاراً (أو مراحل) جديدة تُدرّب على البيانات الحالية ويبقي القديمة
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + increment)
+    model.fit(X, y)
+    return model
+
+
+CANDIDATES = {
+    'XGBoost': {'module': 'xgboost', 'build': build_xgboost, 'fit': fit_xgboost, 'warm': warm_xgboost,
+                'threaded': True},
+    'LightGBM': {'module': 'lightgbm', 'build': build_lightgbm, 'fit': fit_lightgbm, 'warm': warm_lightgbm,
+                 'threaded': True},
+    'Random Forest': {'module': 'sklearn', 'build': build_random_forest, 'fit': fit_sklearn,
+                      'warm': warm_sklearn, 'threaded': True},
+    'Gradient Boosting': {'module': 'sklearn', 'build': build_gradient_boosting, 'fit': fit_sklearn,
+                          'warm': warm_sklearn, 'threaded': False},
+}
+
+
+def available_models(names=None):
+    names = names or list(CANDIDATES)
+    unknown = [name for name in names if name not in CANDIDATES]
+    if unknown:
+        raise ValueError(f"Unknown models: {', '.join(unknown)}")
+    return [name for name in names if importlib.util.find_spec(CANDIDATES[name]['module']) is not None]
+
+
+def thread_shares(names, cpus, jobs):
+    # كل عملية تأخذ نصيبها من الأنوية، والنماذج أحادية الخيط تأخذ نواة واحدة
+    share = max(1, cpus // jobs)
+    return {name: share if CANDIDATES[name]['threaded'] else 1 for name in names}
+
+
+# ==================== TRAINING ====================
+def split(rows, test_size=TEST_SIZE):
+    # بدون خلط مثل الـ notebook: آخر 20% من الصفوف المرتبة حسب (الشركة، السنة)
+    n_test = math.ceil(len(rows) * test_size)
+    return rows.iloc[:len(rows) - n_test], rows.iloc[len(rows) - n_test:]
+
+
+def train_candidate(name, matrix_path, test_size, estimators, threads, early_stopping, staging):
+    from threadpoolctl import threadpool_limits
+    import joblib
+
+    train, test = split(training_rows(pd.read_parquet(matrix_path)), test_size)
+    n_valid = math.ceil(len(train) * VALID_SIZE)
+    X = train[FEATURE_COLUMNS].to_numpy()
+    y = train[TARGET].to_numpy()
+    candidate = CANDIDATES[name]
+    start = time.perf_counter()
+    with threadpool_limits(threads):
+        model = candidate['build'](estimators, threads, early_stopping)
+        iterations = candidate['fit'](model, X[:-n_valid], y[:-n_valid], X[-n_valid:], y[-n_valid:],
+                                      early_stopping)
+        predictions = model.predict(test[FEATURE_COLUMNS].to_numpy())
+    fit_s = time.perf_counter() - start
+    model_file = os.path.join(staging, slugify(name) + '.joblib')
+    joblib.dump(model, model_file)
+    return {'name': name, 'predictions': predictions, 'model_file': model_file, 'fit_s': fit_s,
+            'iterations': None if iterations is None else int(iterations), 'threads': threads}
+
+
+def write_forecast(forecaster, df, path):
+    year = int(df['year'].max())
+    scored = forecaster.predict_year(df, year)
+    details = df[df['year'] == year][['name', 'rank', 'year', 'industry', 'sector', 'headquarters_state']]
+    details = details.astype({'name': str})
+    table = (details.merge(scored[['name', 'revenue_mil', 'predicted', 'predicted_growth']], on='name')
+                    .rename(columns={'predicted': f'predicted_{year + 1}_revenue'})
+                    .sort_values(f'predicted_{year + 1}_revenue', ascending=False))
+    table.to_csv(path, index=False)
+    return path
+
+
+def train(models=None, jobs=None, estimators=ESTIMATORS, early_stopping=EARLY_STOPPING,
+          test_size=TEST_SIZE, output=None, forecast_path=None, refresh_features=False, verbose=True):
+    dataset = load_all(['main'])
+    start = time.perf_counter()
+    matrix, encoders, matrix_path = feature_matrix(dataset, refresh=refresh_features)
+    if verbose:
+        print(f"Features: {len(matrix):,} rows in {time.perf_counter() - start:.2f}s ({matrix_path})")
+
+    names = available_models(models)
+    if not names:
+        raise RuntimeError("None of the requested models is installed")
+    cpus = os.cpu_count() or 1
+    jobs = min(jobs or cpus, len(names))
+    threads = thread_shares(names, cpus, jobs)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='fortune500-models-') as staging:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(train_candidate, name, matrix_path, test_size, estimators,
+                                   threads[name], early_stopping, staging) for name in names]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result['name']] = result
+                if verbose:
+                    stopped = f", {result['iterations']} iterations" if result['iterations'] is not None else ""
+                    print(f"  {result['name']:<18} {result['fit_s']:6.2f}s on {result['threads']} threads{stopped}")
+
+        _, test = split(training_rows(matrix), test_size)
+        y_true = test[TARGET].to_numpy()
+        predictions = {name: results[name]['predictions'] for name in names}
+        scores = {name: regression_metrics(y_true, values) for name, values in predictions.items()}
+        best_model = max(scores, key=lambda name: scores[name]['R2'])
+        if len(predictions) > 1:
+            predictions['Ensemble (Average)'] = np.mean([predictions[name] for name in names], axis=0)
+
+        if forecast_path is not False:
+            import joblib
+            from fortune500_inference import Forecaster
+
+            forecaster = Forecaster(joblib.load(results[best_model]['model_file']), encoders, best_model)
+            write_forecast(forecaster, dataset['main'], forecast_path or csv_path('pred2024'))
+
+        path = write_bundle(
+            y_true=y_true,
+            predictions=predictions,
+            keys=test[['name', 'year']].rename(columns={'name': 'Company', 'year': 'Year'}).astype({'Year': int}),
+            path=output,
+            model_files={name: results[name]['model_file'] for name in names},
+            target=TARGET,
+            feature_columns=FEATURE_COLUMNS,
+            features={'version': FEATURES_VERSION, 'encoders': encoders},
+            best_model=best_model,
+            data_version=dataset.version('main'),
+            training={name: {key: results[name][key] for key in ('fit_s', 'iterations', 'threads')}
+                      for name in names},
+            source='fortune500_training.py',
+        )
+    if verbose:
+        for name, score in scores.items():
+            print(f"{name:<18} RMSE ${score['RMSE']:,.0f}M  MAE ${score['MAE']:,.0f}M  "
+                  f"R2 {score['R2']:.4f}  MAPE {score['MAPE']:.2f}%")
+        print(f"Best model: {best_model}")
+        print(f"Total {time.perf_counter() - start:.2f}s, wrote {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the next-year revenue models")
+    parser.add_argument('--models', nargs='+', help=f"subset of: {', '.join(CANDIDATES)}")
+    parser.add_argument('--jobs', type=int, help="models trained at once (default: one per core)")
+    parser.add_argument('--estimators', type=int, default=ESTIMATORS)
+    parser.add_argument('--early-stopping', type=int, default=EARLY_STOPPING,
+                        help="rounds without improvement before a boosting model stops (0 disables)")
+    parser.add_argument('--test-size', type=float, default=TEST_SIZE)
+    parser.add_argument('--output', help="artifact bundle directory (default: artifacts/)")
+    parser.add_argument('--forecast', help="next-year predictions CSV (default: fortune500_2024_predictions.csv)")
+    parser.add_argument('--no-forecast', action='store_true')
+    parser.add_argument('--refresh-features', action='store_true', help="rebuild the cached feature matrix")
+    parser.add_argument('--backtest', action='store_true', help="also add the walk-forward backtest to the bundle")
+    args = parser.parse_args()
+    path = train(args.models, args.jobs, args.estimators, args.early_stopping, args.test_size, args.output,
+                 False if args.no_forecast else args.forecast, args.refresh_features)
+    if args.backtest:
+        from fortune500_backtest import backtest, summarize
+        from fortune500_artifacts import write_backtest
+
+        table = backtest(args.models, jobs=args.jobs)
+        print(summarize(table).round(2).to_string())
+        print(f"Wrote {write_backtest(table, path)}")
+
+
+if __name__ == "__main__":
+    main()
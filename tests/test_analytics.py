@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fortune500_analytics import (build_company_index, build_cube, build_panel, build_rank_dynamics, company_history,
+                                  growth_rate, panel_columns, panel_compare, rank_movers, select_dynamics,
+                                  survival_curve, turnover, year_industries, year_sectors, year_stats, year_top)
+
+
+def listing(rows):
+    return pd.DataFrame(rows, columns=['company_id', 'year', 'rank', 'revenue_mil']).assign(
+        sector='Retail', industry='Stores', profit_mil=1.0, name=lambda df: 'c' + df['company_id'].astype(str))
+
+
+def dynamics(df, n_companies):
+    index = build_company_index(df.drop(columns='company_id'), df['company_id'].to_numpy(), n_companies)
+    return build_rank_dynamics(index, np.array([f'c{i}' for i in range(n_companies)], dtype=object))
+
+
+@pytest.fixture
+def table():
+    return dynamics(listing([
+        # c0: كل السنوات بنمو 10% سنوياً
+        (0, 2000, 10, 100.0), (0, 2001, 8, 110.0), (0, 2002, 9, 121.0), (0, 2003, 5, 133.1), (0, 2004, 5, 146.41),
+        # c1: خرج في 2002 وعاد في 2004
+        (1, 2000, 50, 40.0), (1, 2001, 60, 38.0), (1, 2004, 20, 60.0),
+        # c2: دخل في 2003 فقط
+        (2, 2003, 300, 5.0),
+    ]), 3)
+
+
+def test_rank_dynamics_metrics(table):
+    c0, c1, c2 = (table.set_index('company_id').loc[i] for i in range(3))
+    assert c0['years_listed'] == 5 and c0['longest_streak'] == 5 and c0['re_entries'] == 0
+    assert c0['mean_rank_change'] == pytest.approx(5 / 4)
+    assert (c0['biggest_rise'], c0['biggest_drop']) == (4, -1)
+    assert c0['revenue_cagr'] == pytest.approx(10.0)
+    assert c0['growth_3y'] == pytest.approx(10.0)
+    assert c0['best_growth_3y'] == pytest.approx(10.0)
+    # السنوات خارج القائمة لا تُحسب تغيراً في الترتيب
+    assert c1['re_entries'] == 1 and c1['first_streak'] == 2 and c1['current_streak'] == 1
+    assert c1['mean_rank_change'] == -10 and np.isnan(c1['rank_volatility'])
+    assert c1['growth_3y'] == pytest.approx(((60 / 38) ** (1 / 3) - 1) * 100)
+    assert (c1['best_rank'], c1['worst_rank'], c1['latest_rank']) == (20, 60, 20)
+    assert not c2['active'] and pd.isna(c2['biggest_rise']) and np.isnan(c2['revenue_cagr'])
+
+
+def test_rank_dynamics_years_past_9999():
+    # مفتاح group * 10000 + year كان يخلط الشركات هنا
+    table = dynamics(listing([(0, 9998, 3, 100.0), (0, 10001, 2, 133.1), (1, 10001, 1, 500.0)]), 2)
+    assert table['growth_3y'].tolist()[0] == pytest.approx(10.0)
+    assert np.isnan(table['growth_3y'].tolist()[1])
+    assert table['re_entries'].tolist() == [1, 0]
+
+
+def test_rank_dynamics_empty():
+    table = dynamics(listing([]).astype({'company_id': int, 'year': int}), 0)
+    assert table.empty
+    assert 'best_growth_3y' in table.columns
+    assert select_dynamics(table).empty
+
+
+def test_select_dynamics(table):
+    assert select_dynamics(table, 'latest_rank')['company_id'].tolist() == [0, 1, 2]
+    assert select_dynamics(table, 'latest_rank', ascending=False, n=1)['company_id'].tolist() == [2]
+    assert select_dynamics(table, 'years_listed', min_years=3)['company_id'].tolist() == [0, 1]
+    assert select_dynamics(table, 'years_listed', status='exited')['company_id'].tolist() == [2]
+    assert select_dynamics(table, 're_entries', sectors=['Energy']).empty
+    with pytest.raises(KeyError):
+        select_dynamics(table, 'nothing')
+
+
+def test_survival_curve(table):
+    curve = survival_curve(table, 2000, 2004)
+    # الداخلون بعد 2000: c2 فقط (دخل 2003 وخرج بعد سنة)
+    assert curve['years'].tolist() == [1, 2]
+    assert curve['survival_pct'].tolist() == [100.0, 0.0]
+
+
+def test_growth_rate():
+    assert growth_rate(100.0, 121.0, 2) == pytest.approx(10.0)
+    rates = growth_rate(np.array([100.0, -5.0, 100.0]), np.array([200.0, 5.0, 150.0]), np.array([1, 2, 0]))
+    assert rates[0] == pytest.approx(100.0) and np.isnan(rates[1:]).all()
+
+
+@pytest.fixture(scope='module')
+def main_df(engine):
+    return engine.df
+
+
+def test_cube_matches_direct_aggregation(main_df):
+    cube = build_cube(main_df.copy())
+    year = main_df[main_df['year'] == 2010]
+    stats = year_stats(cube, 2010)
+    assert stats['companies'] == len(year)
+    assert stats['revenue_sum'] == pytest.approx(year['revenue_mil'].sum())
+    margin = year['profit_mil'] / year['revenue_mil'] * 100
+    assert stats['margin_median'] == pytest.approx(margin.median())
+
+    industries = year_industries(cube, 2010, 5)
+    expected = year.groupby('industry', observed=True)['revenue_mil'].sum().nlargest(5)
+    assert industries.index.tolist() == expected.index.tolist()
+    np.testing.assert_allclose(industries['revenue_sum'], expected)
+    assert year_sectors(cube, 2010)['companies'].sum() == len(year)
+
+    top = year_top(cube, 2010, 3)
+    assert top['name'].astype(str).tolist() == year.nlargest(3, 'revenue_mil')['name'].astype(str).tolist()
+    np.testing.assert_array_equal(cube['revenue_by_year'][2010], np.sort(year['revenue_mil'].to_numpy()))
+    assert cube['totals']['revenue_sum'] == pytest.approx(main_df['revenue_mil'].sum())
+    assert cube['totals']['years'] == main_df['year'].nunique()
+    # الجدول المشترك للقراءة فقط
+    with pytest.raises(ValueError):
+        cube['top_by_year'].iloc[0, 1] = 0
+
+
+def test_company_index_slices_match_filters():
+    df = listing([(2, 2001, 5, 1.0), (0, 2002, 3, 2.0), (2, 2000, 4, 3.0), (0, 2000, 1, 4.0)])
+    index = build_company_index(df.drop(columns='company_id'), df['company_id'].to_numpy(), 4)
+    assert index['starts'].tolist() == [0, 2, 2, 4] and index['stops'].tolist() == [2, 2, 4, 4]
+    assert company_history(index, 0)['year'].tolist() == [2000, 2002]
+    assert company_history(index, 2)['revenue_mil'].tolist() == [3.0, 1.0]
+    assert company_history(index, 1).empty and company_history(index, 3).empty
+    assert company_history(index, -1).empty and company_history(index, 99).empty
+
+
+def test_engine_histories_match_a_scan(engine):
+    df = engine.df
+    walmart = engine.company_id('Walmart')
+    history = engine.company_history(walmart)
+    names = set(engine.company_aliases(walmart))
+    expected = df[df['name'].astype(str).isin(names)].sort_values('year')
+    assert history['year'].tolist() == expected['year'].tolist()
+    np.testing.assert_array_equal(history['revenue_mil'], expected['revenue_mil'])
+
+
+@pytest.fixture
+def panel():
+    return build_panel(pd.DataFrame([
+        # (name, year, rank, revenue, profit)
+        ('a', 2000, 1, 100.0, 10.0), ('a', 2001, 2, 110.0, 11.0), ('a', 2002, 3, 121.0, 12.0),
+        ('b', 2000, 2, 90.0, 9.0), ('b', 2001, 1, 120.0, 12.0),
+        ('c', 2001, 3, 80.0, 8.0), ('c', 2002, 1, 200.0, 20.0),
+        # اسم مكرر في نفس السنة: الأعلى إيرادات يبقى
+        ('d', 2000, 3, 50.0, 5.0), ('d', 2000, 4, 40.0, 4.0), ('d', 2002, 2, 150.0, 15.0),
+    ], columns=['name', 'year', 'rank', 'revenue_mil', 'profit_mil']))
+
+
+def test_build_panel(panel):
+    assert panel['names'].tolist() == ['a', 'b', 'c', 'd']
+    assert panel['years'].tolist() == [2000, 2001, 2002]
+    np.testing.assert_array_equal(panel['values']['rank'],
+                                  [[1, 2, 3], [2, 1, np.nan], [np.nan, 3, 1], [3, np.nan, 2]])
+    assert panel['values']['revenue_mil'][3, 0] == 50.0
+    assert not panel['values']['rank'].flags.writeable
+    with pytest.raises(KeyError):
+        panel_columns(panel, [2000, 1999])
+
+
+def test_panel_compare(panel):
+    frame = panel_compare(panel, [2002, 2000, 2001]).set_index('name')
+    assert frame['status'].to_dict() == {'a': 'stayed', 'b': 'exited', 'c': 'entered', 'd': 'stayed'}
+    assert frame.loc['a', 'revenue_change'] == pytest.approx(21.0)
+    assert frame.loc['a', 'cagr'] == pytest.approx(10.0)
+    assert frame.loc['d', 'years_listed'] == 2
+    assert frame.loc['d', 'rank_change'] == 1 and frame.loc['a', 'rank_change'] == -2
+    assert pd.isna(frame.loc['b', 'cagr']) and pd.isna(frame.loc['b', 'rank_last'])
+    # مدرجة في السنوات الوسطى فقط
+    assert panel_compare(panel, [2000, 2001, 2002])['name'].tolist() == ['c', 'd', 'a', 'b']
+    assert panel_compare(build_panel(pd.DataFrame([
+        ('x', 2000, 1, 1.0, 1.0), ('y', 2001, 1, 1.0, 1.0), ('x', 2002, 1, 1.0, 1.0),
+    ], columns=['name', 'year', 'rank', 'revenue_mil', 'profit_mil'])), [2000, 2001, 2002]).set_index(
+        'name').loc['y', 'status'] == 'between'
+
+
+def test_rank_movers(panel):
+    movers = rank_movers(panel, 2000, 2002)
+    assert movers['risers'].to_dict('records') == [
+        {'name': 'd', 'rank_2000': 3, 'rank_2002': 2, 'rank_change': 1}]
+    assert movers['fallers']['name'].tolist() == ['a']
+    assert movers['fallers']['rank_change'].tolist() == [-2]
+    assert rank_movers(panel, 2000, 2001, n=1)['risers']['name'].tolist() == ['b']
+
+
+def test_turnover(panel):
+    result = turnover(panel, 2000, 2002)
+    assert result['entrants'].to_dict('records') == [{'name': 'c', 'rank': 1, 'revenue_mil': 200.0}]
+    assert result['exits']['name'].tolist() == ['b']
+
+
+def test_engine_panel_matches_the_data(engine):
+    year = int(engine.years()[-1])
+    frame = panel_compare(engine.panel, [year - 1, year])
+    listed = frame[frame[f'revenue_{year}'].notna()]
+    assert len(listed) == engine.df.loc[engine.df['year'] == year, 'name'].nunique()
+    result = turnover(engine.panel, year - 1, year)
+    counts = frame['status'].value_counts()
+    assert len(result['entrants']) == counts.get('entered', 0)
+    assert len(result['exits']) == counts.get('exited', 0)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fortune500_analytics import build_panel
+from fortune500_analyzer import (Fortune500Analyzer, company_growth, derive_features, fit_clusters,
+                                 trend_forecast)
+
+
+@pytest.fixture(scope='module')
+def analyzer(engine):
+    return Fortune500Analyzer(engine.dataset)
+
+
+def test_nothing_runs_until_requested(engine):
+    analyzer = Fortune500Analyzer(engine.dataset)
+    assert analyzer.cache.stats()['size'] == 0
+    report = analyzer.report()
+    # التقرير يبني الخصائص والتجميع السنوي واللوحة ونمو الشركات مرة واحدة
+    assert analyzer.cache.stats()['misses'] == 5
+    assert analyzer.report() is report
+    analyzer.trend_forecast()
+    assert analyzer.cache.stats()['misses'] == 6
+
+
+def test_derive_features_leaves_missing_ratios_empty():
+    df = pd.DataFrame({'year': [1999, 2000, 2011, 2023], 'revenue_mil': [10.0, 20.0, 30.0, 40.0],
+                       'employees': [0.0, 10.0, np.nan, 4.0], 'asset_mil': [5.0, 0.0, 10.0, 8.0]})
+    features = derive_features(df)
+    np.testing.assert_array_equal(features['revenue_per_employee'], [np.nan, 2.0, np.nan, 10.0])
+    np.testing.assert_array_equal(features['asset_turnover'], [2.0, np.nan, 3.0, 5.0])
+    assert features['decade'].tolist() == [1990, 2000, 2010, 2020]
+    assert features['size_category'].astype(str).tolist() == ['Small', 'Medium', 'Large', 'Giant']
+
+
+def test_company_growth():
+    panel = build_panel(pd.DataFrame([
+        ('a', 2000, 1, 100.0, 1.0), ('a', 2002, 1, 121.0, 1.0),
+        ('b', 2001, 2, 50.0, 1.0),
+    ], columns=['name', 'year', 'rank', 'revenue_mil', 'profit_mil']))
+    growth = company_growth(panel).set_index('name')
+    assert growth.loc['a', ['first_year', 'last_year', 'years_listed']].tolist() == [2000, 2002, 2]
+    assert growth.loc['a', 'cagr'] == pytest.approx(10.0)
+    assert growth.loc['b', 'first_revenue'] == growth.loc['b', 'last_revenue'] == 50.0
+    assert np.isnan(growth.loc['b', 'cagr'])
+
+
+def test_trend_forecast_extends_the_line():
+    yearly = pd.DataFrame({'revenue_mean': [100.0, 110.0, 120.0]}, index=pd.Index([2000, 2001, 2002], name='year'))
+    trend = trend_forecast(yearly, 2)
+    assert trend['slope'] == pytest.approx(10.0) and trend['r2'] == pytest.approx(1.0)
+    assert trend['forecast']['year'].tolist() == [2003, 2004]
+    np.testing.assert_allclose(trend['forecast']['revenue_mean'], [130.0, 140.0])
+
+
+def test_fit_clusters_orders_labels_by_the_first_feature():
+    rng = np.random.default_rng(0)
+    centers = np.array([[5.0, 0.0], [-5.0, 0.0], [0.0, 5.0]])
+    X = np.concatenate([center + rng.normal(scale=0.1, size=(300, 2)) for center in centers])
+    labels, fitted = fit_clusters(X, 3, batch=128, epochs=2)
+    assert (np.diff(fitted[:, 0]) > 0).all()
+    assert labels[:300].tolist() == [2] * 300
+    assert labels[300:600].tolist() == [0] * 300
+    assert labels[600:].tolist() == [1] * 300
+
+
+def test_industry_clusters(analyzer):
+    result = analyzer.industry_clusters(3)
+    industries, clusters = result['industries'], result['clusters']
+    assert len(clusters) == 3 and clusters['revenue_mil'].is_monotonic_increasing
+    assert industries['cluster'].dropna().isin(range(3)).all()
+    assert ((industries['cluster_share'] > 0) & (industries['cluster_share'] <= 1)).all()
+    assert industries['companies'].sum() == len(analyzer.df)
+    assert analyzer.industry_clusters(3) is result
+
+
+def test_report_matches_the_data(analyzer):
+    report = analyzer.report()
+    df = analyzer.df
+    assert report['data_summary']['observations'] == len(df)
+    assert report['financial_highlights']['highest_revenue_mil'] == pytest.approx(df['revenue_mil'].max())
+    assert report['data_summary']['companies'] == len(analyzer.panel['names'])
+    assert analyzer.geography()['companies'].sum() == len(df)
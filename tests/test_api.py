@@ -0,0 +1,145 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fortune500_api import ApiError, RefreshThrottle, export_params, make_server, route, to_payload
+
+
+def test_payload_keeps_shortest_float_repr():
+    frame = pd.DataFrame({'name': pd.Categorical(['A', 'B']), 'revenue_mil': [4012.6, 281938702.74],
+                          'rank': np.array([1, 2], dtype='int16'), 'profit_mil': [np.nan, 1.5]})
+    assert to_payload(frame) == [
+        {'name': 'A', 'revenue_mil': 4012.6, 'rank': 1, 'profit_mil': None},
+        {'name': 'B', 'revenue_mil': 281938702.74, 'rank': 2, 'profit_mil': 1.5},
+    ]
+    assert to_payload({'total': np.float64(np.inf), 'missing': pd.NA}) == {'total': None, 'missing': None}
+
+
+def get(engine, path, **query):
+    return route(engine, 'GET', path, {name: value if isinstance(value, list) else [str(value)]
+                                       for name, value in query.items()})
+
+
+def status(engine, method, path, body=None, **query):
+    try:
+        route(engine, method, path, {name: [str(value)] for name, value in query.items()}, body)
+    except ApiError as e:
+        return e.status
+    return 200
+
+
+def test_post_body_must_be_an_object(engine):
+    assert status(engine, 'POST', '/companies/history', body=[]) == 400
+    assert status(engine, 'POST', '/companies/history', body='Walmart') == 400
+    assert status(engine, 'POST', '/companies/history', body={'names': 'Walmart'}) == 400
+    result = route(engine, 'POST', '/companies/history', {}, {'names': ['Walmart', 'No Such Co']})
+    assert list(result['companies']) == ['Walmart']
+    assert result['missing'] == ['No Such Co']
+
+
+def test_numeric_names_are_names_and_ids_are_explicit(engine):
+    # "53" اسم شركة حقيقي وليس المعرف 53
+    by_name = get(engine, '/company/53/history')
+    assert by_name['name'].unique().tolist() == ['53']
+    by_id = get(engine, '/company/history', id=engine.company_id('53'))
+    pd.testing.assert_frame_equal(by_id, by_name)
+    assert get(engine, '/company/history', id=53)['name'].iloc[0] == engine.company_name(53)
+    assert status(engine, 'GET', '/company/history') == 400
+    assert status(engine, 'GET', '/company/history', id='abc') == 400
+    assert status(engine, 'GET', '/company/history', id=10 ** 9) == 404
+    assert status(engine, 'GET', '/company/No Such Co/history') == 404
+
+
+def test_counts_must_be_positive(engine):
+    assert len(get(engine, '/years/2023/top', n=5)) == 5
+    for path in ('/years/2023/top', '/years/2023/industries', '/dynamics', '/search'):
+        name = 'limit' if path == '/search' else 'n'
+        assert status(engine, 'GET', path, q='wal', **{name: -5}) == 400
+        assert status(engine, 'GET', path, q='wal', **{name: 0}) == 400
+        assert status(engine, 'GET', path, q='wal', **{name: 'x'}) == 400
+    assert status(engine, 'GET', '/movers', y1=2020, y2=2023, n=-1) == 400
+
+
+def test_years_and_routes(engine):
+    assert status(engine, 'GET', '/years/1900') == 404
+    assert status(engine, 'GET', '/years/abc') == 400
+    assert status(engine, 'GET', '/compare', year=2020) == 400
+    assert status(engine, 'GET', '/nowhere') == 404
+    assert status(engine, 'POST', '/years') == 404
+    assert get(engine, '/search', q='wal-mart')[0]['name'] == engine.company_name(engine.company_id('Walmart'))
+
+
+def test_export_params(engine):
+    assert export_params(engine, 'company', {'company': ['53']}) == {'company_id': engine.company_id('53')}
+    assert export_params(engine, 'company', {'id': ['53']}) == {'company_id': 53}
+    assert export_params(engine, 'year', {'year': ['2023']}) == {'year': 2023}
+    with pytest.raises(ApiError):
+        export_params(engine, 'compare', {'year': ['2023', '2023']})
+    with pytest.raises(ApiError):
+        export_params(engine, 'nothing', {})
+
+
+def test_http_status_codes(engine):
+    server = make_server(engine, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+
+        def call(path, body=None):
+            request = urllib.request.Request(base + path, data=body, method='POST' if body is not None else 'GET')
+            try:
+                with urllib.request.urlopen(request) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        assert call('/health')[0] == 200
+        assert call('/companies/history', b'[]')[0] == 400
+        assert call('/companies/history', b'{not json')[0] == 400
+        assert call('/years/2023/top?n=-5')[0] == 400
+        code, payload = call('/years/2023/top?n=3')
+        assert code == 200 and [row['rank'] for row in payload] == [1, 2, 3]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_multi_year_compare_rows_carry_their_year(engine):
+    payload = to_payload(get(engine, '/compare', year=['2023', '2000', '2010']))
+    assert [row['year'] for row in payload['years']] == [2000, 2010, 2023]
+    totals = engine.cube['by_year']
+    assert [row['companies'] for row in payload['years']] == totals.loc[[2000, 2010, 2023], 'companies'].tolist()
+
+
+class CountingEngine:
+    def __init__(self):
+        self.refreshes = 0
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+def test_refresh_is_throttled(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('fortune500_api.time.monotonic', lambda: clock[0])
+    engine = CountingEngine()
+    refresh = RefreshThrottle(engine, 5)
+    for _ in range(10):
+        refresh()
+    assert engine.refreshes == 1
+    clock[0] += 4.9
+    refresh()
+    assert engine.refreshes == 1
+    clock[0] += 0.2
+    refresh()
+    refresh()
+    assert engine.refreshes == 2
+    always = RefreshThrottle(engine, 0)
+    always()
+    always()
+    assert engine.refreshes == 4
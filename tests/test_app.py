@@ -0,0 +1,47 @@
+import base64
+import os
+
+import pytest
+from streamlit import config
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def static_serving():
+    previous = config.get_option('server.enableStaticServing')
+
+    def run(enabled):
+        config.set_option('server.enableStaticServing', enabled)
+        app = AppTest.from_file(os.path.join(ROOT, 'fortune500_app.py'), default_timeout=120)
+        app.run()
+        assert not app.exception
+        return '\n'.join(element.value for element in app.markdown)
+
+    yield run
+    config.set_option('server.enableStaticServing', previous)
+
+
+def data_uri(file_name):
+    with open(os.path.join(ROOT, 'static', file_name), 'rb') as f:
+        return 'data:image/jpeg;base64,' + base64.b64encode(f.read()).decode()
+
+
+def test_images_are_static_urls_when_serving_is_on(static_serving):
+    markup = static_serving(True)
+    assert 'url("app/static/background.jpeg")' in markup
+    assert 'src="app/static/devleoper.jpeg"' in markup
+    assert 'base64,' not in markup
+
+
+def test_images_fall_back_to_data_uris(static_serving):
+    markup = static_serving(False)
+    assert f'url("{data_uri("background.jpeg")}")' in markup
+    assert f'src="{data_uri("devleoper.jpeg")}"' in markup
+    assert 'app/static/' not in markup
+
+
+def test_static_serving_is_enabled_in_the_config():
+    with open(os.path.join(ROOT, '.streamlit', 'config.toml'), encoding='utf-8') as f:
+        assert 'enableStaticServing = true' in f.read()
@@ -0,0 +1,73 @@
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from fortune500_artifacts import (bundle_version, convert_legacy, load_bundle, load_model, regression_metrics,
+                                  write_backtest, write_bundle)
+
+
+def test_regression_metrics():
+    metrics = regression_metrics([100.0, 200.0, 300.0], [110.0, 190.0, 300.0])
+    assert metrics['RMSE'] == pytest.approx(np.sqrt(200 / 3))
+    assert metrics['MAE'] == pytest.approx(20 / 3)
+    assert metrics['R2'] == pytest.approx(1 - 200 / 20000)
+    assert metrics['MAPE'] == pytest.approx((10 + 5 + 0) / 3)
+
+
+def test_bundle_round_trip(tmp_path):
+    path = str(tmp_path / 'bundle')
+    y_true = np.array([1.0, 2.0, 3.0, 4.0])
+    # متجهات كاملة الدقة بدلاً من النصوص المقطوعة
+    predictions = {'Random Forest': y_true + 1e-9, 'Linear': np.array([1.5, 2.5, 2.5, 3.5])}
+    model_file = str(tmp_path / 'linear.joblib')
+    joblib.dump(LinearRegression().fit([[0.0], [1.0]], [0.0, 1.0]), model_file)
+    write_bundle(y_true, predictions, keys=pd.DataFrame({'Company': list('abcd'), 'Year': [2020] * 4}),
+                 metrics={'Linear': {'RMSE': 0.5, 'MAE': 0.5, 'R2': 0.8, 'MAPE': 20.0}}, path=path,
+                 model_files={'Linear': model_file}, best_model='Linear')
+    assert not os.path.exists(model_file) and not os.path.exists(path + '.tmp')
+
+    bundle = load_bundle(path)
+    np.testing.assert_array_equal(bundle['y_true'], y_true)
+    np.testing.assert_array_equal(bundle['predictions']['Random Forest'], predictions['Random Forest'])
+    metrics = bundle['metrics'].set_index('model')
+    assert metrics.loc['Linear', 'R2'] == 0.8
+    assert metrics.loc['Random Forest', 'RMSE'] == pytest.approx(1e-9)
+    assert (metrics.dtypes == np.float64).all()
+    assert bundle['keys']['Company'].tolist() == list('abcd')
+    assert bundle['manifest']['best_model'] == 'Linear' and bundle['backtest'] is None
+    assert load_model('Linear', path).predict([[2.0]])[0] == pytest.approx(2.0)
+
+    version = bundle_version(path)
+    write_backtest(pd.DataFrame({'model': ['Linear'], 'year': [2020], 'RMSE': [1.0]}), path)
+    assert bundle_version(path) != version
+    assert load_bundle(path)['backtest']['RMSE'].tolist() == [1.0]
+    assert bundle_version(str(tmp_path / 'missing')) is None
+
+
+def test_bundle_rejects_mismatched_vectors_and_formats(tmp_path):
+    path = str(tmp_path / 'bundle')
+    with pytest.raises(ValueError):
+        write_bundle([1.0, 2.0], {'short': [1.0]}, path=path)
+    write_bundle([1.0, 2.0], {'ok': [1.0, 2.0]}, path=path)
+    manifest_path = os.path.join(path, 'manifest.json')
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest['format'] = 99
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError):
+        load_bundle(path)
+
+
+def test_convert_legacy(tmp_path):
+    bundle = load_bundle(convert_legacy(str(tmp_path / 'legacy')))
+    assert bundle['manifest']['source'] == 'legacy-csv'
+    assert list(bundle['predictions']) == [bundle['manifest']['best_model']]
+    assert len(bundle['y_true']) == len(bundle['keys'])
+    assert bundle['metrics']['R2'].max() == bundle['metrics'].set_index('model').loc[
+        bundle['manifest']['best_model'], 'R2']
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from fortune500_backtest import (BACKTEST_COLUMNS, MIN_TRAIN_ROWS, chains, cutoffs, fold_rows, run_chain,
+                                 summarize)
+from fortune500_features import build_features, training_rows
+
+
+@pytest.fixture(scope='module')
+def rows(engine):
+    return training_rows(build_features(engine.df)[0])
+
+
+@pytest.fixture(scope='module')
+def matrix_path(engine, tmp_path_factory):
+    path = tmp_path_factory.mktemp('features') / 'matrix.parquet'
+    build_features(engine.df)[0].to_parquet(path, index=False)
+    return str(path)
+
+
+def test_folds_never_see_the_future(rows):
+    for cutoff in (2000, 2010, 2020):
+        train, test = fold_rows(rows, cutoff)
+        assert train['target_year'].max() <= cutoff
+        assert (test['year'] == cutoff).all() and (test['target_year'] == cutoff + 1).all()
+        assert len(test)
+
+
+def test_cutoffs(rows):
+    years = cutoffs(rows)
+    assert years == sorted(years)
+    assert all(len(fold_rows(rows, year)[0]) >= MIN_TRAIN_ROWS for year in years)
+    assert min(years) > int(rows['year'].min())
+    assert cutoffs(rows, first=2000, last=2004) == [year for year in years if 2000 <= year <= 2004]
+
+
+def test_chains_are_contiguous_and_cover_every_year():
+    years = list(range(2000, 2011))
+    for count in (1, 3, 11, 50):
+        parts = chains(years, count)
+        assert len(parts) == min(count, len(years))
+        assert [year for part in parts for year in part] == years
+
+
+@pytest.mark.parametrize('warm_start', [True, False])
+def test_run_chain(matrix_path, warm_start):
+    results = run_chain('Random Forest', matrix_path, [2010, 2011], 5, 2, 1, warm_start)
+    assert [result['cutoff'] for result in results] == [2010, 2011]
+    assert results[0]['train_rows'] < results[1]['train_rows']
+    table = pd.DataFrame(results, columns=BACKTEST_COLUMNS)
+    assert table.notna().all().all()
+    assert (table['target_year'] == table['cutoff'] + 1).all()
+
+
+def test_summarize():
+    table = pd.DataFrame({'model': ['a', 'a', 'b'], 'cutoff': [2000, 2001, 2000], 'RMSE': [1.0, 3.0, 5.0],
+                          'MAPE': [10.0, 20.0, 30.0], 'fit_s': [0.5, 0.25, 1.0]})
+    summary = summarize(table)
+    assert summary.loc['a'].to_dict() == {'folds': 2, 'RMSE': 2.0, 'MAPE': 15.0, 'fit_s': 0.75}
+    assert summary.loc['b', 'folds'] == 1
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from bench_views import BASE_ROWS_PER_YEAR, ROOT, generate  # noqa: E402
+
+
+def test_generated_data_has_the_real_shape():
+    real = pd.read_csv(os.path.join(ROOT, 'fortune500_cleaned.csv'))
+    df = generate(2, seed=3)
+    assert list(df.columns) == list(real.columns)
+    per_year = df.groupby('year').size()
+    assert set(per_year) == {2 * BASE_ROWS_PER_YEAR}
+    assert set(per_year.index) == set(real['year'])
+    assert not df.duplicated(['name', 'year']).any()
+    # الترتيب 1..N حسب الإيرادات في كل سنة
+    for _, year in df.groupby('year'):
+        assert sorted(year['rank']) == list(range(1, len(year) + 1))
+        assert year.sort_values('rank')['revenue_mil'].is_monotonic_decreasing
+    # الشركات تبقى في القائمة بين السنوات
+    years = sorted(df['year'].unique())
+    first, second = (set(df.loc[df['year'] == y, 'name']) for y in years[:2])
+    assert 0.85 < len(first & second) / len(first) < 1
+
+
+def test_generation_is_reproducible():
+    pd.testing.assert_frame_equal(generate(1, seed=5), generate(1, seed=5))
@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+from fortune500_cache import DiskCache, LRUCache
+from fortune500_prefetch import Prefetcher
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskCache(str(tmp_path / 'cache.sqlite'), max_bytes=1 << 20, version='test')
+
+
+def test_disk_cache_round_trip_and_version(store, tmp_path):
+    assert store.get(('year', 2023)) == (False, None)
+    assert store.set(('year', 2023), {'revenue': [1.5, 2.5]})
+    assert store.get(('year', 2023)) == (True, {'revenue': [1.5, 2.5]})
+    assert store.stats()['hits'] == 1 and store.stats()['misses'] == 1
+    # نسخة كود مختلفة لا تقرأ القيم القديمة
+    other = DiskCache(str(tmp_path / 'cache.sqlite'), version='other')
+    assert other.get(('year', 2023)) == (False, None)
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    store = DiskCache(str(tmp_path / 'small.sqlite'), max_bytes=3000, version='test')
+    for i in range(5):
+        store.set(i, b'x' * 900)
+    assert store.stats()['entries'] == 3
+    assert store.get(0) == (False, None)
+    assert store.get(4)[0]
+
+
+def test_lru_with_store_builds_once(store):
+    calls = []
+    first = LRUCache(4, store)
+    assert first.get_or_build('k', lambda: calls.append(1) or 'value') == 'value'
+    # ذاكرة جديدة (نسخة أخرى بعد إعادة التشغيل) تقرأ القيمة من القرص
+    second = LRUCache(4, store)
+    assert second.get_or_build('k', lambda: calls.append(1) or 'other') == 'value'
+    assert calls == [1]
+
+
+def test_prefetch_builds_are_not_misses(store):
+    cache = LRUCache(4, store)
+    cache.get_or_build('a', lambda: 1, prefetch=True)
+    assert cache.stats()['misses'] == 0 and cache.stats()['prefetched'] == 1
+    assert store.stats()['misses'] == 0
+    # طلب المستخدم بعد التحميل المسبق إصابة
+    assert cache.get_or_build('a', lambda: 2) == 1
+    cache.get_or_build('b', lambda: 3)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['prefetched']) == (1, 1, 1)
+    assert stats['hit_rate'] == 0.5
+    # تحميل مسبق لمفتاح موجود لا يُحسب إصابة
+    cache.get_or_build('a', lambda: 4, prefetch=True)
+    assert cache.stats()['hits'] == 1
+    cache.clear()
+    assert cache.stats()['prefetched'] == 0
+
+
+def test_prefetcher_counts_its_builds_separately():
+    cache = LRUCache(8)
+    prefetcher = Prefetcher(workers=1)
+    try:
+        prefetcher.submit(cache, [(('fig', year), lambda year=year: year) for year in (2021, 2022)]).wait(5)
+    finally:
+        prefetcher.shutdown()
+    assert prefetcher.stats()['built'] == 2
+    assert cache.get_or_build(('fig', 2022), lambda: None) == 2022
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['prefetched']) == (1, 0, 2)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    built = []
+
+    def builder(value):
+        return lambda: built.append(value) or value
+
+    cache.get_or_build(('fig', 'a'), builder('a'))
+    cache.get_or_build(('fig', 'b'), builder('b'))
+    # الوصول إلى a يجعله الأحدث فيُزال b عند الإضافة التالية
+    cache.get_or_build(('fig', 'a'), builder('a2'))
+    cache.get_or_build(('fig', 'c'), builder('c'))
+    assert ('fig', 'a') in cache and ('fig', 'b') not in cache and ('fig', 'c') in cache
+    assert built == ['a', 'b', 'c']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size'], stats['maxsize']) == (1, 3, 2, 2)
+    assert stats['hit_rate'] == 0.25
+
+
+def test_lru_keys_separate_view_parameters():
+    cache = LRUCache(8)
+    english = cache.get_or_build(('year_top', 2023, 10, 'English', 'v1'), lambda: 'en')
+    arabic = cache.get_or_build(('year_top', 2023, 10, 'العربية', 'v1'), lambda: 'ar')
+    newer = cache.get_or_build(('year_top', 2023, 10, 'English', 'v2'), lambda: 'en2')
+    assert (english, arabic, newer) == ('en', 'ar', 'en2')
+
+
+def test_lru_is_shared_between_threads():
+    cache = LRUCache(64)
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(cache.get_or_build(i % 8, lambda i=i: i % 8)))
+               for i in range(64)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == sorted(i % 8 for i in range(64))
+    assert cache.stats()['size'] == 8
+    assert cache.stats()['hits'] + cache.stats()['misses'] == 64
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fortune500_cleaning import (MISSING_TEXT, RAW_CSV, ModeCounter, QuantileSketch, SeenRows, clean, clean_file,
+                                 compute_fill_values, stream_fill_values)
+from fortune500_data import DATA_DIR
+
+RAW = os.path.join(DATA_DIR, RAW_CSV)
+
+
+def test_sketch_median_and_quantiles_match_pandas():
+    rng = np.random.default_rng(0)
+    chunks = [np.round(rng.lognormal(8, 1.5, size), 1) for size in (1000, 2501, 17)]
+    chunks[1][::7] = np.nan
+    sketch = QuantileSketch()
+    for chunk in chunks:
+        sketch.update(chunk)
+    values = pd.Series(np.concatenate(chunks))
+    assert sketch.median() == values.median()
+    for q in (0.1, 0.25, 0.9):
+        assert sketch.quantile(q) == pytest.approx(values.quantile(q))
+    assert QuantileSketch().median() is None
+
+
+def test_sketch_stays_bounded_with_small_relative_error():
+    values = np.random.default_rng(1).uniform(1, 1000, 50_000)
+    sketch = QuantileSketch(max_distinct=2000, digits=7)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+    assert len(sketch.values) <= 2000
+    assert sketch.counts.sum() == len(values)
+    assert sketch.median() == pytest.approx(np.median(values), rel=1e-2)
+
+
+def test_mode_counter():
+    counter = ModeCounter(max_unique=5)
+    counter.update(pd.Series(['b', 'a', 'b']))
+    counter.update(pd.Series(['a', 'c']))
+    # التساوي: أصغر قيمة كما في pandas
+    assert counter.fill_value() == pd.Series(['b', 'a', 'b', 'a', 'c']).mode().iloc[0] == 'a'
+    counter.update(pd.Series(['d', 'e', 'f']))
+    assert counter.fill_value() == MISSING_TEXT
+
+
+def test_seen_rows_matches_drop_duplicates():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'name': rng.choice(list('abcdefgh'), 5000), 'year': rng.integers(2000, 2005, 5000)})
+    seen = SeenRows()
+    chunks = [df.iloc[start:start + 300] for start in range(0, len(df), 300)]
+    kept = pd.concat([chunk[seen.keep(chunk)] for chunk in chunks])
+    pd.testing.assert_frame_equal(kept, df.drop_duplicates())
+    # عدد الأجزاء المخزنة يبقى صغيراً
+    assert len(seen.runs) <= 3
+    assert not seen.keep(df.head(10)).any()
+
+
+def test_streamed_fill_values_match_in_memory():
+    expected = compute_fill_values(pd.read_csv(RAW))
+    streamed = stream_fill_values(RAW, chunksize=1500, workers=2)
+    for key in ('columns', 'drop', 'float_columns'):
+        assert streamed[key] == expected[key]
+    assert streamed['fill'] == pytest.approx(expected['fill'])
+    assert streamed['rows'] == len(pd.read_csv(RAW))
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet'])
+def test_clean_file_matches_clean(tmp_path, suffix):
+    source = tmp_path / 'raw.csv'
+    raw = pd.read_csv(RAW)
+    # صفوف مكررة عبر الأجزاء
+    pd.concat([raw, raw.head(300)]).to_csv(source, index=False)
+    target = str(tmp_path / ('cleaned' + suffix))
+    summary = clean_file(str(source), target, chunksize=2000, workers=2)
+    expected = clean(pd.read_csv(source))
+    result = pd.read_csv(target) if suffix == '.csv' else pd.read_parquet(target)
+    assert summary['rows_out'] == len(result) == len(expected)
+    assert summary['duplicates'] == len(raw) + 300 - len(expected)
+    assert result['name'].astype(str).tolist() == expected['name'].astype(str).tolist()
+    np.testing.assert_allclose(result['revenue_mil'], expected['revenue_mil'])
+    with pytest.raises(ValueError):
+        clean_file(str(source), str(tmp_path / 'cleaned.json'))
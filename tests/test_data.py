@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fortune500_data as data
+from fortune500_data import Fortune500Dataset, freeze
+
+
+def sample():
+    return pd.DataFrame({
+        'name': pd.Categorical(['A', 'B', 'A']),
+        'year': np.array([2020, 2020, 2021], dtype='int16'),
+        'revenue_mil': [100.0, 50.0, 120.0],
+        'profit_mil': [10.0, -5.0, 6.0],
+        'note': ['x', 'y', 'z'],
+    })
+
+
+def test_freeze_blocks_writes_and_keeps_values():
+    df = sample()
+    frozen = freeze(df)
+    pd.testing.assert_frame_equal(frozen, df)
+    with pytest.raises(ValueError):
+        frozen.loc[0, 'revenue_mil'] = 1.0
+    with pytest.raises(ValueError):
+        frozen['year'].to_numpy()[0] = 1999
+    with pytest.raises(ValueError):
+        frozen.loc[0, 'name'] = 'B'
+    # الأصل لا يتأثر ويبقى قابلاً للكتابة
+    df.loc[0, 'revenue_mil'] = 1.0
+    assert frozen.loc[0, 'revenue_mil'] == 100.0
+
+
+def test_dataset_copies_allow_new_columns_only():
+    dataset = Fortune500Dataset({'main': sample()}, {'main': 'v1'})
+    view = dataset['main']
+    view['extra'] = 1
+    assert 'extra' not in dataset['main'].columns
+    with pytest.raises(ValueError):
+        view.loc[1, 'profit_mil'] = 0.0
+    assert dataset.version('main') == 'v1'
+    assert dataset.year_version('main', 2020) == 'v1'
+
+
+def test_add_derived_columns_adds_margin_to_main_only():
+    main = data.add_derived_columns('main', sample())
+    assert main['profit_margin'].tolist() == pytest.approx([10.0, -10.0, 5.0])
+    assert 'profit_margin' not in data.add_derived_columns('test', sample()).columns
+
+
+def test_load_all_missing_file_gives_empty_frame(monkeypatch, tmp_path):
+    monkeypatch.setattr(data, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(data, 'is_partitioned', lambda name: False)
+    monkeypatch.setattr(data, 'snapshot_is_fresh', lambda name: False)
+    dataset = data.load_all(['main'])
+    assert dataset['main'].empty
+
+
+def test_load_all_does_not_hide_other_errors(monkeypatch):
+    def broken(name):
+        raise ValueError("corrupt file")
+    monkeypatch.setattr(data, 'is_partitioned', lambda name: False)
+    monkeypatch.setattr(data, 'load_dataset', broken)
+    with pytest.raises(ValueError):
+        data.load_all(['main'])
+
+
+@pytest.fixture
+def data_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(data, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(data, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    monkeypatch.setattr(data, 'is_partitioned', lambda name: False)
+    pd.DataFrame({
+        'name': ['A', 'B', 'C', 'A'], 'rank': [1, 2, 3, 1], 'year': [2022, 2022, 2022, 2023],
+        'industry': ['X', 'X', 'Y', 'X'], 'revenue_mil': [10.5, 9.25, 8.0, 11.0], 'profit_mil': [1.0, 2.0, 3.0, 4.0],
+        'global_500': ['yes', 'no', 'no', 'yes'],
+    }).to_csv(tmp_path / 'fortune500_cleaned.csv', index=False)
+    pd.DataFrame({'Model': ['RF', 'RF', 'GB', 'GB', 'GB'], 'R2': [0.9, 0.8, 0.7, 0.6, 0.5],
+                  'Note': list('abcde')}).to_csv(tmp_path / 'fortune500_models_performance.csv', index=False)
+    return tmp_path
+
+
+def test_snapshot_written_once_and_read_back(data_dir):
+    first = data.load_dataset('main')
+    assert os.path.exists(data.snapshot_path('main'))
+    assert data.snapshot_is_fresh('main')
+    second = data.load_dataset('main')
+    pd.testing.assert_frame_equal(second, first)
+    assert str(second['rank'].dtype) == 'int16' and second['global_500'].dtype == bool
+    assert second['revenue_mil'].tolist() == [10.5, 9.25, 8.0, 11.0]
+
+
+def test_snapshot_goes_stale(data_dir, monkeypatch):
+    data.load_dataset('main')
+    earlier = os.path.getmtime(data.csv_path('main')) - 10
+    os.utime(data.snapshot_path('main'), (earlier, earlier))
+    assert not data.snapshot_is_fresh('main')
+    data.load_dataset('main')
+    assert data.snapshot_is_fresh('main')
+    monkeypatch.setattr(data, 'SCHEMA_VERSION', 'other')
+    assert not data.snapshot_is_fresh('main')
+
+
+def test_other_datasets_get_categoricals(data_dir):
+    models = data.load_dataset('models')
+    # عمودان بقيم مكررة يصبحان category، والعمود الفريد يبقى نصاً
+    assert isinstance(models['Model'].dtype, pd.CategoricalDtype)
+    assert models['Note'].dtype == object
+
+
+def test_dataset_version_follows_content(data_dir):
+    version = data.dataset_version('main')
+    assert version.startswith('main:') and version != 'main:missing'
+    csv = data.csv_path('main')
+    with open(csv, 'a') as f:
+        f.write('D,4,2023,Y,1.0,0.5,no\n')
+    assert data.dataset_version('main') != version
+    assert data.dataset_version('test') == 'test:missing'
@@ -0,0 +1,123 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fortune500_export as export_module
+from fortune500_export import export, export_bytes, export_name, export_path, xlsx_chunks
+
+
+@pytest.fixture(autouse=True)
+def export_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(export_module, 'EXPORT_DIR', str(tmp_path))
+    return tmp_path
+
+
+def download(engine, query, fmt, chunk_rows=100, **params):
+    name, mime, chunks = export(engine, query, fmt, chunk_rows, **params)
+    return name, mime, b''.join(chunks)
+
+
+def expected_year(engine, year):
+    df = engine.df
+    return df[df['year'] == year].sort_values('rank', ignore_index=True)
+
+
+def test_csv_round_trip(engine):
+    name, mime, data = download(engine, 'year', 'csv', year=2023)
+    assert (name, mime) == ('fortune500-year-2023.csv', 'text/csv')
+    frame = pd.read_csv(io.BytesIO(data))
+    expected = expected_year(engine, 2023)
+    assert len(frame) == len(expected) == 500
+    assert frame['name'].tolist() == expected['name'].astype(str).tolist()
+    # القيم المالية تُكتب بدون ضوضاء float32
+    np.testing.assert_array_equal(frame['revenue_mil'], expected['revenue_mil'])
+
+
+def test_parquet_round_trip_across_chunks(engine):
+    _, _, data = download(engine, 'year', 'parquet', chunk_rows=64, year=2023)
+    frame = pd.read_parquet(io.BytesIO(data))
+    expected = expected_year(engine, 2023)
+    pd.testing.assert_frame_equal(frame, expected.reset_index(drop=True), check_categorical=False)
+
+
+def test_xlsx_round_trip(engine):
+    openpyxl = pytest.importorskip('openpyxl')
+    _, _, data = download(engine, 'compare', 'xlsx', chunk_rows=200, years=(2000, 2023))
+    sheet = openpyxl.load_workbook(io.BytesIO(data), read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+    expected = engine.compare_many_years((2000, 2023))['companies']
+    assert list(rows[0]) == [str(col) for col in expected.columns]
+    assert len(rows) == len(expected) + 1
+    frame = pd.DataFrame(rows[1:], columns=rows[0])
+    assert frame['name'].tolist() == expected['name'].astype(str).tolist()
+    for col in expected.select_dtypes('number').columns:
+        np.testing.assert_allclose(frame[col].astype(float), expected[col].astype(float), equal_nan=True)
+
+
+def test_xlsx_cells_and_styles():
+    openpyxl = pytest.importorskip('openpyxl')
+    frame = pd.DataFrame({'text': ['a<b & "c"', 'bad\x01char', None], 'flag': [True, False, True],
+                          'count': np.array([1, 2, 3], dtype='int16'), 'value': [1.5, np.nan, np.inf]})
+    book = openpyxl.load_workbook(io.BytesIO(b''.join(xlsx_chunks(frame, 2))))
+    rows = list(book.active.iter_rows(values_only=True))
+    assert rows == [('text', 'flag', 'count', 'value'), ('a<b & "c"', True, 1, 1.5),
+                    ('badchar', False, 2, None), (None, True, 3, None)]
+
+
+def test_cached_file_is_reused_and_evicted(engine, export_dir):
+    first = export_bytes(engine, 'year', 'csv', year=2022)
+    path = export_path(engine, 'year', 'csv', {'year': 2022})
+    assert os.path.dirname(path) == str(export_dir)
+    assert open(path, 'rb').read() == first
+    assert download(engine, 'year', 'csv', year=2022)[2] == first
+    assert not [f for f in os.listdir(export_dir) if f.endswith('.part')]
+    export_module.evict(0)
+    assert not os.listdir(export_dir)
+
+
+def test_export_larger_than_the_budget(engine, export_dir, monkeypatch):
+    monkeypatch.setattr(export_module, 'EXPORT_MB', 0)
+    older = export_bytes(engine, 'year', 'csv', year=2021)
+    data = export_bytes(engine, 'year', 'csv', year=2022)
+    # الملف المكتوب للتو يبقى، والأقدم يُزال
+    assert os.listdir(export_dir) == [os.path.basename(export_path(engine, 'year', 'csv', {'year': 2022}))]
+    assert export_bytes(engine, 'year', 'csv', year=2022) == data
+    assert export_bytes(engine, 'year', 'csv', year=2021) == older
+
+
+def test_cached_file_removed_while_streaming(engine, export_dir):
+    data = export_bytes(engine, 'year', 'csv', year=2022)
+    _, _, chunks = export(engine, 'year', 'csv', year=2022)
+    export_module.evict(0)
+    assert b''.join(chunks) == data
+
+
+def test_invalid_requests(engine):
+    with pytest.raises(KeyError):
+        export(engine, 'nothing', 'csv')
+    with pytest.raises(ValueError):
+        export(engine, 'year', 'pdf', year=2023)
+    with pytest.raises(KeyError):
+        export(engine, 'predictions', 'csv', name='main')
+
+
+def test_export_name():
+    assert export_name('compare', {'years': (2000, 2023)}, 'csv') == 'fortune500-compare-2000_2023.csv'
+    assert export_name('dynamics', {'sort': 'best_rank', 'status': None, 'sectors': ()}, 'xlsx') \
+        == 'fortune500-dynamics-best_rank.xlsx'
+
+
+def test_test_predictions_cover_the_whole_bundle(engine):
+    from fortune500_artifacts import load_bundle
+
+    bundle = load_bundle()
+    frame = pd.read_csv(io.BytesIO(download(engine, 'test_predictions', 'csv')[2]))
+    assert len(frame) == len(bundle['y_true'])
+    np.testing.assert_allclose(frame['Actual'], bundle['y_true'])
+    for name, values in bundle['predictions'].items():
+        np.testing.assert_allclose(frame[name], values)
+    if bundle['keys'] is not None:
+        assert frame[list(bundle['keys'].columns)].astype(str).equals(bundle['keys'].astype(str))
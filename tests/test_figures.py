@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from fortune500_figures import (DENSITY_BINS, SCATTER_MAX_POINTS, actual_vs_predicted, binned_histogram,
+                                histogram_bins, lttb, quantiles)
+
+
+def test_histogram_bins_ignore_missing_values():
+    counts, edges = histogram_bins([1.0, 2.0, np.nan, np.inf, 3.0, 4.0], nbins=3)
+    assert counts.sum() == 4 and len(edges) == 4
+    assert edges[0] == 1.0 and edges[-1] == 4.0
+
+
+def test_quantiles_match_numpy():
+    values = np.random.default_rng(0).lognormal(size=1001)
+    result = quantiles(np.r_[values, np.nan])
+    assert result[0.5] == np.median(values)
+    assert result[0.9] == np.quantile(values, 0.9)
+    assert all(np.isnan(v) for v in quantiles([np.nan]).values())
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10_000, dtype='float64')
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    sx, sy = lttb(x, y, 200)
+    assert len(sx) == 200
+    assert (sx[0], sx[-1]) == (0, 9999)
+    assert np.all(np.diff(sx) > 0)
+    # القمة الحادة تبقى بعد التقليل
+    assert 4321 in sx and sy.max() == 50.0
+    # بيانات أصغر من الحد تعود كما هي
+    assert len(lttb(x[:100], y[:100], 200)[0]) == 100
+
+
+def test_histogram_figure_sends_bins_not_rows():
+    fig = binned_histogram(np.arange(100_000, dtype='float64'), 'Revenue', 'revenue', nbins=40)
+    assert len(fig.data[0].x) == 40
+    assert sum(fig.data[0].y) == 100_000
+
+
+def test_scatter_switches_to_density_for_large_inputs():
+    rng = np.random.default_rng(1)
+    small = actual_vs_predicted(np.arange(10), np.arange(10), 't', 'x', 'y')
+    assert small.data[0].type == 'scattergl' and len(small.data[0].x) == 10
+    n = SCATTER_MAX_POINTS + 1
+    large = actual_vs_predicted(rng.normal(size=n), pd.Series(rng.normal(size=n)), 't', 'x', 'y')
+    assert large.data[0].type == 'heatmap'
+    assert np.asarray(large.data[0].z).shape == (DENSITY_BINS, DENSITY_BINS)
+    assert np.nansum(np.asarray(large.data[0].z, dtype='float64')) == n
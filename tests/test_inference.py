@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from fortune500_features import FEATURE_COLUMNS, build_features
+from fortune500_inference import Forecaster, apply_overrides, listed_once
+
+
+class GrowthModel:
+    """Deterministic stand-in for a fitted regressor: 10% growth on revenue."""
+
+    def predict(self, X):
+        return X[:, FEATURE_COLUMNS.index('revenue_mil')] * 1.1
+
+
+@pytest.fixture(scope='module')
+def df(engine):
+    return engine.df
+
+
+@pytest.fixture(scope='module')
+def forecaster(df):
+    _, encoders = build_features(df)
+    return Forecaster(GrowthModel(), encoders, 'growth')
+
+
+@pytest.mark.parametrize('year', [1999, 2001, 2002])
+def test_listed_once_keeps_the_best_ranked_duplicate(df, year):
+    rows = df[df['year'] == year]
+    assert rows['name'].duplicated().any()
+    once = listed_once(rows)
+    assert not once['name'].duplicated().any()
+    assert set(once['name']) == set(rows['name'])
+    best = rows.groupby('name', observed=True)['rank'].min()
+    assert (once.set_index('name')['rank'] == best.reindex(once['name']).to_numpy()).all()
+
+
+@pytest.mark.parametrize('target_year', [1999, 2000, 2001, 2002, 2003])
+def test_forecast_years_with_duplicate_names(df, forecaster, target_year):
+    # سنوات الأساس أو الهدف فيها أسماء مكررة
+    result = forecaster.forecast(df, target_year)
+    assert not result['name'].duplicated().any()
+    actual = listed_once(df[df['year'] == target_year]).astype({'name': str}).set_index('name')['revenue_mil']
+    matched = result.dropna(subset=['actual'])
+    assert len(matched) > 300
+    np.testing.assert_allclose(matched['actual'], actual.loc[matched['name']].to_numpy())
+    np.testing.assert_allclose(result['predicted'], result['revenue_mil'] * 1.1)
+
+
+def test_rolled_forecast_from_a_year_with_duplicate_names(df, forecaster):
+    # بعد نهاية البيانات تُبنى صفوف السنة التالية من سنة فيها أسماء مكررة
+    history = df[df['year'] <= 2002]
+    result = forecaster.forecast(history, 2004)
+    assert not result['name'].duplicated().any()
+    assert 'actual' not in result.columns
+    base = listed_once(history[history['year'] == 2002])
+    assert len(result) == len(base)
+    np.testing.assert_allclose(result['predicted'], result['revenue_mil'] * 1.1)
+
+
+def test_forecast_limits_and_overrides(df, forecaster):
+    with pytest.raises(ValueError):
+        forecaster.forecast(df, int(df['year'].max()) + 20)
+    with pytest.raises(ValueError):
+        forecaster.forecast(df, int(df['year'].min()))
+    with pytest.raises(ValueError):
+        apply_overrides(df, 2023, {'Walmart': {'rank': 1}})
+    edited = forecaster.forecast(df, 2024, companies=['Walmart'], overrides={'Walmart': {'revenue_mil': 1000.0}})
+    assert edited['predicted'].tolist() == pytest.approx([1100.0])
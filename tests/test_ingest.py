@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fortune500_data as data
+import fortune500_ingest as ingest_module
+from fortune500_analytics import build_cube, update_cube
+from fortune500_cleaning import RAW_CSV
+from fortune500_engine import Fortune500Engine
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return pd.read_csv(os.path.join(data.DATA_DIR, RAW_CSV))
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path, raw):
+    monkeypatch.setattr(data, 'PARTITION_DIR', str(tmp_path / 'partitions'))
+    monkeypatch.setattr(ingest_module, 'PARTITION_DIR', str(tmp_path / 'partitions'))
+    history = tmp_path / 'raw.csv'
+    raw[raw['year'].between(2019, 2021)].to_csv(history, index=False)
+    return ingest_module.init_store(str(history))
+
+
+def as_text(frame):
+    # الفئات تختلف بين السنوات المدمجة، فتُقارن النصوص نفسها
+    return frame.astype({col: str for col in frame.columns if frame[col].dtype in (object, 'category')})
+
+
+def assert_cubes_equal(updated, rebuilt):
+    for key in ['by_year', 'by_year_industry', 'by_year_sector', 'top_by_year']:
+        pd.testing.assert_frame_equal(as_text(updated[key]), as_text(rebuilt[key]), check_index_type=False)
+    assert updated['revenue_by_year'].keys() == rebuilt['revenue_by_year'].keys()
+    for year, values in rebuilt['revenue_by_year'].items():
+        np.testing.assert_array_equal(updated['revenue_by_year'][year], values)
+    pd.testing.assert_series_equal(updated['company_max_revenue'], rebuilt['company_max_revenue'])
+    assert updated['totals'] == pytest.approx(rebuilt['totals'])
+
+
+def test_update_cube_matches_a_full_rebuild(engine):
+    df = engine.df
+    old = df[df['year'] < 2023]
+    # سنة جديدة، وسنة قديمة أُعيد نشرها بأرقام مختلفة
+    new = pd.concat([df[df['year'] != 2010],
+                     df[df['year'] == 2010].assign(revenue_mil=lambda rows: rows['revenue_mil'] * 1.5)])
+    new = new.sort_values(['year', 'rank'], ignore_index=True)
+    assert_cubes_equal(update_cube(build_cube(old.copy()), new.copy(), [2010, 2023]), build_cube(new.copy()))
+    # سنة حُذفت من البيانات
+    assert_cubes_equal(update_cube(build_cube(df.copy()), old.copy(), [2023]), build_cube(old.copy()))
+
+
+def test_ingest_rewrites_only_the_new_year(store, raw):
+    assert store == [2019, 2020, 2021]
+    before = ingest_module.status()
+    assert before['rows'].sum() == len(raw[raw['year'].between(2019, 2021)].drop_duplicates())
+    assert ingest_module.ingest(raw[raw['year'] == 2022].drop(columns='year'), year=2022) == [2022]
+    after = ingest_module.status()
+    assert after.index.tolist() == [2019, 2020, 2021, 2022]
+    pd.testing.assert_frame_equal(after.loc[[2019, 2020, 2021]], before)
+
+    main = data.load_all(['main'])['main']
+    assert sorted(main['year'].unique()) == [2019, 2020, 2021, 2022]
+    assert str(main['year'].dtype) == 'int16' and main['revenue_mil'].dtype == np.float64
+    assert set(main.loc[main['year'] == 2022, 'name']) == set(raw.loc[raw['year'] == 2022, 'name'])
+
+
+def test_ingest_requires_a_store(monkeypatch, tmp_path, raw):
+    monkeypatch.setattr(data, 'PARTITION_DIR', str(tmp_path / 'none'))
+    with pytest.raises(RuntimeError):
+        ingest_module.ingest(raw.head())
+
+
+def test_engine_refresh_recomputes_changed_years(store, raw):
+    engine = Fortune500Engine(data.load_all(['main']), cache_size=16)
+    cube = engine.cube
+    versions = [engine.year_version(year) for year in (2019, 2020, 2021)]
+    assert engine.years() == [2019, 2020, 2021]
+    ingest_module.ingest(raw[raw['year'] == 2022])
+    assert engine.refresh(data.load_all(['main'])) == [2022]
+    assert engine.years() == [2019, 2020, 2021, 2022]
+    # السنوات التي لم تتغير تحتفظ بإصداراتها فتبقى ردودها المخزنة صالحة
+    assert [engine.year_version(year) for year in (2019, 2020, 2021)] == versions
+    assert engine.year_version(2022) not in versions
+    assert engine.cube is not cube
+    assert_cubes_equal(engine.cube, build_cube(engine.df))
+    assert engine.refresh(data.load_all(['main'])) == []
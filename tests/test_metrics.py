@@ -0,0 +1,44 @@
+import time
+
+from fortune500_cache import LRUCache
+from fortune500_metrics import STAGES, MetricsRegistry, RerunTimer, env_enabled, process_rss_mb
+
+
+def test_timer_accumulates_repeated_stages():
+    timer = RerunTimer('Year Analysis')
+    for _ in range(2):
+        with timer.stage('filtering'):
+            time.sleep(0.01)
+    with timer.stage('custom'):
+        pass
+    record = timer.record(extra=1)
+    assert list(record['stages_s'])[:len(STAGES)] == STAGES
+    assert record['stages_s']['filtering'] >= 0.02
+    assert record['stages_s']['render'] == 0.0 and 'custom' in record['stages_s']
+    assert record['total_s'] >= record['stages_s']['filtering']
+    assert record['page'] == 'Year Analysis' and record['extra'] == 1
+
+
+def test_registry_aggregates_per_page():
+    registry = MetricsRegistry()
+    for total in (1.0, 3.0):
+        registry.observe({'page': 'A', 'total_s': total, 'stages_s': {'render': total / 2}})
+    registry.observe({'page': 'B', 'total_s': 2.0, 'stages_s': {}})
+    cache = LRUCache(4)
+    cache.get_or_build('k', lambda: 1)
+    registry.register_cache('figures', cache)
+    snapshot = registry.snapshot()
+    assert snapshot['reruns'] == 3
+    page = snapshot['pages']['A']
+    assert (page['reruns'], page['mean_s'], page['max_s']) == (2, 2.0, 3.0)
+    assert page['stages_s'] == {'render': 2.0}
+    assert snapshot['caches']['figures']['misses'] == 1
+    assert snapshot['rss_mb'] > 0
+
+
+def test_env_switch(monkeypatch):
+    monkeypatch.setenv('FORTUNE500_DIAGNOSTICS', 'yes')
+    assert env_enabled()
+    monkeypatch.setenv('FORTUNE500_DIAGNOSTICS', '0')
+    assert not env_enabled()
+    assert process_rss_mb() > 0
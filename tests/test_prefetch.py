@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from fortune500_cache import LRUCache
+from fortune500_prefetch import Prefetcher
+
+
+@pytest.fixture
+def prefetcher():
+    prefetcher = Prefetcher(workers=1)
+    yield prefetcher
+    prefetcher.shutdown()
+
+
+def test_submit_skips_cached_and_repeated_keys(prefetcher):
+    cache = LRUCache(8)
+    cache.get_or_build('a', lambda: 'a')
+    batch = prefetcher.submit(cache, [('a', lambda: 'a2'), ('b', lambda: 'b'), ('b', lambda: 'b2')])
+    batch.wait(5)
+    assert len(batch.futures) == 1 and batch.done()
+    assert cache.get_or_build('a', lambda: None) == 'a'
+    assert cache.get_or_build('b', lambda: None) == 'b'
+    stats = prefetcher.stats()
+    assert (stats['scheduled'], stats['built']) == (1, 1)
+
+
+def test_cancel_drops_queued_builds(prefetcher):
+    cache = LRUCache(8)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'slow'
+
+    batch = prefetcher.submit(cache, [('slow', slow)] + [(i, lambda i=i: i) for i in range(3)])
+    assert started.wait(5)
+    prefetcher.cancel(batch)
+    release.set()
+    batch.wait(5)
+    # المهمة الجارية تكمل، والباقية لا تُبنى
+    assert 'slow' in cache
+    assert not any(i in cache for i in range(3))
+    assert prefetcher.stats()['cancelled'] == 3
+
+
+def test_failed_builds_are_counted_not_raised(prefetcher):
+    cache = LRUCache(8)
+    batch = prefetcher.submit(cache, [('bad', lambda: 1 / 0), ('good', lambda: 'ok')])
+    batch.wait(5)
+    assert 'bad' not in cache and 'good' in cache
+    assert prefetcher.stats()['failed'] == 1 and prefetcher.stats()['built'] == 1
+
+
+def test_zero_workers_disable_prefetching():
+    prefetcher = Prefetcher(workers=0)
+    cache = LRUCache(8)
+    batch = prefetcher.submit(cache, [('a', lambda: 'a')])
+    assert batch.futures == [] and batch.done()
+    assert 'a' not in cache
+    prefetcher.cancel(batch)
+    prefetcher.shutdown()
+    assert prefetcher.stats()['scheduled'] == 0
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from fortune500_schema import SCHEMA, add_profit_margin, apply_schema, memory_report, to_flag
+
+
+def raw():
+    return pd.DataFrame({
+        'name': ['Walmart', 'Exxon Mobil', 'Walmart'],
+        'rank': [1, 2, np.nan],
+        'year': [2023, 2023, 2022],
+        'revenue_mil': [611289.0, 413680.0, 572754.0],
+        'profit_mil': [11680.0, 55740.0, 13673.0],
+        'market_value_mil': [4012.6, 3970.89, 281938702.74],
+        'female_ceo': ['no', 'Yes ', 'unknown'],
+        'global_500': ['yes', 'no', 'no'],
+    })
+
+
+def test_money_columns_keep_exact_values():
+    typed = apply_schema(raw())
+    assert typed['market_value_mil'].dtype == np.float64
+    assert typed['market_value_mil'].tolist() == [4012.6, 3970.89, 281938702.74]
+    assert typed['revenue_mil'].sum() == 611289.0 + 413680.0 + 572754.0
+
+
+def test_narrow_types_for_names_ranks_and_flags():
+    typed = apply_schema(raw())
+    assert isinstance(typed['name'].dtype, pd.CategoricalDtype)
+    assert str(typed['year'].dtype) == 'int16'
+    # رتبة ناقصة: نوع int16 يقبل القيم الفارغة
+    assert str(typed['rank'].dtype) == 'Int16'
+    assert typed['global_500'].dtype == bool
+    assert typed['female_ceo'].tolist()[:2] == [False, True]
+    assert typed['female_ceo'].isna().tolist() == [False, False, True]
+
+
+def test_to_flag_keeps_bool_series():
+    flags = pd.Series([True, False])
+    assert to_flag(flags) is flags
+
+
+def test_schema_skips_missing_columns_and_reports_memory():
+    df = raw()[['name', 'revenue_mil']]
+    typed = apply_schema(df)
+    assert list(typed.columns) == ['name', 'revenue_mil']
+    report = memory_report(df, typed)
+    assert report.loc['TOTAL', 'bytes_after'] == typed.memory_usage(deep=True, index=False).sum()
+    assert set(SCHEMA) >= set(typed.columns)
+
+
+def test_add_profit_margin_is_idempotent():
+    df = add_profit_margin(apply_schema(raw()))
+    assert df['profit_margin'].iloc[0] == 11680.0 / 611289.0 * 100
+    df['profit_margin'] = 0.0
+    assert add_profit_margin(df)['profit_margin'].eq(0.0).all()
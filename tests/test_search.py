@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fortune500_search import SearchIndex, company_ids, is_stem, name_key, normalize, resolve_entities
+
+
+def listing(rows):
+    return pd.DataFrame(rows, columns=['name', 'year', 'revenue_mil', 'rank'])
+
+
+@pytest.fixture
+def entities():
+    return resolve_entities(listing([
+        ('Wal-Mart Stores, Inc.', 2016, 482130.0, 1),
+        ('Wal-Mart Stores', 2017, 485873.0, 1),
+        ('Walmart', 2018, 500343.0, 1),
+        ('Walmart', 2019, 514405.0, 1),
+        ('AT&T Corp.', 2017, 163786.0, 9),
+        ('AT&T Inc.', 2018, 160546.0, 9),
+        # نفس الجذر لكن الإيرادات قفزت: ليست إعادة تسمية
+        ('General Motors', 2017, 166380.0, 8),
+        ('General Motors Financial', 2018, 12000.0, 300),
+        ('Johnson & Johnson', 2018, 76450.0, 37),
+        ('53', 2003, 3200.0, 480),
+    ]))
+
+
+def test_normalize_and_keys():
+    assert normalize('Wal-Mart Stores, Inc.') == 'wal mart stores'
+    assert name_key('AT&T Inc.') == name_key('AT&T Corp.') == 'att'
+    assert normalize('Johnson & Johnson') == 'johnson and johnson'
+    assert normalize('The Company') == 'the company'
+    assert is_stem('walmart', 'walmartstores') and not is_stem('gm', 'gmac')
+
+
+def test_resolve_merges_variants_and_renames(entities):
+    ids = entities['variants']
+    assert ids['Wal-Mart Stores, Inc.'] == ids['Wal-Mart Stores'] == ids['Walmart']
+    assert ids['AT&T Corp.'] == ids['AT&T Inc.']
+    assert ids['General Motors'] != ids['General Motors Financial']
+    walmart = ids['Walmart']
+    assert entities['names'][walmart] == 'Walmart'
+    assert entities['aliases'][walmart] == ['Wal-Mart Stores', 'Wal-Mart Stores, Inc.', 'Walmart']
+    assert (entities['first_year'][walmart], entities['last_year'][walmart]) == (2016, 2019)
+    assert entities['best_rank'][ids['General Motors Financial']] == 300
+    # المعرفات مرتبة حسب الاسم المعتمد
+    assert list(entities['names']) == sorted(entities['names'])
+
+
+def test_company_ids_broadcasts_unique_names(entities):
+    names = pd.Series(['Walmart', 'AT&T Corp.', 'Unknown', None, 'Walmart'])
+    expected = [entities['variants']['Walmart'], entities['variants']['AT&T Corp.'], -1, -1,
+                entities['variants']['Walmart']]
+    assert company_ids(entities, names).tolist() == expected
+    assert company_ids(entities, names.astype('category')).tolist() == expected
+    assert company_ids(entities, []).dtype == np.int64
+
+
+def test_search_index(entities):
+    index = SearchIndex(entities)
+    walmart = entities['variants']['Walmart']
+    assert index.lookup('WAL-MART STORES INC') == walmart
+    assert index.lookup('53') == entities['variants']['53']
+    assert index.search('wal')[0] == walmart
+    assert index.search('stores') == [walmart]
+    assert index.search('generl motors')[0] == entities['variants']['General Motors']
+    assert index.search('', limit=2) == index.top[:2]
+    # نتائج الاستعلامات القصيرة المحفوظة لا تتأثر بتعديل النسخة المعادة
+    first = index.search('a')
+    first.clear()
+    assert index.search('a')
+
+
+def test_resolve_on_real_data(engine):
+    variants = engine.entities['variants']
+    assert variants['Wal-Mart Stores, Inc.'] == variants['Walmart']
+    ids = company_ids(engine.entities, engine.df['name'])
+    assert (ids >= 0).all()
+    assert len(np.unique(ids)) == len(engine.entities['names'])
+
+
+def test_whole_name_prefixes_rank_before_inner_words(engine):
+    names = [engine.company_name(company_id) for company_id in engine.search_companies('general', 50)]
+    assert names[:2] == ['General Motors', 'General Electric']
+    assert names.index('General Mills') < names.index('Dollar General')
+    assert all(name.startswith('General') for name in names[:names.index('Dollar General')])
+    names = [engine.company_name(company_id) for company_id in engine.search_companies('american', 50)]
+    assert names.index('American Express') < names.index('Reynolds American')
@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fortune500_features import (FEATURE_COLUMNS, TARGET, build_features, lag, lead, rolling_mean,
+                                 training_rows)
+from fortune500_inference import Forecaster
+from fortune500_training import available_models, split, thread_shares, write_forecast
+
+
+class GrowthModel:
+    def predict(self, X):
+        return X[:, FEATURE_COLUMNS.index('revenue_mil')] * 1.1
+
+
+@pytest.fixture(scope='module')
+def features(engine):
+    return build_features(engine.df)
+
+
+def test_shift_helpers_stay_inside_each_company():
+    values = np.array([1.0, 2.0, 3.0, 10.0, 20.0])
+    starts = np.array([True, False, False, True, False])
+    np.testing.assert_array_equal(lag(values, starts), [np.nan, 1, 2, np.nan, 10])
+    np.testing.assert_array_equal(lead(values, starts), [2, 3, np.nan, 20, np.nan])
+    np.testing.assert_allclose(rolling_mean(values, starts), [1, 1.5, 2, 10, 15])
+
+
+def test_features_match_groupby(engine, features):
+    matrix, _ = features
+    frame = engine.df.sort_values(['name', 'year'], kind='stable').reset_index(drop=True)
+    grouped = frame.groupby('name', observed=True, sort=False)['revenue_mil']
+    np.testing.assert_allclose(matrix[TARGET], grouped.shift(-1).astype('float64'), equal_nan=True)
+    np.testing.assert_allclose(matrix['revenue_3yr_avg'],
+                               grouped.transform(lambda s: s.rolling(3, min_periods=1).mean()),
+                               rtol=1e-9, equal_nan=True)
+    assert len(matrix) == len(engine.df)
+
+
+def test_unknown_categories_encode_to_minus_one(engine, features):
+    _, encoders = features
+    df = engine.df[engine.df['year'] == engine.df['year'].max()].copy()
+    df['sector'] = 'Not a sector'
+    matrix, _ = build_features(df, encoders)
+    assert (matrix['sector_encoded'] == -1).all()
+    assert (matrix['industry_encoded'] >= 0).all()
+
+
+def test_split_is_unshuffled_tail(features):
+    rows = training_rows(features[0])
+    train, test = split(rows, 0.2)
+    assert len(test) == math.ceil(len(rows) * 0.2)
+    assert len(train) + len(test) == len(rows)
+    pd.testing.assert_frame_equal(pd.concat([train, test]), rows)
+    assert rows[FEATURE_COLUMNS + [TARGET]].notna().all().all()
+
+
+def test_thread_shares():
+    names = ['Random Forest', 'Gradient Boosting']
+    assert thread_shares(names, 8, 2) == {'Random Forest': 4, 'Gradient Boosting': 1}
+    assert thread_shares(names, 1, 2) == {'Random Forest': 1, 'Gradient Boosting': 1}
+
+
+def test_available_models():
+    names = available_models()
+    assert {'Random Forest', 'Gradient Boosting'} <= set(names)
+    assert available_models(['Gradient Boosting']) == ['Gradient Boosting']
+    with pytest.raises(ValueError, match='Nope'):
+        available_models(['Random Forest', 'Nope'])
+
+
+def test_write_forecast(engine, features, tmp_path):
+    df = engine.df
+    forecaster = Forecaster(GrowthModel(), features[1], 'growth')
+    year = int(df['year'].max())
+    table = pd.read_csv(write_forecast(forecaster, df, tmp_path / 'forecast.csv'))
+    column = f'predicted_{year + 1}_revenue'
+    assert len(table) == (df['year'] == year).sum()
+    assert table[column].is_monotonic_decreasing
+    np.testing.assert_allclose(table[column], table['revenue_mil'] * 1.1)
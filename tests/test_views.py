@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import views
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_after(statement):
+    # عملية جديدة حتى لا تتأثر بما استوردته الاختبارات الأخرى
+    code = f"import sys; {statement}; print(' '.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_importing_views_loads_no_page():
+    modules = imported_after('import views')
+    assert not {f'views.{module}' for _, _, module in views.PAGES} & modules
+    assert 'plotly' not in modules
+
+
+def test_first_page_does_not_load_the_models_or_plotly_express():
+    modules = imported_after("import views; views.page_module(views.PAGES[0][0])")
+    assert 'views.year_analysis' in modules
+    assert 'views.predictions' not in modules
+    assert not {'plotly.express', 'sklearn', 'joblib'} & modules
+
+
+@pytest.mark.parametrize('index', range(len(views.PAGES)))
+def test_menu_labels_resolve_in_both_languages(index):
+    english, arabic, module = views.PAGES[index]
+    assert views.menu_options("English")[index] == english
+    assert views.menu_options("العربية")[index] == arabic
+    assert views.page_module(english).__name__ == views.page_module(arabic).__name__ == f'views.{module}'
+
+
+def test_unknown_label_falls_back_to_the_first_page():
+    assert views.page_module('Removed page').__name__ == f'views.{views.PAGES[0][2]}'
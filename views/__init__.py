@@ -0,0 +1,50 @@
+"""Dashboard pages, one module per entry of the sidebar menu.
+
+A page module is imported the first time its page is shown, so the
+dependencies only some pages need (Plotly, the trained models, the
+prediction datasets) do not delay the first paint of the others. Each module
+exposes ``render(page)``; ``Page`` carries the shared state of the rerun.
+"""
+import importlib
+
+# (English label, Arabic label, module) بنفس ترتيب القائمة الجانبية
+PAGES = [
+    (" Year Analysis", " تحليل السنوات", 'year_analysis'),
+    (" Company Analysis", " تحليل الشركات", 'company_analysis'),
+    (" Year Comparison", " مقارنة السنوات", 'year_comparison'),
+    (" Movers & Survival", " المتحركون والبقاء", 'rank_dynamics'),
+    (" Predictions & Models", " التوقعات والنماذج", 'predictions'),
+    (" Data Overview", " نظرة عامة", 'data_overview'),
+]
+
+
+class Page:
+    """What a page needs from the app: data, engine and the rerun's helpers."""
+
+    def __init__(self, data, engine, lang, chart, timed, prefetch_tasks):
+        self.data = data
+        self.engine = engine
+        self.cube = engine.cube
+        self.df = data['main']
+        self.version = data.version('main')
+        self.lang = lang
+        self.chart = chart
+        self.timed = timed
+        # أزواج (مفتاح، دالة بناء) تُجهّز في الخلفية بعد انتهاء الرسم
+        self.prefetch_tasks = prefetch_tasks
+
+
+def menu_options(lang):
+    return [english if lang == "English" else arabic for english, arabic, _ in PAGES]
+
+
+def page_module(label):
+    for english, arabic, module in PAGES:
+        if label in (english, arabic):
+            return importlib.import_module(f'views.{module}')
+    # القيمة المحفوظة من لغة أخرى أو إصدار أقدم: الصفحة الأولى
+    return importlib.import_module(f'views.{PAGES[0][2]}')
+
+
+def render(label, page):
+    page_module(label).render(page)
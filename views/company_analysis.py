@@ -0,0 +1,53 @@
+"""Company Analysis: the history of one company in the list."""
+import streamlit as st
+
+import fortune500_figures as figures
+from fortune500_search import SEARCH_LIMIT
+from views.downloads import export_buttons
+
+
+def render(page):
+    engine, chart, timed, lang, version = page.engine, page.chart, page.timed, page.lang, page.version
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.header(" Company Analysis" if st.session_state.lang == "English" else " تحليل الشركات")
+    # البحث في الفهرس يرسل للمتصفح أفضل SEARCH_LIMIT نتيجة بدل قائمة كل الشركات
+    query = st.text_input("Search Company" if lang == "English" else "ابحث عن شركة", key='company_search',
+                          placeholder="e.g. walmart, exxon, at&t" if lang == "English" else "مثال: walmart")
+    ids = timed('filtering', engine.search_companies, query, SEARCH_LIMIT)
+    if not ids:
+        st.info("No company matches your search" if lang == "English" else "لا توجد شركة مطابقة للبحث")
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    company_id = st.selectbox("Select Company" if st.session_state.lang == "English" else "اختر الشركة", ids,
+                              format_func=engine.company_name)
+    aliases = [name for name in engine.company_aliases(company_id) if name != engine.company_name(company_id)]
+    if aliases:
+        st.caption(("Also listed as: " if lang == "English" else "وردت أيضاً باسم: ") + ", ".join(aliases))
+    df_comp = timed('filtering', engine.company_history, company_id)
+    if not df_comp.empty:
+        latest = df_comp.iloc[-1]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Years in List" if st.session_state.lang == "English" else "السنوات في القائمة", len(df_comp))
+        with col2:
+            st.metric("Latest Revenue" if st.session_state.lang == "English" else "آخر إيرادات", f"${latest['revenue_mil']:,.0f}M")
+        with col3:
+            st.metric("Latest Rank" if st.session_state.lang == "English" else "آخر ترتيب", f"#{int(latest['rank'])}")
+        with col4:
+            st.metric("Latest Margin" if st.session_state.lang == "English" else "آخر هامش", f"{latest['profit_margin']:.1f}%")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            chart(
+                ('company_revenue', company_id, lang, version),
+                lambda: figures.company_trend(df_comp, 'revenue_mil', "Revenue Trend" if lang == "English" else "اتجاه الإيرادات", '#A0AEC0'))
+
+        with col2:
+            chart(
+                ('company_rank', company_id, lang, version),
+                lambda: figures.company_trend(df_comp, 'rank', "Rank Trend" if lang == "English" else "اتجاه الترتيب", '#718096', reverse=True))
+
+        st.subheader("Historical Data" if st.session_state.lang == "English" else "البيانات التاريخية")
+        st.dataframe(df_comp[['year','rank','revenue_mil','profit_mil','profit_margin']], use_container_width=True)
+        export_buttons(page, 'company', 'company', company_id=int(company_id))
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,41 @@
+"""Data Overview: all-years totals and trends."""
+import streamlit as st
+
+import fortune500_figures as figures
+
+
+def render(page):
+    cube, chart, lang, version = page.cube, page.chart, page.lang, page.version
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.header(" Data Overview" if st.session_state.lang == "English" else "نظرة عامة")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Years" if st.session_state.lang == "English" else "إجمالي السنوات", cube['totals']['years'])
+    with col2:
+        st.metric("Unique Companies" if st.session_state.lang == "English" else "الشركات الفريدة", cube['totals']['companies'])
+    with col3:
+        st.metric("Total Revenue" if st.session_state.lang == "English" else "إجمالي الإيرادات", f"${cube['totals']['revenue_sum']/1000000:,.1f}T")
+    with col4:
+        st.metric("Avg Annual Growth" if st.session_state.lang == "English" else "متوسط النمو السنوي", 
+                 f"{cube['totals']['avg_annual_growth']:.1f}%")
+
+    yearly = cube['by_year'].rename(columns={'revenue_mean': 'revenue_mil', 'profit_mean': 'profit_mil', 'margin_mean': 'profit_margin'}).reset_index()
+
+    chart(
+        ('overview_trends', lang, version),
+        lambda: figures.overview_trends(
+            yearly,
+            ("Average Revenue Trend" if lang == "English" else "اتجاه متوسط الإيرادات",
+             "Average Profit Trend" if lang == "English" else "اتجاه متوسط الأرباح",
+             "Average Margin Trend" if lang == "English" else "اتجاه متوسط الهامش"),
+            ("Revenue" if lang == "English" else "الإيرادات",
+             "Profit" if lang == "English" else "الأرباح",
+             "Margin" if lang == "English" else "الهامش")))
+
+    chart(
+        ('overview_top', lang, version),
+        lambda: figures.all_time_top(cube['company_max_revenue'].head(15),
+                                     "Top 15 Companies All Time" if lang == "English" else "أفضل 15 شركة على الإطلاق"))
+
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,23 @@
+"""Download buttons that export a page's full result set (``fortune500_export``)."""
+import streamlit as st
+
+from fortune500_export import FORMATS, export_bytes, export_name
+
+FORMAT_LABELS = {'csv': "CSV", 'parquet': "Parquet", 'xlsx': "Excel"}
+
+
+def read_export(engine, query, fmt, params):
+    # Streamlit يقرأ أي مصدر (حتى الملف المفتوح) بالكامل إلى bytes في مخزن الوسائط،
+    # فيُسلَّم الملف المكتمل كـ bytes؛ البث جزءاً بجزء متاح عبر /export/ في الـ API
+    return export_bytes(engine, query, fmt, **params)
+
+
+def export_buttons(page, query, key, **params):
+    # الملف يُبنى عند الضغط فقط (في خيط منفصل)، ومن ملف التصدير المخزن إن وُجد
+    download = "Download" if page.lang == "English" else "تنزيل"
+    for col, fmt in zip(st.columns(len(FORMATS)), FORMATS):
+        with col:
+            st.download_button(f"{download} {FORMAT_LABELS[fmt]}",
+                               data=lambda fmt=fmt: read_export(page.engine, query, fmt, params),
+                               file_name=export_name(query, params, fmt), mime=FORMATS[fmt]['mime'],
+                               key=f'export_{key}_{fmt}', on_click='ignore')
@@ -0,0 +1,246 @@
+"""Predictions & Models: forecasts, model metrics and backtests.
+
+The prediction files, the artifact bundle and the fitted model are only
+loaded when this page is first shown.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import fortune500_figures as figures
+from fortune500_artifacts import load_bundle, bundle_version
+from fortune500_data import datasets_version, load_all
+from fortune500_inference import Forecaster, OVERRIDE_COLUMNS, has_models
+from views.downloads import export_buttons
+
+PREDICTION_DATASETS = ['pred2024', 'models', 'test']
+
+
+@st.cache_resource(max_entries=2)
+def load_prediction_data(version):
+    return load_all(PREDICTION_DATASETS)
+
+
+@st.cache_resource
+def load_artifacts(version):
+    if version is None:
+        return None
+    return load_bundle()
+
+
+# النموذج المدرب يُحمّل مرة واحدة لكل عملية ولكل إصدار من الحزمة
+@st.cache_resource
+def load_forecaster(version):
+    if version is None or not has_models():
+        return None
+    try:
+        return Forecaster.from_bundle()
+    except ValueError:
+        return None
+
+
+def render(page):
+    engine, cube, df, chart, timed, lang = page.engine, page.cube, page.df, page.chart, page.timed, page.lang
+    data = timed('data load', load_prediction_data, datasets_version(PREDICTION_DATASETS))
+    if not data['pred2024'].empty:
+        st.sidebar.success(f" 2024: {len(data['pred2024']):,} rows")
+    if not data['models'].empty:
+        st.sidebar.success(f" Models: {len(data['models'])} models")
+    if not data['test'].empty:
+        st.sidebar.success(f" Test: {len(data['test']):,} rows")
+
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.header(" Predictions & AI Models" if st.session_state.lang == "English" else " التوقعات والنماذج الذكية")
+
+    if not data['pred2024'].empty:
+        st.subheader("2024 Predictions" if st.session_state.lang == "English" else "توقعات 2024")
+        df_pred = data['pred2024']
+
+        revenue_col = None
+        name_col = None
+        rank_col = None
+
+        for col in df_pred.columns:
+            col_lower = col.lower()
+            if 'revenue' in col_lower or 'rev' in col_lower or 'pred' in col_lower:
+                revenue_col = col
+            if 'name' in col_lower or 'company' in col_lower:
+                name_col = col
+            if 'rank' in col_lower:
+                rank_col = col
+
+        if revenue_col is None and len(df_pred.select_dtypes(include=[np.number]).columns) > 0:
+            revenue_col = df_pred.select_dtypes(include=[np.number]).columns[0]
+
+        display_cols = []
+        if name_col:
+            display_cols.append(name_col)
+        if revenue_col:
+            display_cols.append(revenue_col)
+        if rank_col:
+            display_cols.append(rank_col)
+
+        if revenue_col and name_col:
+            chart(
+                ('predicted_top', revenue_col, name_col, lang, data.version('pred2024')),
+                lambda: figures.gray_bar(df_pred.sort_values(revenue_col, ascending=False).head(20), revenue_col, name_col,
+                                         "Top 20 Predicted Companies 2024" if lang == "English" else "أفضل 20 شركة متوقعة 2024"))
+
+        if display_cols:
+            st.dataframe(df_pred[display_cols].head(50), use_container_width=True)
+        else:
+            st.dataframe(df_pred.head(50), use_container_width=True)
+        export_buttons(page, 'predictions', 'pred2024', name='pred2024')
+    else:
+        st.info("2024 predictions file not available" if st.session_state.lang == "English" else "ملف توقعات 2024 غير متوفر")
+
+    forecaster = timed('data load', load_forecaster, bundle_version())
+    if forecaster is not None:
+        st.subheader("Forecast" if lang == "English" else "التوقع")
+        years = cube['by_year'].index
+        last_year = int(years.max())
+        target_years = list(range(last_year + 3, int(years.min()) + 1, -1))
+        col1, col2 = st.columns(2)
+        with col1:
+            target_year = st.selectbox("Target Year" if lang == "English" else "السنة المستهدفة", target_years, index=2)
+        base_year = min(target_year - 1, last_year)
+        base_rows = df[df['year'] == base_year]
+        no_company = "—"
+        with col2:
+            what_if = st.selectbox("What-if Company" if lang == "English" else "شركة لسيناريو ماذا لو",
+                                   [no_company] + sorted(base_rows['name'].astype(str)))
+        overrides = {}
+        if what_if != no_company:
+            row = base_rows[base_rows['name'] == what_if].iloc[0]
+            labels = {'revenue_mil': "Revenue ($M)" if lang == "English" else "الإيرادات (مليون $)",
+                      'profit_mil': "Profit ($M)" if lang == "English" else "الأرباح (مليون $)",
+                      'employees': "Employees" if lang == "English" else "الموظفون"}
+            for column, col in zip(OVERRIDE_COLUMNS, st.columns(len(OVERRIDE_COLUMNS))):
+                with col:
+                    value = st.number_input(f"{labels[column]} {base_year}", value=float(row[column]), step=1000.0)
+                if value != float(row[column]):
+                    overrides.setdefault(what_if, {})[column] = value
+        overrides_key = tuple((company, tuple(sorted(values.items()))) for company, values in overrides.items())
+        forecast = timed('aggregation', engine.cached,
+                         ('forecast', forecaster.model_name, bundle_version(), target_year, overrides_key),
+                         lambda: forecaster.forecast(engine.df, target_year, overrides=overrides))
+        if what_if != no_company:
+            company_row = forecast[forecast['name'] == what_if]
+            if not company_row.empty:
+                st.metric(f"{what_if} {target_year}", f"${company_row['predicted'].iloc[0]:,.0f}M",
+                          f"{company_row['predicted_growth'].iloc[0]:+.1f}%")
+        chart(
+            ('forecast_top', forecaster.model_name, bundle_version(), target_year, overrides_key, lang),
+            lambda: figures.gray_bar(forecast.head(15), 'predicted', 'name',
+                                     f"Top 15 Forecast - {target_year}" if lang == "English" else f"أفضل 15 توقعاً - {target_year}"))
+        st.dataframe(forecast.head(50), use_container_width=True)
+    else:
+        st.caption("On-demand forecasts need fitted models: run `python fortune500_training.py` to write them to the bundle"
+                   if lang == "English" else
+                   "التوقع حسب الطلب يحتاج نماذج مدرّبة: شغّل `python fortune500_training.py` لكتابتها في الحزمة")
+
+    artifacts = timed('data load', load_artifacts, bundle_version())
+    if artifacts is not None:
+        manifest = artifacts['manifest']
+        artifacts_version = ('artifacts', bundle_version())
+        st.subheader("Model Performance" if lang == "English" else "أداء النماذج")
+        metrics = artifacts['metrics']
+        chart(
+            ('model_accuracy', 'model', 'R2', lang, artifacts_version),
+            lambda: figures.model_accuracy_bar(metrics, 'model', 'R2',
+                                               "Model Accuracy (R²)" if lang == "English" else "دقة النماذج (R²)"))
+        st.dataframe(metrics, use_container_width=True)
+
+        backtest = artifacts['backtest']
+        if backtest is not None and not backtest.empty:
+            st.subheader("Walk-forward Backtest" if lang == "English" else "الاختبار التاريخي المتدرج")
+            metric = st.selectbox("Metric" if lang == "English" else "المقياس", ['MAPE', 'RMSE', 'MAE'])
+            chart(
+                ('backtest', metric, lang, artifacts_version),
+                lambda: figures.backtest_lines(
+                    backtest, metric,
+                    f"{metric} by Forecast Year" if lang == "English" else f"{metric} حسب سنة التوقع",
+                    "Forecast Year" if lang == "English" else "سنة التوقع"))
+
+        if manifest['predictions']:
+            st.subheader("Test Predictions" if lang == "English" else "توقعات الاختبار")
+            model_names = list(manifest['predictions'])
+            best = manifest.get('best_model')
+            model_name = st.selectbox("Model" if lang == "English" else "النموذج", model_names,
+                                      index=model_names.index(best) if best in model_names else 0)
+            y_true = artifacts['y_true']
+            y_pred = artifacts['predictions'][model_name]
+            col1, col2 = st.columns(2)
+            with col1:
+                chart(
+                    ('actual_vs_predicted', model_name, lang, artifacts_version),
+                    lambda: figures.actual_vs_predicted(
+                        y_true, y_pred,
+                        "Actual vs Predicted" if lang == "English" else "الفعلية مقابل المتوقعة",
+                        "Actual" if lang == "English" else "فعلية",
+                        "Predicted" if lang == "English" else "متوقعة"))
+            with col2:
+                chart(
+                    ('prediction_errors', model_name, lang, artifacts_version),
+                    lambda: figures.error_histogram(
+                        np.asarray(y_pred) - np.asarray(y_true),
+                        "Prediction Error Distribution" if lang == "English" else "توزيع أخطاء التوقع",
+                        "Error ($M)" if lang == "English" else "الخطأ (مليون $)"))
+
+            preview = pd.DataFrame({'Actual': y_true[:50], 'Predicted': y_pred[:50]})
+            if artifacts['keys'] is not None:
+                preview = pd.concat([artifacts['keys'].head(50), preview], axis=1)
+            st.dataframe(preview, use_container_width=True)
+            st.caption("Downloads include every test row and the predictions of every model" if lang == "English"
+                       else "التنزيل يشمل كل صفوف الاختبار وتوقعات كل النماذج")
+            export_buttons(page, 'test_predictions', 'bundle_test')
+    else:
+        if not data['models'].empty:
+            st.subheader("Model Performance" if st.session_state.lang == "English" else "أداء النماذج")
+            df_models = data['models']
+
+            model_col = None
+            accuracy_col = None
+
+            for col in df_models.columns:
+                col_lower = col.lower()
+                if 'model' in col_lower or 'name' in col_lower:
+                    model_col = col
+                if 'acc' in col_lower or 'score' in col_lower or 'r2' in col_lower:
+                    accuracy_col = col
+
+            if accuracy_col:
+                chart(
+                    ('model_accuracy', model_col, accuracy_col, lang, data.version('models')),
+                    lambda: figures.model_accuracy_bar(df_models, model_col, accuracy_col,
+                                                       "Model Accuracy" if lang == "English" else "دقة النماذج"))
+
+            st.dataframe(df_models, use_container_width=True)
+
+        if not data['test'].empty:
+            st.subheader("Test Predictions" if st.session_state.lang == "English" else "توقعات الاختبار")
+            df_test = data['test']
+
+            actual_col = None
+            predicted_col = None
+
+            for col in df_test.columns:
+                col_lower = col.lower()
+                if 'actual' in col_lower or 'true' in col_lower:
+                    actual_col = col
+                if 'pred' in col_lower or 'predict' in col_lower:
+                    predicted_col = col
+
+            if actual_col and predicted_col:
+                chart(
+                    ('actual_vs_predicted', actual_col, predicted_col, lang, data.version('test')),
+                    lambda: figures.actual_vs_predicted(
+                        df_test[actual_col], df_test[predicted_col],
+                        "Actual vs Predicted" if lang == "English" else "الفعلية مقابل المتوقعة",
+                        "Actual" if lang == "English" else "فعلية",
+                        "Predicted" if lang == "English" else "متوقعة"))
+
+            st.dataframe(df_test.head(50), use_container_width=True)
+            export_buttons(page, 'predictions', 'test', name='test')
+
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,94 @@
+"""Movers & Survival: every company ranked by its rank dynamics and tenure on the list."""
+import streamlit as st
+
+import fortune500_figures as figures
+from fortune500_analytics import DYNAMICS_METRICS, DYNAMICS_N
+from views.downloads import export_buttons
+
+# (English, Arabic) لكل مقياس بنفس ترتيب DYNAMICS_METRICS
+METRIC_LABELS = {
+    'mean_rank_change': ("Avg yearly rank change", "متوسط التغير السنوي في الترتيب"),
+    'rank_volatility': ("Rank volatility", "تذبذب الترتيب"),
+    'biggest_rise': ("Biggest one-year rise", "أكبر صعود في سنة"),
+    'biggest_drop': ("Biggest one-year drop", "أكبر هبوط في سنة"),
+    'years_listed': ("Years listed", "سنوات الإدراج"),
+    'longest_streak': ("Longest streak", "أطول فترة متواصلة"),
+    're_entries': ("Re-entries", "مرات العودة"),
+    'best_rank': ("Best rank", "أفضل ترتيب"),
+    'latest_rank': ("Latest rank", "آخر ترتيب"),
+    'revenue_cagr': ("Revenue CAGR (whole tenure)", "النمو السنوي المركب للإيرادات"),
+    'growth_3y': ("Revenue CAGR, last 3 years", "النمو المركب لآخر 3 سنوات"),
+    'best_growth_3y': ("Best 3-year revenue CAGR", "أفضل نمو مركب على 3 سنوات"),
+}
+TABLE_COLUMNS = ['name', 'sector', 'first_year', 'last_year', 'years_listed', 're_entries', 'longest_streak',
+                 'best_rank', 'latest_rank', 'mean_rank_change', 'rank_volatility', 'revenue_cagr', 'growth_3y']
+CHART_N = 15
+
+
+def metric_chart(engine, lang, version, sort, ascending, min_years, status, sectors):
+    def build():
+        top = engine.dynamics(sort, ascending, CHART_N, min_years, status, sectors)
+        label = METRIC_LABELS[sort][0 if lang == "English" else 1]
+        return figures.gray_bar(top, sort, 'name', label, font_size=12, yaxis_autorange='reversed')
+    return ('rank_dynamics', sort, ascending, min_years, status, tuple(sectors), lang, version), build
+
+
+def survival_chart(engine, lang, version):
+    def build():
+        return figures.survival_line(
+            engine.survival(),
+            "Still on the list after entering" if lang == "English" else "البقاء في القائمة بعد الدخول",
+            "years since entry" if lang == "English" else "سنوات منذ الدخول",
+            "% of entrants" if lang == "English" else "% من الشركات الداخلة")
+    return ('survival', lang, version), build
+
+
+def render(page):
+    engine, chart, timed, lang, version = page.engine, page.chart, page.timed, page.lang, page.version
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.header(" Movers & Survival" if lang == "English" else " المتحركون والبقاء")
+    table = timed('aggregation', lambda: engine.rank_dynamics)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Companies" if lang == "English" else "الشركات", f"{len(table):,}")
+    with col2:
+        st.metric("Still Listed" if lang == "English" else "ما زالت مدرجة", f"{int(table['active'].sum()):,}")
+    with col3:
+        st.metric("Median Tenure" if lang == "English" else "وسيط مدة الإدراج", f"{table['years_listed'].median():.0f}")
+    with col4:
+        st.metric("Re-entered" if lang == "English" else "عادت للقائمة", f"{int((table['re_entries'] > 0).sum()):,}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        sort = st.selectbox("Sort By" if lang == "English" else "الترتيب حسب", list(DYNAMICS_METRICS),
+                            format_func=lambda metric: METRIC_LABELS[metric][0 if lang == "English" else 1])
+        smallest = "Smallest first" if lang == "English" else "الأصغر أولاً"
+        order = st.radio("Order" if lang == "English" else "الاتجاه",
+                         ["Largest first" if lang == "English" else "الأكبر أولاً", smallest],
+                         index=int(DYNAMICS_METRICS[sort]), horizontal=True, key=f'dynamics_order_{sort}')
+        ascending = order == smallest
+    with col2:
+        statuses = {"All" if lang == "English" else "الكل": None,
+                    "Still listed" if lang == "English" else "ما زالت مدرجة": 'active',
+                    "Dropped off" if lang == "English" else "خرجت": 'exited'}
+        status = statuses[st.radio("Status" if lang == "English" else "الحالة", list(statuses), horizontal=True)]
+        min_years = st.slider("Minimum years listed" if lang == "English" else "أقل عدد سنوات إدراج",
+                              1, int(table['years_listed'].max()), 5)
+    sectors = st.multiselect("Sectors" if lang == "English" else "القطاعات", sorted(table['sector'].unique()))
+    n = st.slider("Companies" if lang == "English" else "عدد الشركات", 10, 200, DYNAMICS_N, step=10)
+
+    selected = timed('filtering', engine.dynamics, sort, ascending, n, min_years, status, sectors)
+    if selected.empty:
+        st.info("No company matches these filters" if lang == "English" else "لا توجد شركة تطابق هذه الشروط")
+    else:
+        chart(*metric_chart(engine, lang, version, sort, ascending, min_years, status, sectors))
+        st.dataframe(selected[TABLE_COLUMNS], use_container_width=True)
+        st.caption("Downloads include every matching company and all metrics" if lang == "English"
+                   else "التنزيل يشمل كل الشركات المطابقة وكل المقاييس")
+        export_buttons(page, 'dynamics', 'dynamics', sort=sort, ascending=ascending, min_years=min_years,
+                       status=status, sectors=tuple(sorted(sectors)))
+
+    st.subheader("Survival on the List" if lang == "English" else "البقاء في القائمة")
+    chart(*survival_chart(engine, lang, version))
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,81 @@
+"""Year Analysis: summary, top companies, revenue distribution and industries of one year."""
+import streamlit as st
+
+import fortune500_figures as figures
+from views.downloads import export_buttons
+from views.year_comparison import comparison_chart, default_pair
+
+
+# مفاتيح الأشكال ودوال بنائها في مكان واحد حتى يبني التحميل المسبق نفس ما ستطلبه الصفحة
+def year_charts(engine, year, top_n, lang):
+    year = int(year)
+    year_version = engine.year_version(year)
+    def industry_bar(column, title):
+        ind = engine.industries(year).rename(columns={'revenue_sum': 'revenue_mil', 'margin_mean': 'profit_margin'})
+        return figures.industry_bar(ind, column, title)
+    return {
+        'top': (('year_top', year, top_n, lang, year_version),
+                lambda: figures.top_companies_bar(engine.top_companies(year, top_n), f"{'Top' if lang == 'English' else 'أفضل'} {top_n} {'Companies' if lang == 'English' else 'شركة'} - {year}")),
+        'histogram': (('year_histogram', year, lang, year_version),
+                      lambda: figures.revenue_histogram(engine.cube['revenue_by_year'][year], "Revenue Distribution" if lang == "English" else "توزيع الإيرادات")),
+        'industry_revenue': (('industry_revenue', year, lang, year_version),
+                             lambda: industry_bar('revenue_mil', "Revenue by Industry" if lang == "English" else "الإيرادات حسب الصناعة")),
+        'industry_margin': (('industry_margin', year, lang, year_version),
+                            lambda: industry_bar('profit_margin', "Margin by Industry" if lang == "English" else "الهامش حسب الصناعة")),
+    }
+
+
+def render(page):
+    engine, cube, chart, timed, lang = page.engine, page.cube, page.chart, page.timed, page.lang
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.header(" Year Analysis" if st.session_state.lang == "English" else " تحليل السنوات")
+    col1, col2 = st.columns([3,1])
+    with col1:
+        year = st.selectbox("Select Year" if st.session_state.lang == "English" else "اختر السنة", list(cube['by_year'].index[::-1]))
+    with col2:
+        top_n = st.number_input("Companies" if st.session_state.lang == "English" else "الشركات", 5, 50, 15)
+    if year in cube['by_year'].index:
+        stats = timed('aggregation', engine.year_summary, year)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Companies" if st.session_state.lang == "English" else "الشركات", f"{int(stats['companies']):,}")
+        with col2:
+            st.metric("Total Revenue" if st.session_state.lang == "English" else "إجمالي الإيرادات", f"${stats['revenue_sum']:,.0f}M")
+        with col3:
+            st.metric("Avg Revenue" if st.session_state.lang == "English" else "متوسط الإيرادات", f"${stats['revenue_mean']:,.0f}M")
+        with col4:
+            st.metric("Avg Margin" if st.session_state.lang == "English" else "متوسط الهامش", f"{stats['margin_mean']:.1f}%")
+
+        tabs = st.tabs([
+            "Top Companies" if st.session_state.lang == "English" else "أفضل الشركات",
+            "Revenue Distribution" if st.session_state.lang == "English" else "توزيع الإيرادات",
+            "Industry Analysis" if st.session_state.lang == "English" else "تحليل الصناعات"
+        ])
+
+        charts = year_charts(engine, year, top_n, lang)
+        with tabs[0]:
+            top = timed('filtering', engine.top_companies, year, top_n)
+            chart(*charts['top'])
+            st.dataframe(top[['rank','name','revenue_mil','profit_mil','profit_margin','industry']], use_container_width=True)
+            st.caption(f"All companies of {year}" if lang == "English" else f"كل شركات {year}")
+            export_buttons(page, 'year', f'year_{year}', year=int(year))
+
+        with tabs[1]:
+            chart(*charts['histogram'])
+
+        with tabs[2]:
+            col1, col2 = st.columns(2)
+            with col1:
+                chart(*charts['industry_revenue'])
+            with col2:
+                chart(*charts['industry_margin'])
+
+        # st.tabs يرسم كل التبويبات في نفس التشغيل، فيبقى تجهيز السنوات المجاورة ومقارنة السنوات
+        for neighbour in (year - 1, year + 1):
+            if neighbour in cube['by_year'].index:
+                page.prefetch_tasks.extend(year_charts(engine, neighbour, top_n, lang).values())
+        page.prefetch_tasks.append(comparison_chart(engine, *default_pair(cube), lang))
+        latest = cube['by_year'].index.max()
+        if year != latest:
+            page.prefetch_tasks.append(comparison_chart(engine, year, latest, lang))
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,136 @@
+"""Year Comparison: two or more years side by side, down to individual companies."""
+import pandas as pd
+import streamlit as st
+
+import fortune500_figures as figures
+from views.downloads import export_buttons
+
+# موقع السنتين المختارتين افتراضياً في القائمة (من الأحدث إلى الأقدم)
+DEFAULT_INDEXES = (3, 0)
+# الفارق بالسنوات عن أحدث سنة في الاختيار الافتراضي لوضع السنوات المتعددة
+DEFAULT_SPANS = (20, 10, 5, 0)
+
+
+def default_pair(cube):
+    years = cube['by_year'].index[::-1]
+    return years[DEFAULT_INDEXES[0]], years[DEFAULT_INDEXES[1]]
+
+
+def comparison_chart(engine, y1, y2, lang):
+    y1, y2 = int(y1), int(y2)
+    def build():
+        comparison = engine.compare_years(y1, y2)
+        d1, d2 = comparison['first'], comparison['second']
+        return figures.year_comparison_bars(
+            [str(y1), str(y2)],
+            [d1['revenue_sum'], d2['revenue_sum']],
+            [d1['revenue_mean'], d2['revenue_mean']],
+            "Total Revenue" if lang == "English" else "إجمالي الإيرادات",
+            "Avg Revenue" if lang == "English" else "متوسط الإيرادات")
+    return ('year_comparison', y1, y2, lang, engine.year_version(y1), engine.year_version(y2)), build
+
+
+def many_years_chart(engine, years, lang):
+    years = tuple(sorted(int(year) for year in years))
+    def build():
+        summary = engine.compare_many_years(years)['years']
+        return figures.year_comparison_bars(
+            [str(year) for year in years], summary['revenue_sum'], summary['revenue_mean'],
+            "Total Revenue" if lang == "English" else "إجمالي الإيرادات",
+            "Avg Revenue" if lang == "English" else "متوسط الإيرادات")
+    return ('year_comparison_many', years, lang, tuple(engine.year_version(year) for year in years)), build
+
+
+def movers_chart(engine, y1, y2, lang):
+    y1, y2 = int(y1), int(y2)
+    def build():
+        movers = engine.rank_movers(y1, y2)
+        frame = pd.concat([movers['risers'], movers['fallers'].iloc[::-1]], ignore_index=True)
+        return figures.rank_change_bar(frame['name'], frame['rank_change'],
+                                       f"Rank Movers {y1}-{y2}" if lang == "English" else f"أكبر تغيرات الترتيب {y1}-{y2}")
+    return ('rank_movers', y1, y2, lang, engine.year_version(y1), engine.year_version(y2)), build
+
+
+def render_company_changes(engine, chart, timed, lang, y1, y2):
+    # مطابقة الشركات بين السنتين: أكبر تغيرات الترتيب ثم الشركات الداخلة والخارجة
+    chart(*movers_chart(engine, y1, y2, lang))
+    changes = timed('aggregation', engine.turnover, y1, y2)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader(f"{'Entrants' if lang == 'English' else 'الداخلة'} ({len(changes['entrants'])})")
+        st.dataframe(changes['entrants'], use_container_width=True)
+    with col2:
+        st.subheader(f"{'Exits' if lang == 'English' else 'الخارجة'} ({len(changes['exits'])})")
+        st.dataframe(changes['exits'], use_container_width=True)
+
+
+def render_many(page, years):
+    engine, cube, chart, timed, lang = page.engine, page.cube, page.chart, page.timed, page.lang
+    latest = years[0]
+    default = [latest - span for span in DEFAULT_SPANS if latest - span in cube['by_year'].index]
+    selected = st.multiselect("Years" if lang == "English" else "السنوات", years, default=default)
+    selected = sorted({int(year) for year in selected})
+    if len(selected) < 2:
+        st.info("Select at least two years" if lang == "English" else "اختر سنتين على الأقل")
+        return
+    first, last = selected[0], selected[-1]
+    comparison = timed('aggregation', engine.compare_many_years, selected)
+    status = comparison['status']
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(f"{'Revenue CAGR' if lang == 'English' else 'النمو السنوي المركب'} {first}-{last}", f"{comparison['revenue_cagr']:+.1f}%")
+    with col2:
+        st.metric("Stayed" if lang == "English" else "بقيت", f"{status.get('stayed', 0):,}")
+    with col3:
+        st.metric("Entered" if lang == "English" else "دخلت", f"{status.get('entered', 0):,}")
+    with col4:
+        st.metric("Exited" if lang == "English" else "خرجت", f"{status.get('exited', 0):,}")
+
+    chart(*many_years_chart(engine, selected, lang))
+
+    st.subheader("Companies" if lang == "English" else "الشركات")
+    st.dataframe(comparison['companies'], use_container_width=True)
+    export_buttons(page, 'compare', 'compare', years=tuple(selected))
+    render_company_changes(engine, chart, timed, lang, first, last)
+
+
+def render(page):
+    engine, cube, chart, timed, lang = page.engine, page.cube, page.chart, page.timed, page.lang
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.header(" Year Comparison" if st.session_state.lang == "English" else " مقارنة السنوات")
+    years = list(cube['by_year'].index[::-1])
+    two_years = "Two Years" if lang == "English" else "سنتان"
+    mode = st.radio("Mode" if lang == "English" else "الوضع",
+                    [two_years, "Multiple Years" if lang == "English" else "سنوات متعددة"], horizontal=True)
+    if mode != two_years:
+        render_many(page, years)
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    col1, col2 = st.columns(2)
+    with col1:
+        y1 = st.selectbox("First Year" if st.session_state.lang == "English" else "السنة الأولى", years, index=DEFAULT_INDEXES[0])
+    with col2:
+        y2 = st.selectbox("Second Year" if st.session_state.lang == "English" else "السنة الثانية", years, index=DEFAULT_INDEXES[1])
+
+    if y1 != y2:
+        comparison = timed('aggregation', engine.compare_years, y1, y2)
+        rev_growth = comparison['revenue_growth']
+        avg_growth = comparison['avg_growth']
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Revenue Growth" if st.session_state.lang == "English" else "نمو الإيرادات", f"{rev_growth:+.1f}%")
+        with col2:
+            st.metric("Avg Growth" if st.session_state.lang == "English" else "متوسط النمو", f"{avg_growth:+.1f}%")
+        with col3:
+            st.metric("Companies Change" if st.session_state.lang == "English" else "تغير الشركات", f"{comparison['companies_change']:+d}")
+
+        chart(*comparison_chart(engine, y1, y2, lang))
+        render_company_changes(engine, chart, timed, lang, min(y1, y2), max(y1, y2))
+
+        # الخطوة التالية المعتادة: تحريك إحدى السنتين سنة واحدة
+        for a, b in ((y1 - 1, y2), (y1 + 1, y2), (y1, y2 - 1), (y1, y2 + 1)):
+            if a != b and a in cube['by_year'].index and b in cube['by_year'].index:
+                page.prefetch_tasks.append(comparison_chart(engine, a, b, lang))
+    st.markdown('</div>', unsafe_allow_html=True)